@@ -3,26 +3,11 @@ import os
 
 import aws_cdk as cdk
 
-from web_app.web_app_stack import WebAppStack
-
+from web_app.web_app_global_stack import create_web_app_stacks
 
 app = cdk.App()
-WebAppStack(app, "WebAppStack",
-    # If you don't specify 'env', this stack will be environment-agnostic.
-    # Account/Region-dependent features and context lookups will not work,
-    # but a single synthesized template can be deployed anywhere.
-
-    # Uncomment the next line to specialize this stack for the AWS Account
-    # and Region that are implied by the current CLI configuration.
-
-    #env=cdk.Environment(account=os.getenv('CDK_DEFAULT_ACCOUNT'), region=os.getenv('CDK_DEFAULT_REGION')),
-
-    # Uncomment the next line if you know exactly what Account and Region you
-    # want to deploy the stack to. */
-
-    #env=cdk.Environment(account='123456789012', region='us-east-1'),
-
-    # For more information, see https://docs.aws.amazon.com/cdk/latest/guide/environments.html
-    )
+# コンテキスト `regions` を指定しない場合は、環境に依存しないスタックを1つ作成する
+# 複数のリージョンを指定した場合は、リージョンごとのスタックとグローバルスタックを作成する
+create_web_app_stacks(app, account=os.getenv("CDK_DEFAULT_ACCOUNT"))
 
 app.synth()
@@ -0,0 +1,2 @@
+<?php
+echo 'Hello from CodeDeploy';
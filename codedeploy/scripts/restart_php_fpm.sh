@@ -0,0 +1,6 @@
+#!/bin/bash
+# ApplicationStart: 古いコードのOPcacheを破棄するため、PHP-FPMを再起動する
+set -euo pipefail
+
+systemctl restart php-fpm
+systemctl reload httpd
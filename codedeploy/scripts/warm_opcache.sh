@@ -0,0 +1,11 @@
+#!/bin/bash
+# BeforeAllowTraffic: ALBのターゲットグループに戻す前にOPcacheをウォームアップする
+# 最初のリクエストでPHPのコンパイルを待たないようにし、デプロイ直後のレイテンシーの悪化を防ぐ
+set -euo pipefail
+
+# インスタンス内からのみ参照できるウォームアップのPHPで、ドキュメントルートのPHPをコンパイルする
+curl -fsS --max-time 240 http://127.0.0.1/opcache-warmup
+echo
+
+# ウォームアップ後にヘルスチェックが成功することを確認する
+curl -fsS --max-time 5 -o /dev/null http://127.0.0.1/healthz
@@ -0,0 +1,63 @@
+"""API GatewayのバックエンドのLambda関数
+
+初期化処理はモジュールの読み込み時（コールドスタート時）に1回だけ行い、
+呼び出しごとの処理は最小限にする。
+"""
+
+import json
+import logging
+import os
+
+# 呼び出しごとに変わらない値はモジュールの読み込み時に準備しておく
+APP_NAME = os.environ.get("APP_NAME", "web-app")
+STAGE = os.environ.get("STAGE", "local")
+
+logger = logging.getLogger()
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
+
+_RESPONSE_HEADERS = {
+    "Content-Type": "application/json",
+    "Cache-Control": "private, no-store",
+}
+
+
+def _get_claims(event: dict) -> dict:
+    """オーソライザーが検証したJWTのクレームを取得する
+
+    REST API（Cognitoオーソライザー）とHTTP API（JWTオーソライザー）の両方に対応する
+
+    Args:
+        event (dict): API Gatewayのイベント
+    Returns:
+        dict: JWTのクレーム
+    """
+    authorizer = (event.get("requestContext") or {}).get("authorizer") or {}
+    if "jwt" in authorizer:
+        return authorizer["jwt"].get("claims") or {}
+    return authorizer.get("claims") or {}
+
+
+def handler(event: dict, context: object) -> dict:
+    """API Gatewayからのリクエストを処理する
+
+    Args:
+        event (dict): API Gatewayのイベント
+        context (object): Lambdaのコンテキスト
+    Returns:
+        dict: API Gatewayのプロキシ統合のレスポンス
+    """
+    claims = _get_claims(event)
+    body = {
+        "message": "Hello, World!",
+        "app_name": APP_NAME,
+        "stage": STAGE,
+        "user": claims.get("sub"),
+        # トークン生成前トリガーが追加したクレーム。データベースを参照せずに使える
+        "role": claims.get("role"),
+        "tenant_id": claims.get("tenant_id"),
+    }
+    return {
+        "statusCode": 200,
+        "headers": _RESPONSE_HEADERS,
+        "body": json.dumps(body),
+    }
@@ -1,2 +0,0 @@
-def hello_world(context: dict) -> str
-    return "Hello, World!"
\ No newline at end of file
@@ -0,0 +1,82 @@
+"""SQSのジョブを処理するワーカーのLambda関数
+
+Webサーバーや API Gatewayのバックエンドは重い処理（レポートの生成やメールの送信など）を
+SQSに送ってすぐに応答し、このワーカーがバッチでまとめて処理する。
+
+メッセージの本文はJSONで、`type` にジョブの種類、`payload` に引数を指定する。
+処理に失敗したメッセージだけを `batchItemFailures` で返し、バッチ全体を再実行しないようにする。
+失敗したメッセージは再試行の上限を超えるとデッドレターキューに移動する。
+"""
+
+import json
+import logging
+import os
+from typing import Callable
+
+# 呼び出しごとに変わらない値はモジュールの読み込み時に準備しておく
+APP_NAME = os.environ.get("APP_NAME", "web-app")
+STAGE = os.environ.get("STAGE", "local")
+
+logger = logging.getLogger()
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
+
+# ジョブの種類ごとの処理
+JOB_HANDLERS: dict[str, Callable[[dict], None]] = {}
+
+
+def job_handler(job_type: str) -> Callable[[Callable[[dict], None]], Callable]:
+    """ジョブの種類に処理を登録するデコレーター
+
+    Args:
+        job_type (str): ジョブの種類
+    Returns:
+        Callable: デコレーター
+    """
+
+    def register(func: Callable[[dict], None]) -> Callable[[dict], None]:
+        JOB_HANDLERS[job_type] = func
+        return func
+
+    return register
+
+
+@job_handler("log")
+def log_job(payload: dict) -> None:
+    """ペイロードをログに出力する（動作確認用のジョブ）
+
+    Args:
+        payload (dict): ジョブの引数
+    """
+    logger.info("job payload: %s", json.dumps(payload))
+
+
+def process_record(record: dict) -> None:
+    """SQSのメッセージを1件処理する
+
+    Args:
+        record (dict): SQSのメッセージ
+    """
+    body = json.loads(record["body"])
+    job_type = body.get("type")
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f"unknown job type: {job_type}")
+    JOB_HANDLERS[job_type](body.get("payload") or {})
+
+
+def handler(event: dict, context: object) -> dict:
+    """SQSのメッセージをバッチで処理する
+
+    Args:
+        event (dict): SQSのイベント
+        context (object): Lambdaのコンテキスト
+    Returns:
+        dict: 処理に失敗したメッセージ（部分的なバッチレスポンス）
+    """
+    failures = []
+    for record in event.get("Records") or []:
+        try:
+            process_record(record)
+        except Exception:
+            logger.exception("failed to process message: %s", record.get("messageId"))
+            failures.append({"itemIdentifier": record["messageId"]})
+    return {"batchItemFailures": failures}
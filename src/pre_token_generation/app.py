@@ -0,0 +1,119 @@
+"""Cognitoのトークン生成前トリガーのLambda関数
+
+ユーザーのロール、テナント、機能フラグをIDトークンとアクセストークンのクレームに追加する。
+アプリケーションはリクエストごとにデータベースを参照せずに、ALBが転送するヘッダーや
+API Gatewayのオーソライザーのクレームからこれらの値を取得できる。
+
+ロールとテナントはユーザーのカスタム属性から、機能フラグはSSMパラメータストアから取得する。
+機能フラグは呼び出しのたびに取得せず、実行環境のメモリに一定時間キャッシュする。
+"""
+
+import json
+import logging
+import os
+import time
+from typing import Callable, Optional
+
+# 呼び出しごとに変わらない値はモジュールの読み込み時に準備しておく
+FEATURE_FLAGS_PARAMETER = os.environ.get("FEATURE_FLAGS_PARAMETER")
+CACHE_TTL_SECONDS = float(os.environ.get("CLAIMS_CACHE_TTL_SECONDS", "300"))
+DEFAULT_ROLE = os.environ.get("DEFAULT_ROLE", "member")
+
+# 全テナントに適用する機能フラグのキー
+ALL_TENANTS = "*"
+
+logger = logging.getLogger()
+logger.setLevel(os.environ.get("LOG_LEVEL", "INFO"))
+
+_ssm_client = None
+_cache: dict = {"expires_at": 0.0, "value": {}}
+
+
+def _fetch_feature_flags() -> dict[str, list[str]]:
+    """SSMパラメータストアから機能フラグを取得する
+
+    Returns:
+        dict[str, list[str]]: テナントIDごとの機能フラグ
+    """
+    global _ssm_client
+    if FEATURE_FLAGS_PARAMETER is None:
+        return {}
+    if _ssm_client is None:
+        # boto3はLambdaのランタイムに含まれる。読み込みに時間がかかるため初回の取得時に読み込む
+        import boto3
+
+        _ssm_client = boto3.client("ssm")
+    response = _ssm_client.get_parameter(Name=FEATURE_FLAGS_PARAMETER)
+    return json.loads(response["Parameter"]["Value"])
+
+
+def get_feature_flags(
+    fetch: Optional[Callable[[], dict[str, list[str]]]] = None,
+    now: Optional[float] = None,
+) -> dict[str, list[str]]:
+    """キャッシュした機能フラグを取得する
+
+    キャッシュの有効期限が切れている場合だけ取得し直す。
+    取得に失敗した場合は、トークンの発行を止めないように前回の値を使い続ける
+
+    Args:
+        fetch (Optional[Callable[[], dict[str, list[str]]]]):
+            機能フラグを取得する関数。未指定の場合はSSMパラメータストアから取得する
+        now (Optional[float]): 現在時刻（単調増加の秒）。未指定の場合は現在時刻
+    Returns:
+        dict[str, list[str]]: テナントIDごとの機能フラグ
+    """
+    now = time.monotonic() if now is None else now
+    if now < _cache["expires_at"]:
+        return _cache["value"]
+    try:
+        _cache["value"] = (fetch or _fetch_feature_flags)()
+    except Exception:
+        logger.exception("failed to fetch feature flags")
+    _cache["expires_at"] = now + CACHE_TTL_SECONDS
+    return _cache["value"]
+
+
+def build_claims(
+    user_attributes: dict[str, str], feature_flags: dict[str, list[str]]
+) -> dict[str, str]:
+    """トークンに追加するクレームを作成する
+
+    Args:
+        user_attributes (dict[str, str]): ユーザーの属性
+        feature_flags (dict[str, list[str]]): テナントIDごとの機能フラグ
+    Returns:
+        dict[str, str]: 追加するクレーム
+    """
+    role = user_attributes.get("custom:role") or DEFAULT_ROLE
+    tenant_id = user_attributes.get("custom:tenant_id") or ""
+    features = sorted(
+        set(feature_flags.get(ALL_TENANTS, []))
+        | set(feature_flags.get(tenant_id, []) if tenant_id else [])
+    )
+    # ALBのヘッダーやREST APIのオーソライザーでも扱いやすいように文字列にする
+    return {
+        "role": role,
+        "tenant_id": tenant_id,
+        "features": ",".join(features),
+    }
+
+
+def handler(event: dict, context: object) -> dict:
+    """トークンの生成前にクレームを追加する
+
+    Args:
+        event (dict): トークン生成前トリガーのイベント（バージョン2）
+        context (object): Lambdaのコンテキスト
+    Returns:
+        dict: クレームを追加したイベント
+    """
+    user_attributes = (event.get("request") or {}).get("userAttributes") or {}
+    claims = build_claims(user_attributes, get_feature_flags())
+    event["response"] = {
+        "claimsAndScopeOverrideDetails": {
+            "idTokenGeneration": {"claimsToAddOrOverride": claims},
+            "accessTokenGeneration": {"claimsToAddOrOverride": claims},
+        }
+    }
+    return event
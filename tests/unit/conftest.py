@@ -0,0 +1,64 @@
+"""スタックのテストで共有するフィクスチャ
+
+WebAppStackのsynthはjsiiの呼び出しが多く時間がかかるため、同じコンテキストのスタックは
+テストのセッション（pytest-xdistの場合はワーカーのプロセス）ごとに1回だけsynthして共有する。
+Templateは読み取り専用で使うこと。
+"""
+
+from typing import Callable
+
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+import pytest
+
+from web_app.web_app_stack import WebAppStack
+
+BASE_CONTEXT = {
+    "app_name": "sample",
+    "stage": "test",
+    "key_pair": "test-key-pair",
+    "certificate_arn": (
+        "arn:aws:acm:ap-northeast-1:123456789012:certificate/"
+        "00000000-0000-0000-0000-000000000000"
+    ),
+}
+
+
+def build_stack(**context) -> WebAppStack:
+    """ベースのコンテキストにコンテキストを上書きしてスタックを構築する
+
+    Args:
+        **context: 上書きするコンテキスト
+    Returns:
+        WebAppStack: スタック
+    """
+    app = core.App(context={**BASE_CONTEXT, **context})
+    return WebAppStack(app, "web-app")
+
+
+@pytest.fixture(scope="session")
+def synth_stack() -> Callable[..., WebAppStack]:
+    """コンテキストごとにキャッシュしたスタックを返す関数"""
+    stacks: dict[tuple, WebAppStack] = {}
+
+    def _synth_stack(**context) -> WebAppStack:
+        key = tuple(sorted(context.items()))
+        if key not in stacks:
+            stacks[key] = build_stack(**context)
+        return stacks[key]
+
+    return _synth_stack
+
+
+@pytest.fixture(scope="session")
+def synth(synth_stack) -> Callable[..., assertions.Template]:
+    """コンテキストごとにキャッシュしたTemplateを返す関数"""
+    templates: dict[tuple, assertions.Template] = {}
+
+    def _synth(**context) -> assertions.Template:
+        key = tuple(sorted(context.items()))
+        if key not in templates:
+            templates[key] = assertions.Template.from_stack(synth_stack(**context))
+        return templates[key]
+
+    return _synth
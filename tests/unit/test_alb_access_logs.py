@@ -0,0 +1,85 @@
+import aws_cdk.assertions as assertions
+import pytest
+
+
+def test_access_logs_are_written_to_lifecycle_managed_bucket(synth):
+    template = synth(alb_access_log_retention_days="180")
+
+    template.has_resource_properties(
+        "AWS::S3::Bucket",
+        {
+            "BucketEncryption": {
+                "ServerSideEncryptionConfiguration": [
+                    {"ServerSideEncryptionByDefault": {"SSEAlgorithm": "AES256"}}
+                ]
+            },
+            "LifecycleConfiguration": {
+                "Rules": [
+                    assertions.Match.object_like(
+                        {
+                            "ExpirationInDays": 180,
+                            "Transitions": [
+                                {"StorageClass": "STANDARD_IA", "TransitionInDays": 30}
+                            ],
+                        }
+                    )
+                ]
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::LoadBalancer",
+        {
+            "LoadBalancerAttributes": assertions.Match.array_with(
+                [
+                    {"Key": "access_logs.s3.enabled", "Value": "true"},
+                    {"Key": "access_logs.s3.prefix", "Value": "alb"},
+                ]
+            )
+        },
+    )
+    template.has_resource_properties(
+        "AWS::S3::BucketPolicy",
+        {
+            "PolicyDocument": {
+                "Statement": assertions.Match.array_with(
+                    [
+                        assertions.Match.object_like(
+                            {
+                                "Action": "s3:PutObject",
+                                "Principal": assertions.Match.object_like(
+                                    {
+                                        "Service": (
+                                            "logdelivery.elasticloadbalancing"
+                                            ".amazonaws.com"
+                                        )
+                                    }
+                                ),
+                            }
+                        )
+                    ]
+                )
+            }
+        },
+    )
+    assert "Elbv2AccountMap" in template.to_json()["Mappings"]
+
+
+def test_access_logs_can_be_disabled(synth):
+    template = synth(alb_access_logs_enabled="false")
+
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::LoadBalancer",
+        {
+            "LoadBalancerAttributes": assertions.Match.not_(
+                assertions.Match.array_with(
+                    [{"Key": "access_logs.s3.enabled", "Value": "true"}]
+                )
+            )
+        },
+    )
+
+
+def test_retention_must_outlive_infrequent_access_transition(synth):
+    with pytest.raises(ValueError, match="retention_days"):
+        synth(alb_access_log_retention_days="30")
@@ -0,0 +1,112 @@
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+from tools import analyze_alb_logs
+
+FIXTURE_DIR = Path(__file__).resolve().parents[1] / "fixtures" / "alb_logs"
+
+
+def exact_quantile(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[int(q * (len(ordered) - 1))]
+
+
+def test_sketch_quantiles_are_within_relative_accuracy():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(-3, 1) for _ in range(20000)]
+    sketch = analyze_alb_logs.LatencySketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.5, 0.9, 0.99, 0.999):
+        expected = exact_quantile(values, q)
+        assert sketch.quantile(q) == pytest.approx(expected, rel=0.01)
+    # メモリ使用量は件数ではなく値の範囲の対数に比例する
+    assert len(sketch._buckets) < 1000
+
+
+def test_merged_sketch_equals_single_sketch():
+    rng = random.Random(1)
+    values = [rng.expovariate(10) for _ in range(5000)]
+    single = analyze_alb_logs.LatencySketch()
+    first = analyze_alb_logs.LatencySketch()
+    second = analyze_alb_logs.LatencySketch()
+    for index, value in enumerate(values):
+        single.add(value)
+        (first if index % 2 else second).add(value)
+    first.merge(second)
+
+    assert first.count == single.count
+    for q in (0.5, 0.99):
+        assert first.quantile(q) == single.quantile(q)
+    with pytest.raises(ValueError):
+        first.merge(analyze_alb_logs.LatencySketch(relative_accuracy=0.05))
+
+
+def test_parse_line_and_normalize_path():
+    line = (FIXTURE_DIR / "20240101T0000Z_sample.log").read_text().splitlines()[4]
+    record = analyze_alb_logs.parse_line(line)
+
+    assert record.path == "/member/index.php"
+    assert record.target == "-"
+    assert record.elb_status_code == 302
+    assert record.latency is None
+    assert record.actions_executed == ("authenticate",)
+    assert analyze_alb_logs.parse_line("not an access log") is None
+    assert (
+        analyze_alb_logs.normalize_path(
+            "/items/123/reviews/0b6a1c39-5f4e-4d7b-9c1f-2a3b4c5d6e7f?sort=new"
+        )
+        == "/items/{id}/reviews/{id}"
+    )
+
+
+def test_analyze_fixture_logs():
+    report = analyze_alb_logs.analyze([str(FIXTURE_DIR)]).to_dict()
+
+    assert report["period"] == {
+        "start": "2024-01-01T00:00:00",
+        "end": "2024-01-01T00:01:20",
+    }
+    assert report["total"]["requests"] == 9
+    assert report["total"]["errors_5xx"] == 1
+    assert report["paths"]["/"]["requests"] == 3
+    assert report["paths"]["/items/{id}"]["requests"] == 2
+    assert report["paths"]["/items/{id}"]["latency_ms"]["p50"] == pytest.approx(
+        61, rel=0.01
+    )
+    assert report["targets"]["10.0.1.10:80"]["requests"] == 4
+    assert report["targets"]["10.0.2.10:80"]["errors_5xx"] == 1
+    assert report["auth"] == {
+        "path_pattern": "/member/*",
+        "requests": 4,
+        "redirects": 2,
+        "redirect_ratio": 0.5,
+    }
+
+
+def test_reports_can_be_merged_per_file():
+    merged = analyze_alb_logs.AccessLogReport()
+    for file in sorted(FIXTURE_DIR.iterdir()):
+        merged.merge(analyze_alb_logs.analyze([str(file)]))
+
+    assert merged.to_dict() == analyze_alb_logs.analyze([str(FIXTURE_DIR)]).to_dict()
+
+
+def test_path_cardinality_is_bounded():
+    report = analyze_alb_logs.analyze([str(FIXTURE_DIR)], max_paths=2)
+
+    assert len(report.paths) == 3
+    assert analyze_alb_logs.OTHER_PATHS in report.paths
+    assert sum(stats.count for stats in report.paths.values()) == 9
+
+
+def test_boto3_is_not_imported_for_local_logs(capsys):
+    sys.modules.pop("boto3", None)
+
+    assert analyze_alb_logs.main([str(FIXTURE_DIR), "--top", "1"]) == 0
+    assert '"redirect_ratio": 0.5' in capsys.readouterr().out
+    assert "boto3" not in sys.modules
@@ -0,0 +1,120 @@
+import aws_cdk.assertions as assertions
+import pytest
+
+
+def test_rest_api_is_hardened(synth):
+    template = synth(
+        api_authorizer_cache_ttl_seconds="600",
+        api_minimum_compression_size_bytes="2048",
+        api_throttling_rate_limit="100",
+        api_throttling_burst_limit="200",
+        api_method_throttling='{"GET /": {"rate_limit": 50, "burst_limit": 80}}',
+    )
+
+    template.resource_count_is("AWS::ApiGatewayV2::Api", 0)
+    template.has_resource_properties(
+        "AWS::ApiGateway::Authorizer",
+        {"Type": "COGNITO_USER_POOLS", "AuthorizerResultTtlInSeconds": 600},
+    )
+    template.has_resource_properties(
+        "AWS::ApiGateway::RestApi", {"MinimumCompressionSize": 2048}
+    )
+    template.has_resource_properties(
+        "AWS::ApiGateway::Stage",
+        {
+            "MethodSettings": assertions.Match.array_with(
+                [
+                    {
+                        "HttpMethod": "*",
+                        "ResourcePath": "/*",
+                        "DataTraceEnabled": False,
+                        "ThrottlingRateLimit": 100,
+                        "ThrottlingBurstLimit": 200,
+                    },
+                    {
+                        "HttpMethod": "GET",
+                        "ResourcePath": "/",
+                        "DataTraceEnabled": False,
+                        "ThrottlingRateLimit": 50,
+                        "ThrottlingBurstLimit": 80,
+                    },
+                ]
+            ),
+        },
+    )
+
+
+def test_rest_api_method_cache_is_keyed_per_user(synth):
+    template = synth(api_cache_enabled="true", api_cache_ttl_seconds="30")
+
+    template.has_resource_properties(
+        "AWS::ApiGateway::Stage",
+        {
+            "CacheClusterEnabled": True,
+            "CacheClusterSize": "0.5",
+            "MethodSettings": assertions.Match.array_with(
+                [
+                    assertions.Match.object_like(
+                        {"CachingEnabled": True, "CacheTtlInSeconds": 30}
+                    )
+                ]
+            ),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {
+            "HttpMethod": "GET",
+            "RequestParameters": {"method.request.header.Authorization": True},
+            "Integration": {
+                "CacheKeyParameters": ["method.request.header.Authorization"]
+            },
+        },
+    )
+
+
+def test_http_api_with_jwt_authorizer(synth):
+    template = synth(
+        api_type="http",
+        api_throttling_rate_limit="100",
+        api_throttling_burst_limit="200",
+        api_method_throttling='{"GET /": {"rate_limit": 50, "burst_limit": 80}}',
+    )
+
+    template.resource_count_is("AWS::ApiGateway::RestApi", 0)
+    template.has_resource_properties("AWS::ApiGatewayV2::Api", {"ProtocolType": "HTTP"})
+    template.has_resource_properties(
+        "AWS::ApiGatewayV2::Authorizer",
+        {
+            "AuthorizerType": "JWT",
+            "IdentitySource": ["$request.header.Authorization"],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ApiGatewayV2::Route",
+        {"RouteKey": "GET /", "AuthorizationType": "JWT"},
+    )
+    template.has_resource_properties(
+        "AWS::ApiGatewayV2::Stage",
+        {
+            "StageName": "$default",
+            "AutoDeploy": True,
+            "DefaultRouteSettings": {
+                "ThrottlingRateLimit": 100,
+                "ThrottlingBurstLimit": 200,
+            },
+            "RouteSettings": {
+                "GET /": {"ThrottlingRateLimit": 50, "ThrottlingBurstLimit": 80}
+            },
+        },
+    )
+
+
+def test_invalid_api_type(synth):
+    with pytest.raises(ValueError, match="api_type"):
+        synth(api_type="websocket")
+
+
+def test_invalid_method_throttling(synth):
+    with pytest.raises(ValueError, match="route key"):
+        synth(api_method_throttling='{"/": {"rate_limit": 1}}')
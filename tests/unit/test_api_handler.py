@@ -0,0 +1,94 @@
+import json
+
+import aws_cdk.assertions as assertions
+
+from tools.bench_lambda_handler import load_handler, main, run
+
+
+def test_handler_with_rest_api_claims():
+    handler = load_handler()
+
+    response = handler(
+        {"requestContext": {"authorizer": {"claims": {"sub": "user-1"}}}}, None
+    )
+
+    assert response["statusCode"] == 200
+    assert json.loads(response["body"])["user"] == "user-1"
+
+
+def test_handler_with_http_api_claims():
+    handler = load_handler()
+
+    response = handler(
+        {"requestContext": {"authorizer": {"jwt": {"claims": {"sub": "user-2"}}}}},
+        None,
+    )
+
+    assert json.loads(response["body"])["user"] == "user-2"
+
+
+def test_function_defaults_to_arm64_with_alias(synth):
+    template = synth()
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": "api_handler.app.handler",
+            "Architectures": ["arm64"],
+            "MemorySize": 256,
+        },
+    )
+    template.resource_count_is("AWS::Lambda::Version", 1)
+    template.has_resource_properties(
+        "AWS::Lambda::Alias",
+        {
+            "Name": "live",
+            "ProvisionedConcurrencyConfig": assertions.Match.absent(),
+        },
+    )
+    # API Gatewayからはエイリアスを呼び出す
+    template.has_resource_properties(
+        "AWS::ApiGateway::Method",
+        {
+            "Integration": {
+                "Uri": {
+                    "Fn::Join": [
+                        "",
+                        assertions.Match.array_with(
+                            [{"Ref": assertions.Match.string_like_regexp("alias")}]
+                        ),
+                    ]
+                }
+            }
+        },
+    )
+
+
+def test_function_with_provisioned_concurrency(synth):
+    template = synth(
+        lambda_memory_size="1024",
+        lambda_architecture="x86_64",
+        lambda_provisioned_concurrency="2",
+    )
+
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {"Architectures": ["x86_64"], "MemorySize": 1024},
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Alias",
+        {"ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": 2}},
+    )
+
+
+def test_cold_start_benchmark():
+    result = run(repeat=1, iterations=100)
+
+    # CI環境の揺らぎを考慮した緩い予算
+    assert result["import_ms"]["median"] < 1000
+    assert result["warm_ms"]["p99"] < 10
+
+
+def test_benchmark_fails_over_budget(capsys):
+    assert main(["--repeat", "1", "--iterations", "10", "--max-import-ms", "0"]) == 1
+    assert "import_ms.median" in capsys.readouterr().err
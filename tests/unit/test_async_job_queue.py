@@ -0,0 +1,123 @@
+import json
+
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+import pytest
+
+from tools.bench_lambda_handler import load_handler
+from web_app.lib.sqs.async_job_queue import AsyncJobQueue
+
+
+def test_worker_reports_only_failed_messages():
+    handler = load_handler("job_worker.app")
+    event = {
+        "Records": [
+            {"messageId": "1", "body": json.dumps({"type": "log", "payload": {}})},
+            {"messageId": "2", "body": json.dumps({"type": "unknown"})},
+            {"messageId": "3", "body": "not json"},
+            {"messageId": "4", "body": json.dumps({"type": "log"})},
+        ]
+    }
+
+    response = handler(event, None)
+
+    assert response == {
+        "batchItemFailures": [{"itemIdentifier": "2"}, {"itemIdentifier": "3"}]
+    }
+
+
+def test_jobs_are_off_by_default(synth):
+    template = synth()
+
+    template.resource_count_is("AWS::SQS::Queue", 0)
+    template.resource_count_is("AWS::Lambda::EventSourceMapping", 0)
+
+
+def test_jobs_create_queue_worker_and_send_permissions(synth):
+    template = synth(
+        jobs_enabled="true",
+        jobs_batch_size="100",
+        jobs_max_batching_window_seconds="5",
+        jobs_max_concurrency="20",
+        jobs_worker_timeout_seconds="30",
+    )
+
+    template.resource_count_is("AWS::SQS::Queue", 2)
+    template.has_resource_properties(
+        "AWS::SQS::Queue",
+        {
+            "QueueName": "sample-test-job-queue",
+            "VisibilityTimeout": 185,
+            "ReceiveMessageWaitTimeSeconds": 20,
+            "RedrivePolicy": {
+                "deadLetterTargetArn": assertions.Match.any_value(),
+                "maxReceiveCount": 3,
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::EventSourceMapping",
+        {
+            "BatchSize": 100,
+            "MaximumBatchingWindowInSeconds": 5,
+            "ScalingConfig": {"MaximumConcurrency": 20},
+            "FunctionResponseTypes": ["ReportBatchItemFailures"],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {"Handler": "job_worker.app.handler", "Timeout": 30},
+    )
+    # WebサーバーとAPI Gatewayのバックエンドがジョブを送れる
+    for role in ("webec2role", "lambdahandler"):
+        template.has_resource_properties(
+            "AWS::IAM::Policy",
+            {
+                "PolicyDocument": {
+                    "Statement": assertions.Match.array_with(
+                        [
+                            assertions.Match.object_like(
+                                {
+                                    "Action": assertions.Match.array_with(
+                                        ["sqs:SendMessage"]
+                                    )
+                                }
+                            )
+                        ]
+                    )
+                },
+                "Roles": [{"Ref": assertions.Match.string_like_regexp(role)}],
+            },
+        )
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": "api_handler.app.handler",
+            "Environment": {
+                "Variables": assertions.Match.object_like(
+                    {"JOB_QUEUE_URL": assertions.Match.any_value()}
+                )
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm", {"AlarmName": "sample-test-job-dlq-messages"}
+    )
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        {"batch_size": 0},
+        {"batch_size": 100},
+        {"max_batching_window_seconds": 301},
+        {"max_concurrency": 1},
+        {"max_receive_count": 0},
+        {"architecture": "sparc"},
+    ],
+)
+def test_invalid_job_queue_is_rejected(kwargs):
+    stack = core.Stack(core.App(), "stack")
+
+    with pytest.raises(ValueError):
+        AsyncJobQueue(stack, "sample", "test", **kwargs)
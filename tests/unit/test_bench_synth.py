@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from tools import bench_synth
+
+
+def test_parse_context():
+    assert bench_synth.parse_context(["stage=prod", "stage_profiles={}"]) == {
+        "stage": "prod",
+        "stage_profiles": "{}",
+    }
+    with pytest.raises(ValueError):
+        bench_synth.parse_context(["stage"])
+
+
+def test_benchmark_reports_phases_and_fails_over_budget(monkeypatch, capsys):
+    calls = []
+
+    def measure_synth_time(context, repeat):
+        calls.append(context)
+        return [{"import": 2.0, "construct": 0.5, "synth": 0.5}] * repeat
+
+    monkeypatch.setattr(bench_synth, "measure_synth_time", measure_synth_time)
+
+    assert bench_synth.main(["-c", "stage=prod", "--max-total-seconds", "2.5"]) == 1
+    result = json.loads(capsys.readouterr().out)
+    assert result["seconds"]["total"] == 3.0
+    assert result["context"]["stage"] == "prod"
+    # cdk.jsonの機能フラグもCDK CLIと同様に渡す
+    assert calls[0]["@aws-cdk/core:checkSecretUsage"] is True
@@ -0,0 +1,135 @@
+import importlib
+
+import aws_cdk.assertions as assertions
+import pytest
+
+from tools.bench_lambda_handler import load_handler
+
+MODULE = "pre_token_generation.app"
+
+
+@pytest.fixture
+def trigger():
+    load_handler(MODULE)
+    module = importlib.import_module(MODULE)
+    module._cache.update(expires_at=0.0, value={})
+    yield module
+    module._cache.update(expires_at=0.0, value={})
+
+
+def test_trigger_adds_claims_to_id_and_access_tokens(trigger, monkeypatch):
+    monkeypatch.setattr(
+        trigger,
+        "_fetch_feature_flags",
+        lambda: {"*": ["search"], "tenant-1": ["export", "search"]},
+    )
+    event = {
+        "triggerSource": "TokenGeneration_HostedAuth",
+        "request": {
+            "userAttributes": {
+                "sub": "user-1",
+                "custom:role": "admin",
+                "custom:tenant_id": "tenant-1",
+            }
+        },
+        "response": {},
+    }
+
+    response = trigger.handler(event, None)["response"]
+
+    details = response["claimsAndScopeOverrideDetails"]
+    expected = {"role": "admin", "tenant_id": "tenant-1", "features": "export,search"}
+    assert details["idTokenGeneration"]["claimsToAddOrOverride"] == expected
+    assert details["accessTokenGeneration"]["claimsToAddOrOverride"] == expected
+
+
+def test_claims_default_to_member_without_tenant(trigger):
+    claims = trigger.build_claims({"sub": "user-1"}, {"tenant-1": ["export"]})
+
+    assert claims == {"role": "member", "tenant_id": "", "features": ""}
+
+
+def test_feature_flags_are_cached_until_ttl(trigger):
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("unavailable")
+        return {"*": ["search"]}
+
+    assert trigger.get_feature_flags(fetch, now=0) == {"*": ["search"]}
+    assert trigger.get_feature_flags(fetch, now=trigger.CACHE_TTL_SECONDS - 1) == {
+        "*": ["search"]
+    }
+    assert len(calls) == 1
+    # 取得に失敗してもトークンの発行を止めずに前回の値を使う
+    assert trigger.get_feature_flags(fetch, now=trigger.CACHE_TTL_SECONDS) == {
+        "*": ["search"]
+    }
+    assert len(calls) == 2
+
+
+def test_app_claims_are_off_by_default(synth):
+    template = synth()
+
+    template.has_resource_properties(
+        "AWS::Cognito::UserPool", {"LambdaConfig": assertions.Match.absent()}
+    )
+    template.resource_count_is("AWS::SSM::Parameter", 0)
+
+
+def test_app_claims_attach_v2_trigger(synth):
+    template = synth(
+        cognito_app_claims_enabled="true",
+        cognito_feature_flags='{"*": ["search"]}',
+        cognito_claims_cache_ttl_seconds="60",
+    )
+
+    template.has_resource_properties(
+        "AWS::Cognito::UserPool",
+        {
+            "UserPoolTier": "ESSENTIALS",
+            "LambdaConfig": {
+                "PreTokenGenerationConfig": {
+                    "LambdaArn": assertions.Match.any_value(),
+                    "LambdaVersion": "V2_0",
+                }
+            },
+            "Schema": assertions.Match.array_with(
+                [
+                    assertions.Match.object_like(
+                        {"Name": "role", "AttributeDataType": "String"}
+                    ),
+                    assertions.Match.object_like(
+                        {"Name": "tenant_id", "AttributeDataType": "String"}
+                    ),
+                ]
+            ),
+        },
+    )
+    template.has_resource_properties(
+        "AWS::SSM::Parameter",
+        {"Name": "/sample/test/feature-flags", "Value": '{"*": ["search"]}'},
+    )
+    template.has_resource_properties(
+        "AWS::Lambda::Function",
+        {
+            "Handler": "pre_token_generation.app.handler",
+            "Timeout": 5,
+            "Environment": {
+                "Variables": assertions.Match.object_like(
+                    {
+                        "CLAIMS_CACHE_TTL_SECONDS": "60",
+                        "FEATURE_FLAGS_PARAMETER": assertions.Match.any_value(),
+                    }
+                )
+            },
+        },
+    )
+    # ユーザー自身はロールとテナントを書き換えられない
+    clients = template.find_resources("AWS::Cognito::UserPoolClient")
+    (client,) = clients.values()
+    write_attributes = client["Properties"]["WriteAttributes"]
+    assert "email" in write_attributes
+    assert not any(name.startswith("custom:") for name in write_attributes)
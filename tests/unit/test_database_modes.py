@@ -0,0 +1,79 @@
+import json
+
+import aws_cdk.assertions as assertions
+import pytest
+
+
+def launch_template_user_data(template: assertions.Template) -> str:
+    launch_templates = template.find_resources("AWS::EC2::LaunchTemplate")
+    (launch_template,) = launch_templates.values()
+    return json.dumps(launch_template["Properties"]["LaunchTemplateData"]["UserData"])
+
+
+def test_single_mode(synth):
+    template = synth()
+
+    template.resource_count_is("AWS::RDS::DBInstance", 1)
+    template.resource_count_is("AWS::RDS::DBCluster", 0)
+    user_data = launch_template_user_data(template)
+    assert "DB_HOST" in user_data
+    assert "DB_READ_HOSTS" in user_data
+
+
+def test_replicas_mode(synth):
+    template = synth(db_mode="replicas", db_read_replica_count="2")
+
+    template.resource_count_is("AWS::RDS::DBInstance", 3)
+    template.resource_properties_count_is(
+        "AWS::RDS::DBInstance",
+        {"SourceDBInstanceIdentifier": assertions.Match.any_value()},
+        2,
+    )
+    user_data = launch_template_user_data(template)
+    assert "rdsreplica1" in user_data
+    assert "rdsreplica2" in user_data
+
+
+def test_aurora_mode(synth):
+    template = synth(
+        db_mode="aurora",
+        db_aurora_min_acu="1",
+        db_aurora_max_acu="8",
+        db_aurora_reader_count="2",
+    )
+
+    template.has_resource_properties(
+        "AWS::RDS::DBCluster",
+        {
+            "Engine": "aurora-postgresql",
+            "ServerlessV2ScalingConfiguration": {"MinCapacity": 1, "MaxCapacity": 8},
+        },
+    )
+    template.resource_properties_count_is(
+        "AWS::RDS::DBInstance", {"DBInstanceClass": "db.serverless"}, 3
+    )
+    user_data = launch_template_user_data(template)
+    assert "Endpoint.Address" in user_data
+    assert "ReadEndpoint.Address" in user_data
+
+
+def test_aurora_mode_with_proxy_reader_endpoint(synth):
+    template = synth(db_mode="aurora", db_proxy_enabled="true")
+
+    template.has_resource_properties(
+        "AWS::RDS::DBProxyTargetGroup",
+        {"DBClusterIdentifiers": [{"Ref": assertions.Match.any_value()}]},
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBProxyEndpoint", {"TargetRole": "READ_ONLY"}
+    )
+
+
+def test_invalid_db_mode(synth):
+    with pytest.raises(ValueError, match="db_mode"):
+        synth(db_mode="sharded")
+
+
+def test_invalid_acu_range(synth):
+    with pytest.raises(ValueError, match="ACU"):
+        synth(db_mode="aurora", db_aurora_min_acu="4", db_aurora_max_acu="2")
@@ -0,0 +1,146 @@
+import aws_cdk.assertions as assertions
+import pytest
+from aws_cdk import aws_ec2 as ec2
+
+from web_app.lib.context.stage_profile import build_stage_profile
+from web_app.lib.ec2.instance_types import INSTANCE_SPECS
+from web_app.lib.rds.rds_utils import get_postgres_parameters
+
+
+@pytest.mark.parametrize(
+    "instance_type, shared_buffers, effective_cache_size, max_connections, work_mem",
+    [
+        ("t4g.micro", 32768, 98304, 100, 3932),
+        ("t4g.small", 65536, 196608, 128, 6144),
+        ("t4g.medium", 131072, 393216, 256, 6144),
+        ("m7g.large", 262144, 786432, 512, 6144),
+        ("r7g.large", 524288, 1572864, 1024, 6144),
+        ("m7g.2xlarge", 1048576, 3145728, 2048, 6144),
+        ("r7g.4xlarge", 4194304, 12582912, 5000, 10066),
+    ],
+)
+def test_postgres_parameters_per_instance_class(
+    instance_type, shared_buffers, effective_cache_size, max_connections, work_mem
+):
+    parameters = get_postgres_parameters(ec2.InstanceType(instance_type))
+
+    assert parameters["shared_buffers"] == str(shared_buffers)
+    assert parameters["effective_cache_size"] == str(effective_cache_size)
+    assert parameters["max_connections"] == str(max_connections)
+    assert parameters["work_mem"] == str(work_mem)
+    assert parameters["shared_preload_libraries"] == "pg_stat_statements"
+
+
+@pytest.mark.parametrize("instance_type", sorted(INSTANCE_SPECS))
+def test_postgres_parameters_fit_in_memory(instance_type):
+    parameters = get_postgres_parameters(ec2.InstanceType(instance_type))
+    memory_kib = INSTANCE_SPECS[instance_type].memory_mib * 1024
+
+    # shared_buffersとeffective_cache_sizeは8KB単位、work_memはKB単位
+    assert int(parameters["shared_buffers"]) * 8 == memory_kib // 4
+    assert int(parameters["effective_cache_size"]) * 8 == memory_kib * 3 // 4
+    assert 100 <= int(parameters["max_connections"]) <= 5000
+    work_mem_total = int(parameters["work_mem"]) * int(parameters["max_connections"])
+    # 全接続が2つずつwork_memを使ってもshared_buffers以外のメモリに収まる
+    assert work_mem_total * 2 <= memory_kib * 3 // 4
+
+
+def test_performance_option_is_off_by_default(synth):
+    template = synth()
+
+    template.resource_count_is("AWS::RDS::DBParameterGroup", 0)
+    template.has_resource_properties(
+        "AWS::RDS::DBInstance",
+        {
+            "EnablePerformanceInsights": assertions.Match.absent(),
+            "MonitoringInterval": assertions.Match.absent(),
+            "MultiAZ": False,
+        },
+    )
+
+
+def test_performance_option_tunes_instance(synth):
+    template = synth(db_performance_enabled="true", db_multi_az="true")
+
+    template.has_resource_properties(
+        "AWS::RDS::DBParameterGroup",
+        {
+            "Family": "postgres17",
+            "Parameters": {
+                "shared_buffers": "32768",
+                "effective_cache_size": "98304",
+                "max_connections": "100",
+                "work_mem": "3932",
+                "shared_preload_libraries": "pg_stat_statements",
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBInstance",
+        {
+            "DBParameterGroupName": {
+                "Ref": assertions.Match.string_like_regexp("dbparametergroup")
+            },
+            "StorageType": "gp3",
+            "EnablePerformanceInsights": True,
+            "PerformanceInsightsRetentionPeriod": 7,
+            "MonitoringInterval": 60,
+            "MonitoringRoleArn": assertions.Match.any_value(),
+            "MultiAZ": True,
+        },
+    )
+
+
+def test_prod_profile_provisions_gp3_iops_and_throughput(synth):
+    template = synth(stage="prod", db_mode="replicas")
+
+    template.resource_count_is("AWS::RDS::DBParameterGroup", 1)
+    template.has_resource_properties(
+        "AWS::RDS::DBParameterGroup",
+        {"Parameters": {"shared_buffers": "262144", "max_connections": "512"}},
+    )
+    # リードレプリカもレプリケーション元と同じパラメータグループとストレージにする
+    instances = template.find_resources(
+        "AWS::RDS::DBInstance",
+        {
+            "Properties": {
+                "DBInstanceClass": "db.m7g.large",
+                "StorageType": "gp3",
+                "Iops": 12000,
+                "StorageThroughput": 500,
+                "EnablePerformanceInsights": True,
+                "DBParameterGroupName": assertions.Match.any_value(),
+            }
+        },
+    )
+    assert len(instances) == 2
+
+
+def test_aurora_gets_performance_insights_without_parameter_group(synth):
+    template = synth(db_mode="aurora", db_performance_enabled="true")
+
+    template.resource_count_is("AWS::RDS::DBParameterGroup", 0)
+    template.has_resource_properties(
+        "AWS::RDS::DBCluster",
+        {"PerformanceInsightsEnabled": True, "PerformanceInsightsRetentionPeriod": 7},
+    )
+    template.has_resource_properties("AWS::RDS::DBInstance", {"MonitoringInterval": 60})
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"storage_iops": 12000},
+        {"allocated_storage_gib": 400, "storage_iops": 3000},
+        {"allocated_storage_gib": 400, "storage_throughput_mibps": 5000},
+        {
+            "allocated_storage_gib": 400,
+            "storage_iops": 12000,
+            "storage_throughput_mibps": 4000,
+        },
+        {"monitoring_interval_seconds": 45},
+    ],
+)
+def test_invalid_db_storage_is_rejected(overrides):
+    with pytest.raises(ValueError):
+        build_stage_profile("dev", {"db": overrides})
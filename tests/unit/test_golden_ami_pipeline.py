@@ -0,0 +1,98 @@
+import json
+
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+import pytest
+from aws_cdk import aws_ec2 as ec2
+
+from web_app.lib.imagebuilder.golden_ami_pipeline import GoldenAmiPipeline
+
+
+def launch_template_user_data(template: assertions.Template) -> str:
+    launch_templates = template.find_resources("AWS::EC2::LaunchTemplate")
+    (launch_template,) = launch_templates.values()
+    return json.dumps(launch_template["Properties"]["LaunchTemplateData"]["UserData"])
+
+
+def test_boot_mode_installs_packages_at_boot(synth):
+    template = synth()
+
+    template.resource_count_is("AWS::ImageBuilder::Image", 0)
+    assert "dnf update -y" in launch_template_user_data(template)
+
+
+def test_bake_mode_builds_image_and_uses_it(synth):
+    template = synth(web_image_mode="bake")
+
+    template.resource_count_is("AWS::ImageBuilder::Component", 1)
+    template.resource_count_is("AWS::ImageBuilder::ImagePipeline", 1)
+    template.resource_count_is("AWS::ImageBuilder::Image", 1)
+    template.has_resource_properties(
+        "AWS::ImageBuilder::Component",
+        {"Data": assertions.Match.string_like_regexp("dnf update -y")},
+    )
+    template.has_resource_properties(
+        "AWS::EC2::LaunchTemplate",
+        {
+            "LaunchTemplateData": {
+                "ImageId": {
+                    "Fn::GetAtt": [
+                        assertions.Match.string_like_regexp("webimage"),
+                        "ImageId",
+                    ]
+                },
+            },
+        },
+    )
+
+    user_data = launch_template_user_data(template)
+    assert "dnf update -y" not in user_data
+    # AMIで起動済みのApacheとPHP-FPMに、起動時に書き込んだ設定を反映する
+    assert "systemctl restart php-fpm httpd" in user_data
+    assert user_data.index("Alias /livez") < user_data.index("systemctl restart")
+
+
+def test_bake_mode_with_fixed_instances(synth):
+    template = synth(web_image_mode="bake", web_fleet_mode="instance")
+
+    template.has_resource_properties(
+        "AWS::EC2::Instance",
+        {
+            "ImageId": {
+                "Fn::GetAtt": [
+                    assertions.Match.string_like_regexp("webimage"),
+                    "ImageId",
+                ]
+            },
+        },
+    )
+
+
+def test_invalid_image_mode(synth):
+    with pytest.raises(ValueError, match="image_mode"):
+        synth(web_image_mode="container")
+
+
+def versions(**kwargs) -> tuple[str, str]:
+    stack = core.Stack(core.App())
+    pipeline = GoldenAmiPipeline(
+        stack,
+        "sample",
+        "test",
+        ec2.Vpc(stack, "vpc"),
+        instance_type=ec2.InstanceType("t3a.micro"),
+        **kwargs,
+    )
+    return pipeline.get_component().version, pipeline.get_image_recipe().version
+
+
+def test_recipe_version_follows_every_recipe_input():
+    component, recipe = versions()
+
+    # コンポーネントが同じでも、ベースのイメージやボリュームが変われば別のレシピのバージョン
+    assert versions(volume_size_gib=20)[0] == component
+    assert versions(volume_size_gib=20)[1] != recipe
+    assert versions(parent_image="amazon-linux-2023-arm64")[1] != recipe
+    assert versions(php_redis=True)[0] != component
+    assert versions(php_redis=True)[1] != recipe
+    assert versions() == (component, recipe)
@@ -0,0 +1,168 @@
+import asyncio
+import json
+import sys
+
+import pytest
+
+from tools import load_test
+
+
+def test_local_user_pool_issues_and_verifies_id_tokens():
+    user_pool = load_test.LocalUserPool()
+    username = user_pool.sign_up("user@example.com", "password")
+    parameters = {
+        "USERNAME": "user@example.com",
+        "PASSWORD": "password",
+        "SECRET_HASH": load_test.secret_hash(
+            "user@example.com", user_pool.client_id, user_pool.client_secret
+        ),
+    }
+
+    result = user_pool.initiate_auth(
+        AuthFlow="USER_PASSWORD_AUTH",
+        ClientId=user_pool.client_id,
+        AuthParameters=parameters,
+    )["AuthenticationResult"]
+    claims = user_pool.verify(result["IdToken"])
+
+    assert claims["sub"] == username
+    assert claims["aud"] == user_pool.client_id
+    assert claims["email"] == "user@example.com"
+    # アクセストークンと改ざんしたトークンはIDトークンとして受け付けない
+    assert user_pool.verify(result["AccessToken"]) is None
+    assert user_pool.verify(result["IdToken"][:-2] + "xx") is None
+    with pytest.raises(PermissionError):
+        user_pool.initiate_auth(
+            AuthFlow="USER_PASSWORD_AUTH",
+            ClientId=user_pool.client_id,
+            AuthParameters={**parameters, "SECRET_HASH": "invalid"},
+        )
+
+
+def test_cognito_auth_provider_uses_refresh_token_and_caches_token():
+    user_pool = load_test.LocalUserPool()
+    username = user_pool.sign_up("user@example.com", "password")
+    refresh_token = user_pool.initiate_auth(
+        AuthFlow="USER_PASSWORD_AUTH",
+        ClientId=user_pool.client_id,
+        AuthParameters={
+            "USERNAME": username,
+            "PASSWORD": "password",
+            "SECRET_HASH": load_test.secret_hash(
+                username, user_pool.client_id, user_pool.client_secret
+            ),
+        },
+    )["AuthenticationResult"]["RefreshToken"]
+    provider = load_test.CognitoAuthProvider(
+        user_pool.client_id,
+        user_pool.client_secret,
+        username,
+        refresh_token=refresh_token,
+        client=user_pool,
+    )
+
+    async def get_tokens():
+        return [await provider.get_id_token() for _ in range(3)]
+
+    tokens = asyncio.run(get_tokens())
+
+    assert len(set(tokens)) == 1
+    assert user_pool.verify(tokens[0])["sub"] == username
+
+
+def test_parse_mix_and_build_scenarios():
+    mix = load_test.parse_mix("anonymous=1,member=0,api=3")
+    scenarios = load_test.build_scenarios(
+        "https://example.com/", "https://api.example.com/prod", mix
+    )
+
+    assert [(s.name, s.weight, s.urls, s.auth) for s in scenarios] == [
+        ("anonymous", 1.0, ("https://example.com/",), "none"),
+        ("api", 3.0, ("https://api.example.com/prod/",), "token"),
+    ]
+    with pytest.raises(ValueError):
+        load_test.parse_mix("static=1")
+    with pytest.raises(ValueError):
+        load_test.build_scenarios("https://example.com", None, {"api": 1})
+
+
+def test_local_run_reports_latency_per_scenario():
+    report = asyncio.run(
+        load_test.run_local(
+            load_test.DEFAULT_MIX,
+            rate=400,
+            duration=0.5,
+            delay_seconds=0.005,
+            seed=0,
+        )
+    ).to_dict()
+
+    assert report["dropped"] == 0
+    assert report["total"]["requests"] == report["scheduled"]
+    assert report["total"]["errors"] == {}
+    # 認証が必要なシナリオもトークンとCookieで200になる
+    for name in ("anonymous", "member", "api"):
+        scenario = report["scenarios"][name]
+        assert scenario["requests"] > 0
+        assert scenario["status_codes"] == {"200": scenario["requests"]}
+        assert scenario["latency_ms"]["p50"] >= 5 * 0.99
+        assert (
+            scenario["latency_ms"]["p50"]
+            <= scenario["latency_ms"]["p99"]
+            <= scenario["latency_ms"]["p99.9"]
+            <= scenario["latency_ms"]["max"] * 1.01
+        )
+        assert sum(scenario["histogram_ms"].values()) == scenario["requests"]
+
+
+def test_stub_server_rejects_unauthenticated_requests():
+    user_pool = load_test.LocalUserPool()
+
+    async def run():
+        async with load_test.StubServer(user_pool) as server:
+            client = load_test.HttpClient()
+            try:
+                member = await client.request("GET", server.base_url + "/member/a")
+                api = await client.request(
+                    "GET", server.api_url + "/", {"Authorization": "invalid"}
+                )
+                # 同じ接続を使い回す
+                anonymous = await client.request("GET", server.base_url + "/")
+            finally:
+                client.close()
+            return member, api, anonymous, server.requests
+
+    member, api, anonymous, requests = asyncio.run(run())
+
+    assert member[0] == 302
+    assert member[1]["location"] == "/oauth2/authorize"
+    assert api[0] == 401
+    assert anonymous[0] == 200
+    assert requests == 3
+
+
+def test_open_loop_drops_requests_over_max_in_flight():
+    report = asyncio.run(
+        load_test.run_local(
+            {"anonymous": 1},
+            rate=200,
+            duration=0.2,
+            delay_seconds=0.5,
+            arrival="constant",
+            max_in_flight=5,
+        )
+    )
+
+    assert report.scheduled == 40
+    assert report.dropped == 35
+    assert report.total().sketch.count == 5
+
+
+def test_main_prints_json_without_boto3(capsys):
+    sys.modules.pop("boto3", None)
+
+    assert load_test.main(["--local", "--rate", "100", "--duration", "0.2"]) == 0
+    report = json.loads(capsys.readouterr().out)
+    assert set(report["scenarios"]) == {"anonymous", "member", "api"}
+    assert set(report["total"]["latency_ms"]) == {"p50", "p99", "p99.9", "max"}
+    assert "boto3" not in sys.modules
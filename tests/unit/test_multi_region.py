@@ -0,0 +1,193 @@
+import json
+from typing import Callable
+
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+import pytest
+
+from tests.unit.conftest import BASE_CONTEXT
+from web_app.web_app_global_stack import create_web_app_stacks
+
+REGIONS = ("ap-northeast-1", "us-east-1")
+
+GLOBAL_CONTEXT = {
+    "regions": ",".join(REGIONS),
+    "global_hosted_zone_id": "Z0000000000000",
+    "global_hosted_zone_name": "example.com",
+    "certificate_arns": json.dumps(
+        {
+            region: f"arn:aws:acm:{region}:123456789012:certificate/{region}"
+            for region in REGIONS
+        }
+    ),
+}
+
+
+@pytest.fixture(scope="module")
+def synth_regions() -> Callable[..., dict[str, assertions.Template]]:
+    """コンテキストごとにキャッシュした、スタック名ごとのTemplateを返す関数"""
+    templates: dict[tuple, dict[str, assertions.Template]] = {}
+
+    def _synth_regions(**context) -> dict[str, assertions.Template]:
+        key = tuple(sorted(context.items()))
+        if key not in templates:
+            app = core.App(context={**BASE_CONTEXT, **GLOBAL_CONTEXT, **context})
+            templates[key] = {
+                stack.stack_name: assertions.Template.from_stack(stack)
+                for stack in create_web_app_stacks(app, account="123456789012")
+            }
+        return templates[key]
+
+    return _synth_regions
+
+
+def test_latency_records_route_to_regional_albs(synth_regions):
+    templates = synth_regions()
+
+    assert sorted(templates) == [
+        "WebAppGlobalStack",
+        "WebAppStack-ap-northeast-1",
+        "WebAppStack-us-east-1",
+    ]
+    for region in REGIONS:
+        templates["WebAppGlobalStack"].has_resource_properties(
+            "AWS::Route53::RecordSet",
+            {
+                "Name": "example.com.",
+                "Type": "A",
+                "Region": region,
+                "SetIdentifier": f"sample-test-{region}",
+                "AliasTarget": {"EvaluateTargetHealth": True},
+            },
+        )
+        # ACMの証明書はリージョンごとのものを使う
+        templates[f"WebAppStack-{region}"].has_resource_properties(
+            "AWS::ElasticLoadBalancingV2::Listener",
+            {
+                "Certificates": [
+                    {
+                        "CertificateArn": (
+                            f"arn:aws:acm:{region}:123456789012:certificate/{region}"
+                        )
+                    }
+                ]
+            },
+        )
+
+
+def test_global_names_include_region(synth_regions):
+    templates = synth_regions(
+        cloudfront_enabled="true",
+        cloudfront_origin_domain_name="origin.example.com",
+        cloudfront_domain_names="www.example.com",
+        cloudfront_certificate_arn="arn:aws:acm:us-east-1:123456789012:certificate/x",
+    )
+
+    for region in REGIONS:
+        template = templates[f"WebAppStack-{region}"]
+        template.has_resource_properties(
+            "AWS::IAM::Role", {"RoleName": f"sample-test-web-ec2-role-{region}"}
+        )
+        template.has_resource_properties(
+            "AWS::CloudWatch::Dashboard",
+            {"DashboardName": f"sample-test-performance-{region}"},
+        )
+        template.has_resource_properties(
+            "AWS::CloudFront::CachePolicy",
+            {
+                "CachePolicyConfig": {
+                    "Name": f"sample-test-public-cache-policy-{region}"
+                }
+            },
+        )
+
+
+def test_user_data_does_not_hard_code_region(synth_regions):
+    template = synth_regions()["WebAppStack-us-east-1"]
+
+    (launch_template,) = template.find_resources("AWS::EC2::LaunchTemplate").values()
+    user_data = json.dumps(launch_template["Properties"]["LaunchTemplateData"])
+    assert "aws-codedeploy-${REGION}.s3.${REGION}.amazonaws.com" in user_data
+    assert "ap-northeast-1" not in user_data
+
+
+def test_global_accelerator_routes_to_regional_albs(synth_regions):
+    templates = synth_regions(global_routing="accelerator")
+    template = templates["WebAppGlobalStack"]
+
+    template.has_resource_properties(
+        "AWS::GlobalAccelerator::Listener",
+        {"Protocol": "TCP", "ClientAffinity": "SOURCE_IP"},
+    )
+    for region in REGIONS:
+        template.has_resource_properties(
+            "AWS::GlobalAccelerator::EndpointGroup",
+            {
+                "EndpointGroupRegion": region,
+                "EndpointConfigurations": [{"ClientIPPreservationEnabled": True}],
+            },
+        )
+    template.resource_properties_count_is(
+        "AWS::Route53::RecordSet",
+        {"AliasTarget": {"HostedZoneId": "Z2BJ6XQ5FK7U4H"}},
+        1,
+    )
+
+
+def test_aurora_global_database(synth_regions):
+    templates = synth_regions(db_mode="aurora", db_global_database="true")
+    primary = templates["WebAppStack-ap-northeast-1"]
+    secondary = templates["WebAppStack-us-east-1"]
+
+    primary.has_resource_properties(
+        "AWS::RDS::GlobalCluster",
+        {
+            "GlobalClusterIdentifier": "sample-test-global",
+            "SourceDBClusterIdentifier": assertions.Match.any_value(),
+        },
+    )
+    primary.has_resource_properties(
+        "AWS::SecretsManager::Secret",
+        {
+            "Name": "sample-test-aurora-credentials",
+            "ReplicaRegions": [{"Region": "us-east-1"}],
+        },
+    )
+    secondary.resource_count_is("AWS::RDS::GlobalCluster", 0)
+    secondary.has_resource_properties(
+        "AWS::RDS::DBCluster",
+        {
+            "GlobalClusterIdentifier": "sample-test-global",
+            "EnableGlobalWriteForwarding": True,
+            "MasterUsername": assertions.Match.absent(),
+            "MasterUserPassword": assertions.Match.absent(),
+            "DatabaseName": assertions.Match.absent(),
+        },
+    )
+
+
+def test_single_region_keeps_names():
+    app = core.App(context={**BASE_CONTEXT, "regions": "us-east-1"})
+    (stack,) = create_web_app_stacks(app)
+
+    assert stack.stack_name == "WebAppStack"
+    assert stack.region == "us-east-1"
+    assertions.Template.from_stack(stack).has_resource_properties(
+        "AWS::IAM::Role", {"RoleName": "sample-test-web-ec2-role"}
+    )
+
+
+@pytest.mark.parametrize(
+    "context, message",
+    [
+        ({"global_hosted_zone_id": None}, "global_hosted_zone_id"),
+        ({"global_routing": "geo"}, "global_routing"),
+        ({"db_global_database": "true"}, "db_global_database"),
+        ({"regions": "us-east-1,us-east-1"}, "duplicates"),
+    ],
+)
+def test_invalid_global_context(context, message):
+    app = core.App(context={**BASE_CONTEXT, **GLOBAL_CONTEXT, **context})
+
+    with pytest.raises(ValueError, match=message):
+        create_web_app_stacks(app, account="123456789012")
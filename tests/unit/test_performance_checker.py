@@ -0,0 +1,91 @@
+import json
+
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+import pytest
+from aws_cdk import aws_apigateway as apigw
+from aws_cdk import aws_lambda as _lambda
+
+from web_app.lib.aspects.performance_checker import PerformanceChecker
+
+
+@pytest.fixture(scope="module")
+def annotate(synth_stack):
+    def _annotate(**context) -> assertions.Annotations:
+        return assertions.Annotations.from_stack(synth_stack(**context))
+
+    return _annotate
+
+
+def findings(annotations: assertions.Annotations, kind: str) -> list[str]:
+    messages = getattr(annotations, f"find_{kind}")(
+        "*", assertions.Match.string_like_regexp(r"^\[")
+    )
+    return sorted({message.entry.data.split("]")[0][1:] for message in messages})
+
+
+def test_prod_profile_has_no_errors(annotate):
+    annotations = annotate(stage="prod")
+
+    assert findings(annotations, "error") == []
+    # RDS Proxyを使うかは構成上の選択肢のため、本番でも警告にとどめる
+    assert findings(annotations, "warning") == ["db-without-proxy"]
+
+
+def test_dev_allows_burstable_instances_and_single_nat_gateway(annotate):
+    annotations = annotate()
+
+    assert findings(annotations, "error") == []
+    assert findings(annotations, "warning") == [
+        "db-default-parameter-group",
+        "db-without-proxy",
+    ]
+
+
+def test_prod_regressions_are_errors(annotate):
+    annotations = annotate(
+        stage="prod",
+        nat_gateway_per_az="false",
+        web_slow_start_seconds="0",
+        stage_profiles=json.dumps(
+            {"prod": {"web": {"instance_type": "t3a.micro", "spot_instance_types": []}}}
+        ),
+    )
+
+    assert findings(annotations, "error") == [
+        "burstable-instance",
+        "single-nat-gateway",
+        "target-group-slow-start",
+    ]
+
+
+def test_rules_can_be_ignored_or_disabled(annotate):
+    ignored = annotate(
+        performance_checks_ignore="db-default-parameter-group,db-without-proxy"
+    )
+
+    assert findings(ignored, "warning") == []
+    assert findings(annotate(performance_checks_enabled="false"), "warning") == []
+    with pytest.raises(ValueError):
+        annotate(performance_checks_ignore="unknown")
+
+
+def test_functions_and_apis_without_settings_are_reported():
+    stack = core.Stack(core.App(), "stack")
+    fn = _lambda.Function(
+        stack,
+        "function",
+        runtime=_lambda.Runtime.PYTHON_3_12,
+        handler="index.handler",
+        code=_lambda.Code.from_inline("def handler(event, context): pass"),
+    )
+    apigw.LambdaRestApi(stack, "api", handler=fn)
+    core.Aspects.of(stack).add(PerformanceChecker())
+
+    annotations = assertions.Annotations.from_stack(stack)
+
+    assert findings(annotations, "warning") == [
+        "api-throttling",
+        "lambda-architecture",
+        "lambda-memory-size",
+    ]
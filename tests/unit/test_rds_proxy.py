@@ -0,0 +1,112 @@
+import json
+
+import aws_cdk.assertions as assertions
+import pytest
+
+
+def launch_template_user_data(template: assertions.Template) -> str:
+    launch_templates = template.find_resources("AWS::EC2::LaunchTemplate")
+    (launch_template,) = launch_templates.values()
+    return json.dumps(launch_template["Properties"]["LaunchTemplateData"]["UserData"])
+
+
+def test_no_proxy_by_default(synth):
+    template = synth()
+
+    template.resource_count_is("AWS::RDS::DBProxy", 0)
+    assert "Endpoint.Address" in launch_template_user_data(template)
+
+
+def test_proxy_in_front_of_db_instance(synth):
+    template = synth(
+        db_proxy_enabled="true",
+        db_proxy_borrow_timeout_seconds="10",
+        db_proxy_max_connections_percent="80",
+        db_proxy_max_idle_connections_percent="20",
+    )
+
+    template.has_resource_properties(
+        "AWS::RDS::DBProxy",
+        {
+            "DBProxyName": "sample-test-rds-proxy",
+            "EngineFamily": "POSTGRESQL",
+            "RequireTLS": True,
+            "Auth": [
+                {
+                    "AuthScheme": "SECRETS",
+                    "SecretArn": {"Ref": assertions.Match.any_value()},
+                }
+            ],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBProxyTargetGroup",
+        {
+            "ConnectionPoolConfigurationInfo": {
+                "ConnectionBorrowTimeout": 10,
+                "MaxConnectionsPercent": 80,
+                "MaxIdleConnectionsPercent": 20,
+            },
+        },
+    )
+
+    # EC2からRDS Proxy、RDS ProxyからRDSへの通信を許可する
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroup",
+        {"GroupName": "sample-test-rds-proxy-sg"},
+    )
+    template.resource_properties_count_is(
+        "AWS::EC2::SecurityGroupIngress",
+        {
+            "FromPort": 5432,
+            "ToPort": 5432,
+            "SourceSecurityGroupId": assertions.Match.any_value(),
+        },
+        3,
+    )
+
+    # Webサーバーの接続先がRDS Proxyのエンドポイントになる
+    user_data = launch_template_user_data(template)
+    assert "DB_HOST" in user_data
+    assert "rdsproxy" in user_data
+
+
+def test_invalid_proxy_connection_percent(synth):
+    with pytest.raises(ValueError, match="max_connections_percent"):
+        synth(db_proxy_enabled="true", db_proxy_max_connections_percent="120")
+
+
+def test_proxy_can_reach_secrets_manager(synth):
+    template = synth(db_proxy_enabled="true", db_mode="aurora")
+
+    # RDS Proxyは認証情報をSecrets Managerから取得するため、
+    # NATゲートウェイへのデフォルトルートがあるサブネットに配置する
+    route_tables = {
+        association["Properties"]["SubnetId"]["Ref"]: association["Properties"][
+            "RouteTableId"
+        ]["Ref"]
+        for association in template.find_resources(
+            "AWS::EC2::SubnetRouteTableAssociation"
+        ).values()
+    }
+    nat_route_tables = {
+        route["Properties"]["RouteTableId"]["Ref"]
+        for route in template.find_resources(
+            "AWS::EC2::Route",
+            {
+                "Properties": {
+                    "DestinationCidrBlock": "0.0.0.0/0",
+                    "NatGatewayId": assertions.Match.any_value(),
+                }
+            },
+        ).values()
+    }
+    (proxy,) = template.find_resources("AWS::RDS::DBProxy").values()
+    (reader_endpoint,) = template.find_resources("AWS::RDS::DBProxyEndpoint").values()
+    for subnet_ids in [
+        proxy["Properties"]["VpcSubnetIds"],
+        reader_endpoint["Properties"]["VpcSubnetIds"],
+    ]:
+        assert subnet_ids
+        for subnet_id in subnet_ids:
+            assert route_tables[subnet_id["Ref"]] in nat_route_tables
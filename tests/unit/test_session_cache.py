@@ -0,0 +1,79 @@
+import json
+
+import aws_cdk.assertions as assertions
+import pytest
+
+
+def launch_template_user_data(template: assertions.Template) -> str:
+    launch_templates = template.find_resources("AWS::EC2::LaunchTemplate")
+    (launch_template,) = launch_templates.values()
+    return json.dumps(launch_template["Properties"]["LaunchTemplateData"]["UserData"])
+
+
+def test_cache_is_disabled_by_default(synth):
+    template = synth()
+
+    template.resource_count_is("AWS::ElastiCache::ReplicationGroup", 0)
+    user_data = launch_template_user_data(template)
+    assert "session.save_handler" not in user_data
+    assert "pecl install" not in user_data
+
+
+def test_valkey_cache_stores_php_sessions(synth):
+    template = synth(
+        cache_enabled="true",
+        cache_node_type="cache.r7g.large",
+        cache_replica_count="2",
+    )
+
+    template.has_resource_properties(
+        "AWS::ElastiCache::ReplicationGroup",
+        {
+            "Engine": "valkey",
+            "CacheNodeType": "cache.r7g.large",
+            "NumCacheClusters": 3,
+            "AutomaticFailoverEnabled": True,
+            "MultiAZEnabled": True,
+            "TransitEncryptionEnabled": True,
+            "AtRestEncryptionEnabled": True,
+            "Port": 6379,
+        },
+    )
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroup",
+        {
+            "GroupName": "sample-test-cache-sg",
+            "SecurityGroupEgress": assertions.Match.any_value(),
+        },
+    )
+    cache_sg_ingress = template.find_resources(
+        "AWS::EC2::SecurityGroupIngress",
+        {"Properties": {"FromPort": 6379}},
+    )
+    (ingress,) = cache_sg_ingress.values()
+    assert "webec2sg" in ingress["Properties"]["SourceSecurityGroupId"]["Fn::GetAtt"][0]
+
+    user_data = launch_template_user_data(template)
+    assert "pecl install -f redis" in user_data
+    assert "php_value[session.save_handler] = redis" in user_data
+    assert "tls://" in user_data
+    for key in ("CACHE_HOST", "CACHE_READ_HOST", "CACHE_PORT"):
+        assert key in user_data
+
+
+def test_single_node_cache_has_no_failover(synth):
+    template = synth(cache_enabled="true", cache_replica_count="0")
+
+    template.has_resource_properties(
+        "AWS::ElastiCache::ReplicationGroup",
+        {
+            "NumCacheClusters": 1,
+            "AutomaticFailoverEnabled": False,
+            "MultiAZEnabled": False,
+        },
+    )
+
+
+def test_invalid_replica_count_is_rejected(synth):
+    with pytest.raises(ValueError, match="replica_count"):
+        synth(cache_enabled="true", cache_replica_count="6")
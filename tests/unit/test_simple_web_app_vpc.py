@@ -0,0 +1,99 @@
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+
+from web_app.lib.vpc.simple_web_app_vpc import SimpleWebAppVPC
+
+VPC_HTTPS_INGRESS = assertions.Match.object_like(
+    {
+        "CidrIp": {
+            "Fn::GetAtt": [assertions.Match.string_like_regexp("vpc"), "CidrBlock"]
+        },
+        "FromPort": 443,
+        "ToPort": 443,
+    }
+)
+
+
+def synth_vpc(**kwargs) -> assertions.Template:
+    app = core.App()
+    stack = core.Stack(app, "vpc-stack")
+    SimpleWebAppVPC(stack, "sample", "test", **kwargs)
+    return assertions.Template.from_stack(stack)
+
+
+def test_single_nat_gateway_without_endpoints_by_default():
+    template = synth_vpc()
+
+    template.resource_count_is("AWS::EC2::NatGateway", 1)
+    template.resource_count_is("AWS::EC2::VPCEndpoint", 0)
+
+
+def test_nat_gateway_per_az():
+    template = synth_vpc(nat_gateway_per_az=True)
+
+    template.resource_count_is("AWS::EC2::NatGateway", 2)
+
+
+def test_vpc_endpoints():
+    template = synth_vpc(enable_vpc_endpoints=True)
+
+    template.has_resource_properties(
+        "AWS::EC2::VPCEndpoint",
+        {
+            "VpcEndpointType": "Gateway",
+            "ServiceName": {
+                "Fn::Join": ["", ["com.amazonaws.", {"Ref": "AWS::Region"}, ".s3"]]
+            },
+        },
+    )
+    for service in ["ssm", "ssmmessages", "ec2messages", "logs", "secretsmanager"]:
+        template.has_resource_properties(
+            "AWS::EC2::VPCEndpoint",
+            {
+                "VpcEndpointType": "Interface",
+                "PrivateDnsEnabled": True,
+                "ServiceName": {
+                    "Fn::Join": [
+                        "",
+                        ["com.amazonaws.", {"Ref": "AWS::Region"}, f".{service}"],
+                    ]
+                },
+            },
+        )
+    # エンドポイントごとにセキュリティグループを作成し、VPC内からのHTTPSのみ許可する
+    template.resource_properties_count_is(
+        "AWS::EC2::SecurityGroup",
+        {
+            "GroupName": assertions.Match.string_like_regexp("-endpoint-sg$"),
+            "SecurityGroupIngress": [VPC_HTTPS_INGRESS],
+        },
+        5,
+    )
+
+
+def test_vpc_endpoints_accept_every_consumer_in_vpc(synth):
+    # プライベートDNSでVPC内の通信はすべてエンドポイントに向くため、
+    # EC2以外のセキュリティグループ（ビルド用インスタンス、RDS Proxy）からも接続できること
+    template = synth(
+        vpc_endpoints_enabled="true",
+        db_proxy_enabled="true",
+        web_image_mode="bake",
+    )
+
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroup", {"GroupName": "sample-test-image-builder-sg"}
+    )
+    template.has_resource_properties(
+        "AWS::EC2::SecurityGroup", {"GroupName": "sample-test-rds-proxy-sg"}
+    )
+    for name in ["ssm", "ssm-messages", "ec2-messages", "logs", "secrets-manager"]:
+        template.has_resource_properties(
+            "AWS::EC2::SecurityGroup",
+            {
+                "GroupName": f"sample-test-{name}-endpoint-sg",
+                "SecurityGroupIngress": [VPC_HTTPS_INGRESS],
+            },
+        )
+    template.resource_properties_count_is(
+        "AWS::EC2::SecurityGroupIngress", {"FromPort": 443}, 0
+    )
@@ -0,0 +1,99 @@
+"""CloudFormationテンプレートのスナップショットテスト
+
+意図しないテンプレートの変更を検出する。意図した変更の場合はスナップショットを更新する。
+
+    UPDATE_SNAPSHOTS=1 pytest tests/unit/test_snapshots.py
+"""
+
+import difflib
+import json
+import os
+import re
+from pathlib import Path
+
+import pytest
+
+SNAPSHOT_DIR = Path(__file__).parent / "snapshots"
+
+# スナップショットを取るステージの構成
+SNAPSHOT_CONTEXTS = {
+    "dev": {},
+    "prod": {"stage": "prod"},
+}
+
+# ソースコードを変更するたびに変わるアセットのハッシュは比較しない
+_VOLATILE_PATTERNS = (
+    (re.compile(r"[0-9a-f]{64}(\.zip)"), r"<asset-hash>\1"),
+    (re.compile(r"(CurrentVersion)[0-9A-F]{8}[0-9a-f]{32}"), r"\1<hash>"),
+)
+
+
+def normalize(template: dict) -> str:
+    """比較できるようにテンプレートを整形し、変わりやすい値を置き換える
+
+    Args:
+        template (dict): CloudFormationテンプレート
+    Returns:
+        str: 整形したテンプレート
+    """
+    text = json.dumps(template, indent=2, sort_keys=True, ensure_ascii=False) + "\n"
+    for pattern, replacement in _VOLATILE_PATTERNS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def assert_matches_snapshot(actual: str, snapshot: Path) -> None:
+    """テンプレートがスナップショットと一致することを確認する
+
+    UPDATE_SNAPSHOTS=1 の場合はスナップショットを書き込む。
+    スナップショットの削除や名前の変更に気づけるよう、ない場合は作成せずに失敗させる。
+
+    Args:
+        actual (str): 整形したテンプレート
+        snapshot (Path): スナップショットのファイル
+    """
+    if os.environ.get("UPDATE_SNAPSHOTS") == "1":
+        snapshot.parent.mkdir(exist_ok=True)
+        snapshot.write_text(actual, encoding="utf-8")
+    if not snapshot.exists():
+        pytest.fail(
+            f"snapshot {snapshot.name} does not exist "
+            "(set UPDATE_SNAPSHOTS=1 to create it)"
+        )
+    expected = snapshot.read_text(encoding="utf-8")
+
+    if actual != expected:
+        diff = "".join(
+            list(
+                difflib.unified_diff(
+                    expected.splitlines(keepends=True),
+                    actual.splitlines(keepends=True),
+                    fromfile=str(snapshot),
+                    tofile="synthesized",
+                )
+            )[:200]
+        )
+        pytest.fail(
+            f"template does not match snapshot {snapshot.name} "
+            f"(set UPDATE_SNAPSHOTS=1 to update):\n{diff}"
+        )
+
+
+@pytest.mark.parametrize("name", sorted(SNAPSHOT_CONTEXTS))
+def test_template_matches_snapshot(synth, name):
+    actual = normalize(synth(**SNAPSHOT_CONTEXTS[name]).to_json())
+
+    assert_matches_snapshot(actual, SNAPSHOT_DIR / f"{name}.json")
+
+
+def test_missing_snapshot_fails_unless_updating(monkeypatch, tmp_path):
+    snapshot = tmp_path / "snapshots" / "missing.json"
+
+    monkeypatch.delenv("UPDATE_SNAPSHOTS", raising=False)
+    with pytest.raises(pytest.fail.Exception, match="does not exist"):
+        assert_matches_snapshot("{}\n", snapshot)
+    assert not snapshot.exists()
+
+    monkeypatch.setenv("UPDATE_SNAPSHOTS", "1")
+    assert_matches_snapshot("{}\n", snapshot)
+    assert snapshot.read_text(encoding="utf-8") == "{}\n"
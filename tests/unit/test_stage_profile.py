@@ -0,0 +1,158 @@
+import json
+
+import aws_cdk as core
+import aws_cdk.assertions as assertions
+import pytest
+
+from web_app.lib.context.stage_profile import (
+    PROFILES,
+    build_stage_profile,
+    load_stage_profile,
+)
+
+
+def load(stage: str, **context):
+    app = core.App(context=context)
+    return load_stage_profile(app.node, stage)
+
+
+def test_profile_is_selected_by_stage_name():
+    assert load("prod") == PROFILES["prod"]
+    assert load("test").name == "dev"
+    assert load("test", stage_profile="prod") == PROFILES["prod"]
+    with pytest.raises(ValueError):
+        load("test", stage_profile="unknown")
+
+
+def test_profile_overrides_from_context():
+    profile = load(
+        "staging",
+        stage_profiles=json.dumps(
+            {
+                "staging": {
+                    "web": {"instance_type": "m7g.large", "min_capacity": 3},
+                    "lambda": {"memory_size": 512},
+                }
+            }
+        ),
+    )
+
+    assert profile.name == "staging"
+    assert profile.web.instance_type == "m7g.large"
+    assert profile.web.min_capacity == 3
+    assert profile.function.memory_size == 512
+    # 上書きしていない値は元のプロファイル（dev）のまま
+    assert profile.db == PROFILES["dev"].db
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"web": {"unknown": 1}},
+        {"storage": {}},
+        {"web": {"min_capacity": "3"}},
+        {"web": {"instance_type": "x1.huge"}},
+        {"web": {"instance_type": "m7g.large", "spot_instance_types": ["m7i.large"]}},
+        {"web": {"min_capacity": 5, "max_capacity": 4}},
+        {"web": {"volume_iops": 16000}},
+        {"web": {"volume_throughput_mibps": 1000}},
+        {"db": {"allocated_storage_gib": 100, "max_allocated_storage_gib": 50}},
+        {"vpc": {"max_azs": 1}},
+        {"lambda": {"architecture": "sparc"}},
+    ],
+)
+def test_invalid_profile_is_rejected(overrides):
+    with pytest.raises(ValueError):
+        build_stage_profile("dev", overrides)
+
+
+def test_prod_profile_runs_non_burstable_graviton(synth):
+    template = synth(stage="prod")
+
+    template.has_resource_properties(
+        "AWS::EC2::LaunchTemplate",
+        {
+            "LaunchTemplateData": {
+                "InstanceType": "m7g.large",
+                "ImageId": {
+                    "Ref": assertions.Match.string_like_regexp("arm64"),
+                },
+                "BlockDeviceMappings": [
+                    {
+                        "DeviceName": "/dev/xvda",
+                        "Ebs": {
+                            "VolumeSize": 20,
+                            "VolumeType": "gp3",
+                            "Iops": 3000,
+                            "Throughput": 250,
+                        },
+                    }
+                ],
+            }
+        },
+    )
+    template.has_resource_properties(
+        "AWS::AutoScaling::AutoScalingGroup", {"MinSize": "2", "MaxSize": "8"}
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBInstance",
+        {
+            "DBInstanceClass": "db.m7g.large",
+            "AllocatedStorage": "400",
+            "MaxAllocatedStorage": 1000,
+        },
+    )
+    template.resource_count_is("AWS::EC2::NatGateway", 2)
+    template.has_resource_properties(
+        "AWS::Lambda::Alias",
+        {"ProvisionedConcurrencyConfig": {"ProvisionedConcurrentExecutions": 2}},
+    )
+    template.has_resource_properties("AWS::Lambda::Function", {"MemorySize": 1024})
+
+
+def test_dev_profile_keeps_burstable_defaults(synth):
+    template = synth()
+
+    template.has_resource_properties(
+        "AWS::EC2::LaunchTemplate",
+        {"LaunchTemplateData": {"InstanceType": "t3a.micro"}},
+    )
+    template.has_resource_properties(
+        "AWS::RDS::DBInstance",
+        {
+            "DBInstanceClass": "db.t4g.micro",
+            "MaxAllocatedStorage": assertions.Match.absent(),
+        },
+    )
+    template.resource_count_is("AWS::EC2::NatGateway", 1)
+
+
+def test_individual_context_takes_precedence_over_profile(synth):
+    template = synth(stage="prod", web_max_capacity="12", nat_gateway_per_az="false")
+
+    template.has_resource_properties(
+        "AWS::AutoScaling::AutoScalingGroup", {"MinSize": "2", "MaxSize": "12"}
+    )
+    template.resource_count_is("AWS::EC2::NatGateway", 1)
+
+
+def test_bake_mode_builds_arm64_image_for_graviton(synth):
+    template = synth(stage="prod", web_image_mode="bake")
+
+    template.has_resource_properties(
+        "AWS::ImageBuilder::ImageRecipe",
+        {
+            "ParentImage": {
+                "Fn::Join": [
+                    "",
+                    assertions.Match.array_with(
+                        [":aws:image/amazon-linux-2023-arm64/x.x.x"]
+                    ),
+                ]
+            }
+        },
+    )
+    template.has_resource_properties(
+        "AWS::ImageBuilder::InfrastructureConfiguration",
+        {"InstanceTypes": ["m7g.large"]},
+    )
@@ -0,0 +1,108 @@
+import json
+
+import aws_cdk.assertions as assertions
+import pytest
+
+from web_app.lib.ec2.ec2_utils import LIVEZ_PHP
+
+
+def launch_template_user_data(template: assertions.Template) -> str:
+    launch_templates = template.find_resources("AWS::EC2::LaunchTemplate")
+    (launch_template,) = launch_templates.values()
+    return json.dumps(launch_template["Properties"]["LaunchTemplateData"]["UserData"])
+
+
+def test_target_group_defaults(synth):
+    template = synth()
+
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::TargetGroup",
+        {
+            "HealthCheckPath": "/livez",
+            "HealthCheckIntervalSeconds": 10,
+            "HealthCheckTimeoutSeconds": 5,
+            "HealthyThresholdCount": 2,
+            "UnhealthyThresholdCount": 2,
+            "Matcher": {"HttpCode": "200"},
+            "TargetGroupAttributes": assertions.Match.array_with(
+                [
+                    {"Key": "deregistration_delay.timeout_seconds", "Value": "30"},
+                    {"Key": "slow_start.duration_seconds", "Value": "60"},
+                    {
+                        "Key": "load_balancing.algorithm.type",
+                        "Value": "least_outstanding_requests",
+                    },
+                ]
+            ),
+        },
+    )
+
+
+def test_target_group_can_be_tuned(synth):
+    template = synth(
+        web_lb_algorithm="round_robin",
+        web_slow_start_seconds="0",
+        web_deregistration_delay_seconds="10",
+        web_health_check_interval_seconds="5",
+        web_health_check_timeout_seconds="2",
+        web_unhealthy_threshold_count="3",
+    )
+
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::TargetGroup",
+        {
+            "HealthCheckIntervalSeconds": 5,
+            "HealthCheckTimeoutSeconds": 2,
+            "UnhealthyThresholdCount": 3,
+            "TargetGroupAttributes": assertions.Match.array_with(
+                [
+                    {"Key": "deregistration_delay.timeout_seconds", "Value": "10"},
+                    {"Key": "load_balancing.algorithm.type", "Value": "round_robin"},
+                ]
+            ),
+        },
+    )
+    attributes = json.dumps(
+        template.find_resources("AWS::ElasticLoadBalancingV2::TargetGroup")
+    )
+    assert "slow_start.duration_seconds" not in attributes
+
+
+@pytest.mark.parametrize(
+    "context, message",
+    [
+        ({"web_lb_algorithm": "random"}, "load_balancing_algorithm"),
+        ({"web_slow_start_seconds": "10"}, "slow_start_seconds"),
+        ({"web_lb_algorithm": "weighted_random"}, "slow start"),
+        ({"web_health_check_timeout_seconds": "10"}, "health_check_timeout"),
+    ],
+)
+def test_invalid_target_group_settings_are_rejected(synth, context, message):
+    with pytest.raises(ValueError, match=message):
+        synth(**context)
+
+
+def test_healthz_endpoint_checks_php_fpm_and_database(synth):
+    user_data = launch_template_user_data(synth())
+
+    assert "/var/www/html/healthz.php" in user_data
+    assert "Alias /healthz /var/www/html/healthz.php" in user_data
+    assert "Alias /livez /var/www/html/livez.php" in user_data
+    assert "fpm-fcgi" in user_data
+    assert "fsockopen" in user_data
+    assert "http_response_code($healthy ? 200 : 503)" in user_data
+
+
+def test_auto_scaling_group_replaces_only_dead_instances(synth):
+    template = synth()
+
+    # Auto Scalingグループが使うALBのヘルスチェックは依存先を確認しない死活監視にする
+    # DBの障害などで全インスタンスが置き換えられないようにするため
+    template.has_resource_properties(
+        "AWS::AutoScaling::AutoScalingGroup", {"HealthCheckType": "ELB"}
+    )
+    template.has_resource_properties(
+        "AWS::ElasticLoadBalancingV2::TargetGroup", {"HealthCheckPath": "/livez"}
+    )
+    assert "fsockopen" not in LIVEZ_PHP
+    assert "getenv" not in LIVEZ_PHP
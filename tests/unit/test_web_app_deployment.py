@@ -0,0 +1,136 @@
+import json
+import os
+import re
+from pathlib import Path
+
+import aws_cdk.assertions as assertions
+import pytest
+
+from tests.unit.conftest import build_stack
+from web_app.lib.ec2.ec2_utils import WEB_HEALTH_CHECK_PATH, WEB_OPCACHE_WARMUP_PATH
+
+CODEDEPLOY_DIR = Path(__file__).resolve().parents[2] / "codedeploy"
+
+
+def test_rolling_deployment_with_alarm_rollback(synth):
+    template = synth()
+
+    template.has_resource_properties(
+        "AWS::CodeDeploy::DeploymentConfig",
+        {
+            "DeploymentConfigName": "sample-test-web-min-healthy-50",
+            "MinimumHealthyHosts": {"Type": "FLEET_PERCENT", "Value": 50},
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CodeDeploy::DeploymentGroup",
+        {
+            "DeploymentGroupName": "sample-test-web",
+            "AutoScalingGroups": [assertions.Match.any_value()],
+            "DeploymentStyle": {"DeploymentOption": "WITH_TRAFFIC_CONTROL"},
+            "LoadBalancerInfo": {
+                "TargetGroupInfoList": [{"Name": assertions.Match.any_value()}]
+            },
+            "AutoRollbackConfiguration": {
+                "Enabled": True,
+                "Events": assertions.Match.array_with(
+                    ["DEPLOYMENT_FAILURE", "DEPLOYMENT_STOP_ON_ALARM"]
+                ),
+            },
+        },
+    )
+    (deployment_group,) = template.find_resources(
+        "AWS::CodeDeploy::DeploymentGroup"
+    ).values()
+    alarms = deployment_group["Properties"]["AlarmConfiguration"]["Alarms"]
+    # ALBとWebサーバーのアラームだけでロールバックする
+    assert len(alarms) == 4
+    # CodeDeployAgentはUserDataでインストール済み
+    assert "codedeploy-agent" not in json.dumps(
+        template.find_resources("AWS::SSM::Association")
+    )
+
+
+def test_minimum_healthy_hosts_can_be_configured(synth):
+    template = synth(deploy_minimum_healthy_hosts_percent="75")
+
+    template.has_resource_properties(
+        "AWS::CodeDeploy::DeploymentConfig",
+        {"MinimumHealthyHosts": {"Type": "FLEET_PERCENT", "Value": 75}},
+    )
+
+
+def test_stack_owned_auto_scaling_group_is_deployed_in_place(synth):
+    template = synth()
+
+    # Auto Scalingグループを複製するとスタックのAuto Scalingグループが削除されるため、
+    # CodeDeployにはAuto Scalingグループを作らせない
+    template.has_resource_properties(
+        "AWS::CodeDeploy::DeploymentGroup",
+        {
+            "DeploymentStyle": {
+                "DeploymentType": assertions.Match.absent(),
+                "DeploymentOption": "WITH_TRAFFIC_CONTROL",
+            },
+            "BlueGreenDeploymentConfiguration": assertions.Match.absent(),
+        },
+    )
+
+
+def test_instance_fleet_is_selected_by_tag(synth):
+    template = synth(web_fleet_mode="instance", monitoring_enabled="false")
+
+    template.has_resource_properties(
+        "AWS::CodeDeploy::DeploymentGroup",
+        {
+            "Ec2TagSet": {
+                "Ec2TagSetList": [
+                    {
+                        "Ec2TagGroup": [
+                            {
+                                "Key": "deployment_group",
+                                "Value": "sample-test-web",
+                                "Type": "KEY_AND_VALUE",
+                            }
+                        ]
+                    }
+                ]
+            },
+            "AlarmConfiguration": assertions.Match.absent(),
+        },
+    )
+    template.resource_properties_count_is(
+        "AWS::EC2::Instance",
+        {
+            "Tags": assertions.Match.array_with(
+                [{"Key": "deployment_group", "Value": "sample-test-web"}]
+            )
+        },
+        2,
+    )
+
+
+def test_deployment_can_be_disabled_or_rejected(synth):
+    synth(deploy_enabled="false").resource_count_is(
+        "AWS::CodeDeploy::DeploymentGroup", 0
+    )
+    with pytest.raises(ValueError, match="minimum_healthy_hosts_percent"):
+        build_stack(deploy_minimum_healthy_hosts_percent="100")
+
+
+def test_sample_revision_warms_up_opcache_before_allow_traffic(synth):
+    appspec = (CODEDEPLOY_DIR / "appspec.yml").read_text()
+
+    for location in re.findall(r"- location: (\S+)", appspec):
+        script = CODEDEPLOY_DIR / location
+        assert script.exists(), script
+        assert os.access(script, os.X_OK), script
+    warm_up = re.search(r"BeforeAllowTraffic:\n\s+- location: (\S+)", appspec)
+    script = (CODEDEPLOY_DIR / warm_up.group(1)).read_text()
+    assert f"http://127.0.0.1{WEB_OPCACHE_WARMUP_PATH}" in script
+    assert f"http://127.0.0.1{WEB_HEALTH_CHECK_PATH}" in script
+
+    (launch_template,) = synth().find_resources("AWS::EC2::LaunchTemplate").values()
+    user_data = json.dumps(launch_template["Properties"]["LaunchTemplateData"])
+    assert f"Alias {WEB_OPCACHE_WARMUP_PATH} " in user_data
+    assert "Require local" in user_data
@@ -0,0 +1,174 @@
+import aws_cdk.assertions as assertions
+import pytest
+
+CLOUDFRONT_CONTEXT = {
+    "cloudfront_enabled": "true",
+    "cloudfront_origin_domain_name": "origin.example.com",
+    "cloudfront_domain_names": "www.example.com",
+    "cloudfront_certificate_arn": (
+        "arn:aws:acm:us-east-1:123456789012:certificate/sample"
+    ),
+}
+
+
+def cache_behaviors(template: assertions.Template) -> dict[str, dict]:
+    distributions = template.find_resources("AWS::CloudFront::Distribution")
+    (distribution,) = distributions.values()
+    config = distribution["Properties"]["DistributionConfig"]
+    return {behavior["PathPattern"]: behavior for behavior in config["CacheBehaviors"]}
+
+
+def test_no_distribution_by_default(synth):
+    template = synth()
+
+    template.resource_count_is("AWS::CloudFront::Distribution", 0)
+
+
+def test_public_pages_are_cached_with_compression(synth):
+    template = synth(**CLOUDFRONT_CONTEXT, cloudfront_default_ttl_seconds="120")
+
+    template.has_resource_properties(
+        "AWS::CloudFront::CachePolicy",
+        {
+            "CachePolicyConfig": {
+                "DefaultTTL": 120,
+                "ParametersInCacheKeyAndForwardedToOrigin": {
+                    "CookiesConfig": {"CookieBehavior": "none"},
+                    "EnableAcceptEncodingBrotli": True,
+                    "EnableAcceptEncodingGzip": True,
+                },
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CloudFront::Distribution",
+        {
+            "DistributionConfig": {
+                "DefaultCacheBehavior": {
+                    "Compress": True,
+                    "CachePolicyId": {"Ref": assertions.Match.any_value()},
+                },
+            },
+        },
+    )
+
+
+def test_authenticated_paths_pass_through_uncached(synth):
+    template = synth(**CLOUDFRONT_CONTEXT)
+
+    behaviors = cache_behaviors(template)
+    for path in ("/member/*", "/oauth2/*"):
+        # CachingDisabledとAllViewerのマネージドポリシー
+        assert (
+            behaviors[path]["CachePolicyId"] == "4135ea2d-6df8-44a3-9df3-4b5a84be39ad"
+        )
+        assert (
+            behaviors[path]["OriginRequestPolicyId"]
+            == "216adef6-5c7f-47e4-b989-5492eafa07d3"
+        )
+
+
+def test_static_assets_from_s3(synth):
+    template = synth(**CLOUDFRONT_CONTEXT)
+
+    behaviors = cache_behaviors(template)
+    assert behaviors["/static/*"]["Compress"] is True
+    template.resource_count_is("AWS::CloudFront::OriginAccessControl", 1)
+    template.resource_count_is("Custom::CDKBucketDeployment", 1)
+
+
+def test_custom_domain_requires_certificate(synth):
+    with pytest.raises(ValueError, match="certificate_arn"):
+        synth(**{**CLOUDFRONT_CONTEXT, "cloudfront_certificate_arn": ""})
+
+
+def test_custom_domain_is_required_to_forward_host_header(synth):
+    with pytest.raises(ValueError, match="domain_names is required"):
+        synth(**{**CLOUDFRONT_CONTEXT, "cloudfront_domain_names": ""})
+
+    # ALBの証明書は閲覧者のHostで検証されるため、代替ドメイン名で配信する
+    template = synth(**CLOUDFRONT_CONTEXT)
+    template.has_resource_properties(
+        "AWS::CloudFront::Distribution",
+        {"DistributionConfig": {"Aliases": ["www.example.com"]}},
+    )
+
+
+def test_origin_domain_name_is_required(synth):
+    # ALBのDNS名は証明書と一致せず、CloudFrontからHTTPSで接続できない
+    with pytest.raises(ValueError, match="origin_domain_name"):
+        synth(cloudfront_enabled="true")
+
+
+def test_public_pages_forward_posts_to_alb(synth):
+    template = synth(**CLOUDFRONT_CONTEXT)
+
+    template.has_resource_properties(
+        "AWS::CloudFront::Distribution",
+        {
+            "DistributionConfig": {
+                "Origins": assertions.Match.array_with(
+                    [
+                        assertions.Match.object_like(
+                            {
+                                "DomainName": "origin.example.com",
+                                "CustomOriginConfig": assertions.Match.object_like(
+                                    {"OriginProtocolPolicy": "https-only"}
+                                ),
+                            }
+                        )
+                    ]
+                ),
+                "DefaultCacheBehavior": {
+                    "AllowedMethods": assertions.Match.array_with(
+                        ["GET", "HEAD", "POST"]
+                    ),
+                    "CachedMethods": ["GET", "HEAD"],
+                },
+            },
+        },
+    )
+
+
+def test_public_pages_forward_session_cookie_outside_cache_key(synth):
+    template = synth(
+        **CLOUDFRONT_CONTEXT, cloudfront_forwarded_cookies="PHPSESSID,csrf_token"
+    )
+
+    template.has_resource_properties(
+        "AWS::CloudFront::OriginRequestPolicy",
+        {
+            "OriginRequestPolicyConfig": {
+                "CookiesConfig": {
+                    "CookieBehavior": "whitelist",
+                    "Cookies": ["PHPSESSID", "csrf_token"],
+                },
+                "HeadersConfig": {
+                    "HeaderBehavior": "whitelist",
+                    "Headers": ["Content-Type", "Origin", "Referer"],
+                },
+            },
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CloudFront::Distribution",
+        {
+            "DistributionConfig": {
+                "DefaultCacheBehavior": {
+                    "OriginRequestPolicyId": {"Ref": assertions.Match.any_value()},
+                },
+            },
+        },
+    )
+    # キャッシュキーにはCookieを含めない
+    template.has_resource_properties(
+        "AWS::CloudFront::CachePolicy",
+        {
+            "CachePolicyConfig": {
+                "ParametersInCacheKeyAndForwardedToOrigin": {
+                    "CookiesConfig": {"CookieBehavior": "none"},
+                    "HeadersConfig": {"HeaderBehavior": "none"},
+                },
+            },
+        },
+    )
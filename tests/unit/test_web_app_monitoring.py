@@ -0,0 +1,124 @@
+import json
+
+import aws_cdk.assertions as assertions
+import pytest
+
+from web_app.lib.monitoring.web_app_monitoring import DEFAULT_ALARM_THRESHOLDS
+
+
+def dashboard_body(template: assertions.Template) -> str:
+    dashboard = next(
+        iter(template.find_resources("AWS::CloudWatch::Dashboard").values())
+    )
+    return json.dumps(dashboard["Properties"]["DashboardBody"])
+
+
+def test_dashboard_and_alarms_are_created_by_default(synth):
+    template = synth()
+
+    template.resource_count_is("AWS::CloudWatch::Dashboard", 1)
+    template.has_resource_properties(
+        "AWS::CloudWatch::Dashboard", {"DashboardName": "sample-test-performance"}
+    )
+    template.resource_count_is("AWS::CloudWatch::Alarm", len(DEFAULT_ALARM_THRESHOLDS))
+    template.resource_count_is("AWS::SNS::Subscription", 0)
+
+    body = dashboard_body(template)
+    for expected in (
+        "TargetResponseTime",
+        "p50",
+        "p90",
+        "p99",
+        "RequestCount",
+        "HTTPCode_Target_5XX_Count",
+        "HTTPCode_ELB_5XX_Count",
+        "HealthyHostCount",
+        "AutoScalingGroupName",
+        "DatabaseConnections",
+        "ReadLatency",
+        "WriteLatency",
+        "Duration",
+        "Throttles",
+        "5XXError",
+    ):
+        assert expected in body
+
+
+def test_alarm_thresholds_can_be_overridden_per_stage(synth):
+    template = synth(
+        alarm_thresholds='{"target_response_time_p99_seconds": 0.5}',
+        alarm_email="ops@example.com",
+    )
+
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "AlarmName": "sample-test-target-response-time-p99",
+            "Metrics": [
+                assertions.Match.object_like(
+                    {
+                        "MetricStat": assertions.Match.object_like(
+                            {
+                                "Metric": assertions.Match.object_like(
+                                    {"MetricName": "TargetResponseTime"}
+                                ),
+                                "Stat": "p99",
+                            }
+                        )
+                    }
+                )
+            ],
+            "Threshold": 0.5,
+            "EvaluationPeriods": 5,
+            "DatapointsToAlarm": 3,
+            "AlarmActions": [assertions.Match.any_value()],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "AlarmName": "sample-test-healthy-host-count",
+            "ComparisonOperator": "LessThanThreshold",
+            "Threshold": 1,
+        },
+    )
+    template.has_resource_properties(
+        "AWS::SNS::Subscription",
+        {"Protocol": "email", "Endpoint": "ops@example.com"},
+    )
+
+
+def test_aurora_and_http_api_metrics_are_used(synth):
+    template = synth(db_mode="aurora", api_type="http", web_fleet_mode="instance")
+
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "AlarmName": "sample-test-db-cpu",
+            "Namespace": "AWS/RDS",
+            "Dimensions": [
+                {"Name": "DBClusterIdentifier", "Value": assertions.Match.any_value()}
+            ],
+        },
+    )
+    template.has_resource_properties(
+        "AWS::CloudWatch::Alarm",
+        {
+            "AlarmName": "sample-test-api-5xx",
+            "MetricName": "5xx",
+            "Dimensions": [{"Name": "ApiId", "Value": assertions.Match.any_value()}],
+        },
+    )
+    assert "InstanceId" in dashboard_body(template)
+
+
+def test_monitoring_can_be_disabled(synth):
+    template = synth(monitoring_enabled="false")
+
+    template.resource_count_is("AWS::CloudWatch::Dashboard", 0)
+    template.resource_count_is("AWS::CloudWatch::Alarm", 0)
+
+
+def test_unknown_alarm_threshold_is_rejected(synth):
+    with pytest.raises(ValueError, match="unknown alarm thresholds"):
+        synth(alarm_thresholds='{"latency": 1}')
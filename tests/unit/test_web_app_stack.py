@@ -1,15 +1,28 @@
 import aws_cdk as core
-import aws_cdk.assertions as assertions
+import pytest
 
+from tests.unit.conftest import BASE_CONTEXT
 from web_app.web_app_stack import WebAppStack
 
-# example tests. To run these tests, uncomment this file along with the example
-# resource in web_app/web_app_stack.py
-def test_sqs_queue_created():
-    app = core.App()
-    stack = WebAppStack(app, "web-app")
-    template = assertions.Template.from_stack(stack)
 
-#     template.has_resource_properties("AWS::SQS::Queue", {
-#         "VisibilityTimeout": 300
-#     })
+def test_default_stack_has_core_resources(synth):
+    template = synth()
+
+    for resource_type in (
+        "AWS::EC2::VPC",
+        "AWS::ElasticLoadBalancingV2::LoadBalancer",
+        "AWS::AutoScaling::AutoScalingGroup",
+        "AWS::RDS::DBInstance",
+        "AWS::Cognito::UserPool",
+        "AWS::ApiGateway::RestApi",
+        "AWS::Lambda::Function",
+    ):
+        assert template.find_resources(resource_type), resource_type
+
+
+@pytest.mark.parametrize("key", ["stage", "key_pair", "certificate_arn"])
+def test_required_context_is_validated(key):
+    context = {k: v for k, v in BASE_CONTEXT.items() if k != key}
+
+    with pytest.raises(ValueError, match=f"{key} is required"):
+        WebAppStack(core.App(context=context), "web-app")
@@ -0,0 +1,121 @@
+import aws_cdk.assertions as assertions
+import pytest
+
+
+def test_autoscaling_fleet_replaces_fixed_instances(synth):
+    template = synth()
+
+    template.resource_count_is("AWS::EC2::Instance", 0)
+    template.resource_count_is("AWS::EC2::LaunchTemplate", 1)
+    template.has_resource_properties(
+        "AWS::AutoScaling::AutoScalingGroup",
+        {
+            "MinSize": "2",
+            "MaxSize": "4",
+            "HealthCheckType": "ELB",
+            "TargetGroupARNs": [
+                {"Ref": assertions.Match.string_like_regexp("targetgroup")}
+            ],
+        },
+    )
+
+
+def test_fixed_instance_fleet(synth):
+    template = synth(web_fleet_mode="instance")
+
+    template.resource_count_is("AWS::EC2::Instance", 2)
+    template.resource_count_is("AWS::AutoScaling::AutoScalingGroup", 0)
+
+
+def test_request_count_scaling_mode(synth):
+    template = synth(web_scaling_mode="request_count", web_requests_per_target="500")
+
+    template.resource_count_is("AWS::AutoScaling::ScalingPolicy", 1)
+    template.has_resource_properties(
+        "AWS::AutoScaling::ScalingPolicy",
+        {
+            "PolicyType": "TargetTrackingScaling",
+            "TargetTrackingConfiguration": {
+                "PredefinedMetricSpecification": {
+                    "PredefinedMetricType": "ALBRequestCountPerTarget",
+                },
+                "TargetValue": 500,
+            },
+        },
+    )
+
+
+def test_cpu_scaling_mode(synth):
+    template = synth(web_scaling_mode="cpu", web_cpu_utilization_percent="60")
+
+    template.resource_count_is("AWS::AutoScaling::ScalingPolicy", 1)
+    template.has_resource_properties(
+        "AWS::AutoScaling::ScalingPolicy",
+        {
+            "TargetTrackingConfiguration": {
+                "PredefinedMetricSpecification": {
+                    "PredefinedMetricType": "ASGAverageCPUUtilization",
+                },
+                "TargetValue": 60,
+            },
+        },
+    )
+
+
+def test_request_count_and_cpu_scaling_mode(synth):
+    template = synth(web_scaling_mode="request_count_and_cpu")
+
+    template.resource_count_is("AWS::AutoScaling::ScalingPolicy", 2)
+
+
+def test_fixed_capacity_scaling_mode(synth):
+    template = synth(
+        web_scaling_mode="none",
+        web_min_capacity="3",
+        web_max_capacity="3",
+        web_desired_capacity="3",
+    )
+
+    template.resource_count_is("AWS::AutoScaling::ScalingPolicy", 0)
+    template.has_resource_properties(
+        "AWS::AutoScaling::AutoScalingGroup",
+        {"MinSize": "3", "MaxSize": "3", "DesiredCapacity": "3"},
+    )
+
+
+def test_spot_on_demand_mix(synth):
+    template = synth(
+        web_on_demand_base_capacity="1",
+        web_on_demand_percentage="25",
+        web_spot_instance_types="t3a.micro,t3.micro",
+    )
+
+    template.has_resource_properties(
+        "AWS::AutoScaling::AutoScalingGroup",
+        {
+            "CapacityRebalance": True,
+            "MixedInstancesPolicy": {
+                "InstancesDistribution": {
+                    "OnDemandBaseCapacity": 1,
+                    "OnDemandPercentageAboveBaseCapacity": 25,
+                    "SpotAllocationStrategy": "price-capacity-optimized",
+                },
+                "LaunchTemplate": {
+                    "Overrides": [
+                        {"InstanceType": "t3a.micro"},
+                        {"InstanceType": "t3.micro"},
+                    ],
+                },
+            },
+        },
+    )
+
+
+def test_invalid_scaling_mode(synth):
+    with pytest.raises(ValueError, match="scaling_mode"):
+        synth(web_scaling_mode="memory")
+
+
+def test_invalid_capacity(synth):
+    with pytest.raises(ValueError, match="min_capacity"):
+        synth(web_min_capacity="5", web_max_capacity="2")
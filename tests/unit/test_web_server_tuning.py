@@ -0,0 +1,126 @@
+import json
+
+import aws_cdk.assertions as assertions
+import pytest
+from aws_cdk import aws_ec2 as ec2
+
+from tests.unit.conftest import build_stack
+from web_app.lib.ec2.instance_types import InstanceSpec, get_instance_spec
+from web_app.lib.ec2.web_server_tuning import (
+    HTTPD_TUNING_CONF,
+    PHP_TUNING_INI,
+    calculate_web_server_tuning,
+    get_web_tuning_commands,
+    render_php_fpm_pool_config,
+    render_web_server_config,
+)
+
+
+def launch_template_user_data(template: assertions.Template) -> str:
+    launch_templates = template.find_resources("AWS::EC2::LaunchTemplate")
+    (launch_template,) = launch_templates.values()
+    return json.dumps(launch_template["Properties"]["LaunchTemplateData"]["UserData"])
+
+
+@pytest.mark.parametrize(
+    "instance_type, pm, max_children, opcache_memory_mib, max_request_workers",
+    [
+        ("t3a.nano", "dynamic", 2, 64, 50),
+        ("t3a.micro", "dynamic", 9, 64, 50),
+        ("t4g.medium", "dynamic", 51, 128, 225),
+        ("c7g.large", "static", 51, 128, 225),
+        ("m7g.xlarge", "static", 222, 256, 900),
+    ],
+)
+def test_tuning_scales_with_instance_size(
+    instance_type, pm, max_children, opcache_memory_mib, max_request_workers
+):
+    tuning = calculate_web_server_tuning(instance_type)
+
+    assert tuning.pm == pm
+    assert tuning.pm_max_children == max_children
+    assert tuning.opcache_memory_mib == opcache_memory_mib
+    assert tuning.httpd_max_request_workers == max_request_workers
+    # PHP-FPMのワーカーとOPcacheがメモリに収まる
+    memory_mib = get_instance_spec(instance_type).memory_mib
+    assert max_children * 64 + opcache_memory_mib < memory_mib or max_children == 2
+
+
+def test_rendered_config_for_micro():
+    tuning = calculate_web_server_tuning(
+        ec2.InstanceType.of(ec2.InstanceClass.T3A, ec2.InstanceSize.MICRO)
+    )
+    config = render_web_server_config(tuning)
+
+    assert "ServerLimit 2\n" in config[HTTPD_TUNING_CONF]
+    assert "MaxRequestWorkers 50\n" in config[HTTPD_TUNING_CONF]
+    assert "KeepAliveTimeout 65\n" in config[HTTPD_TUNING_CONF]
+    assert "opcache.memory_consumption=64\n" in config[PHP_TUNING_INI]
+    assert "realpath_cache_size=4096K\n" in config[PHP_TUNING_INI]
+    assert render_php_fpm_pool_config(tuning) == (
+        "pm = dynamic\n"
+        "pm.max_children = 9\n"
+        "pm.start_servers = 2\n"
+        "pm.min_spare_servers = 2\n"
+        "pm.max_spare_servers = 4\n"
+        "pm.max_requests = 500\n"
+    )
+
+
+def test_static_pool_has_no_spare_server_settings():
+    pool_config = render_php_fpm_pool_config(calculate_web_server_tuning("m7g.large"))
+
+    assert pool_config.startswith("pm = static\npm.max_children = 109\n")
+    assert "spare_servers" not in pool_config
+
+
+def test_worker_rss_changes_max_children():
+    assert calculate_web_server_tuning("t3a.small", 64).pm_max_children == 23
+    assert calculate_web_server_tuning("t3a.small", 32).pm_max_children == 47
+
+
+@pytest.mark.parametrize(
+    "instance_type, vcpus, memory_mib",
+    [
+        ("m5.large", 2, 8192),
+        ("m6a.large", 2, 8192),
+        ("c5.xlarge", 4, 8192),
+        ("r6gd.2xlarge", 8, 65536),
+        ("m7i-flex.large", 2, 8192),
+        ("t2.micro", 2, 1024),
+        ("db.r5.large", 2, 16384),
+    ],
+)
+def test_unknown_instance_type_is_estimated_with_warning(
+    instance_type, vcpus, memory_mib
+):
+    with pytest.warns(UserWarning, match="estimated"):
+        spec = get_instance_spec(instance_type)
+
+    assert spec == InstanceSpec(vcpus, memory_mib)
+
+
+def test_instance_size_without_vcpus_is_rejected():
+    with pytest.raises(ValueError, match="unsupported instance size"):
+        get_web_tuning_commands("c5.metal")
+
+
+def test_spot_instance_types_outside_table_are_accepted():
+    with pytest.warns(UserWarning, match="not in INSTANCE_SPECS") as records:
+        build_stack(
+            web_on_demand_percentage="0",
+            web_spot_instance_types="m5.large,c5.xlarge",
+        )
+
+    assert {"m5.large", "c5.xlarge"} <= {
+        str(record.message).split()[0] for record in records
+    }
+
+
+def test_baked_instances_restart_to_apply_tuning(synth):
+    user_data = launch_template_user_data(synth(web_image_mode="bake"))
+
+    # AMIで起動済みのApacheとPHP-FPMが、書き込んだ設定で再起動する
+    restart = user_data.index("systemctl restart php-fpm httpd")
+    for path in (HTTPD_TUNING_CONF, PHP_TUNING_INI, "pm.max_children"):
+        assert user_data.index(path) < restart
@@ -0,0 +1,489 @@
+"""ALBのアクセスログを集計してレイテンシーのパーセンタイルを出力するツール
+
+ローカルのディレクトリまたはS3にあるアクセスログ（`.log.gz`）を1行ずつストリーミングで読み込み、
+パスごと・ターゲットごとのリクエストレートとレイテンシーのパーセンタイル、
+`/member/*` の認証リダイレクトの割合を集計する。
+ファイル全体をメモリに読み込まず、レイテンシーはマージ可能なスケッチで近似するため、
+1日あたり数GBのアクセスログでもメモリ使用量は一定に収まる。
+
+使い方:
+    python -m tools.analyze_alb_logs ./logs
+    python -m tools.analyze_alb_logs s3://bucket/alb/AWSLogs/123456789012/ --top 20
+"""
+
+import argparse
+import gzip
+import io
+import json
+import math
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import IO, Iterable, Iterator, Optional
+
+# アクセスログのフィールド。ダブルクォートで囲まれたフィールドは空白を含む
+# https://docs.aws.amazon.com/elasticloadbalancing/latest/application/load-balancer-access-logs.html
+_FIELD_PATTERN = re.compile(r'"[^"]*"|\S+')
+_FIELD_INDEX = {
+    "time": 1,
+    "target": 4,
+    "request_processing_time": 5,
+    "target_processing_time": 6,
+    "response_processing_time": 7,
+    "elb_status_code": 8,
+    "request": 12,
+    "actions_executed": 22,
+}
+_MIN_FIELDS = _FIELD_INDEX["actions_executed"] + 1
+
+# パスの集計単位にするため、IDのようなセグメントを置き換える
+_ID_SEGMENT_PATTERN = re.compile(
+    r"^(\d+|[0-9a-fA-F]{8}-([0-9a-fA-F]{4}-){3}[0-9a-fA-F]{12})$"
+)
+# パスの種類が上限を超えた場合の集計先
+OTHER_PATHS = "(other)"
+
+DEFAULT_AUTH_PATH_PATTERN = "/member/*"
+LOG_SUFFIXES = (".log", ".log.gz")
+
+
+class LatencySketch:
+    """相対誤差を保証するマージ可能なレイテンシーのスケッチ（DDSketch）
+
+    値を対数スケールのバケットに数え上げるため、件数によらずメモリ使用量は値の範囲の対数に比例する。
+    パーセンタイルの相対誤差は `relative_accuracy` 以下になる。
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        """コンストラクタ
+
+        Args:
+            relative_accuracy (float): パーセンタイルの相対誤差の上限
+        """
+        if not 0 < relative_accuracy < 1:
+            raise ValueError("relative_accuracy must be between 0 and 1")
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: dict[int, int] = {}
+        self._zero_count = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        """値を追加する
+
+        Args:
+            value (float): 追加する値（0以上）
+        """
+        if value < 0:
+            raise ValueError("value must not be negative")
+        if value == 0:
+            self._zero_count += 1
+        else:
+            index = math.ceil(math.log(value) / self._log_gamma)
+            self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencySketch") -> None:
+        """別のスケッチを取り込む
+
+        Args:
+            other (LatencySketch): 取り込むスケッチ。相対誤差が同じである必要がある
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("cannot merge sketches with different relative_accuracy")
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self._zero_count += other._zero_count
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """分位数を取得する
+
+        Args:
+            q (float): 分位数（0〜1）
+        Returns:
+            Optional[float]: 分位数の近似値。値がない場合はNone
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("q must be between 0 and 1")
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = self._zero_count
+        if rank < seen:
+            return 0.0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if rank < seen:
+                # バケットの範囲 (gamma^(i-1), gamma^i] の中で相対誤差が最小になる値
+                value = 2 * self._gamma**index / (self._gamma + 1)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+
+@dataclass
+class LogRecord:
+    """アクセスログの1行のうち集計に使うフィールド"""
+
+    time: datetime
+    path: str
+    target: str
+    elb_status_code: int
+    # リクエストの受信からレスポンスの送信までの秒数。ターゲットに転送されなかった場合はNone
+    latency: Optional[float]
+    actions_executed: tuple[str, ...]
+
+
+@dataclass
+class _Stats:
+    """パスまたはターゲットごとの集計値"""
+
+    sketch: LatencySketch
+    count: int = 0
+    errors_5xx: int = 0
+
+    def add(self, record: LogRecord) -> None:
+        self.count += 1
+        if record.elb_status_code >= 500:
+            self.errors_5xx += 1
+        if record.latency is not None:
+            self.sketch.add(record.latency)
+
+    def merge(self, other: "_Stats") -> None:
+        self.count += other.count
+        self.errors_5xx += other.errors_5xx
+        self.sketch.merge(other.sketch)
+
+
+def normalize_path(path: str) -> str:
+    """パスを集計単位に正規化する
+
+    クエリ文字列を取り除き、数値やUUIDのセグメントを `{id}` に置き換える
+
+    Args:
+        path (str): リクエストのパス
+    Returns:
+        str: 正規化したパス
+    """
+    path = path.split("?", 1)[0] or "/"
+    return "/".join(
+        "{id}" if _ID_SEGMENT_PATTERN.match(segment) else segment
+        for segment in path.split("/")
+    )
+
+
+def _parse_request_path(request: str) -> str:
+    """`GET https://example.com:443/path?q HTTP/1.1` 形式のリクエストからパスを取り出す"""
+    parts = request.split(" ")
+    if len(parts) < 2:
+        return "-"
+    url = parts[1]
+    scheme_end = url.find("://")
+    if scheme_end >= 0:
+        path_start = url.find("/", scheme_end + 3)
+        url = url[path_start:] if path_start >= 0 else "/"
+    return url
+
+
+def parse_line(line: str) -> Optional[LogRecord]:
+    """アクセスログの1行を解析する
+
+    Args:
+        line (str): アクセスログの1行
+    Returns:
+        Optional[LogRecord]: 解析した結果。解析できない行の場合はNone
+    """
+    fields = _FIELD_PATTERN.findall(line)
+    if len(fields) < _MIN_FIELDS:
+        return None
+    try:
+        timings = [
+            float(fields[_FIELD_INDEX[name]])
+            for name in (
+                "request_processing_time",
+                "target_processing_time",
+                "response_processing_time",
+            )
+        ]
+        elb_status_code = int(fields[_FIELD_INDEX["elb_status_code"]])
+        time = datetime.fromisoformat(fields[_FIELD_INDEX["time"]].replace("Z", ""))
+    except ValueError:
+        return None
+
+    return LogRecord(
+        time=time,
+        path=_parse_request_path(fields[_FIELD_INDEX["request"]].strip('"')),
+        target=fields[_FIELD_INDEX["target"]],
+        elb_status_code=elb_status_code,
+        # ターゲットに転送できなかった場合、処理時間は-1になる
+        latency=sum(timings) if min(timings) >= 0 else None,
+        actions_executed=tuple(
+            fields[_FIELD_INDEX["actions_executed"]].strip('"').split(",")
+        ),
+    )
+
+
+def iter_local_sources(path: Path) -> Iterator[tuple[str, IO[bytes]]]:
+    """ローカルのアクセスログのファイルを順に開く
+
+    Args:
+        path (Path): ファイルまたはディレクトリ
+    Returns:
+        Iterator[tuple[str, IO[bytes]]]: ファイル名とファイルのストリーム
+    """
+    files = (
+        sorted(p for p in path.rglob("*") if p.name.endswith(LOG_SUFFIXES))
+        if path.is_dir()
+        else [path]
+    )
+    for file in files:
+        with open(file, "rb") as stream:
+            yield file.name, stream
+
+
+def iter_s3_sources(url: str) -> Iterator[tuple[str, IO[bytes]]]:
+    """S3のアクセスログのオブジェクトを順に開く
+
+    Args:
+        url (str): `s3://bucket/prefix` 形式のURL
+    Returns:
+        Iterator[tuple[str, IO[bytes]]]: オブジェクトのキーとオブジェクトのストリーム
+    """
+    # S3から読み込む場合だけ必要なため、使うときに読み込む
+    import boto3
+
+    bucket, _, prefix = url.removeprefix("s3://").partition("/")
+    s3 = boto3.client("s3")
+    paginator = s3.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for content in page.get("Contents", []):
+            if not content["Key"].endswith(LOG_SUFFIXES):
+                continue
+            body = s3.get_object(Bucket=bucket, Key=content["Key"])["Body"]
+            try:
+                yield content["Key"], body
+            finally:
+                body.close()
+
+
+def iter_sources(locations: Iterable[str]) -> Iterator[tuple[str, IO[bytes]]]:
+    """ローカルのパスまたはS3のURLからアクセスログのストリームを順に開く"""
+    for location in locations:
+        if location.startswith("s3://"):
+            yield from iter_s3_sources(location)
+        else:
+            yield from iter_local_sources(Path(location))
+
+
+def iter_lines(sources: Iterable[tuple[str, IO[bytes]]]) -> Iterator[str]:
+    """ストリームから1行ずつ読み込む。`.gz` の場合は展開しながら読み込む"""
+    for name, stream in sources:
+        if name.endswith(".gz"):
+            stream = gzip.GzipFile(fileobj=stream)
+        yield from io.TextIOWrapper(stream, encoding="utf-8", errors="replace")
+
+
+def iter_records(lines: Iterable[str]) -> Iterator[LogRecord]:
+    """アクセスログの行を解析する。解析できない行は読み飛ばす"""
+    for line in lines:
+        record = parse_line(line)
+        if record is not None:
+            yield record
+
+
+@dataclass
+class AccessLogReport:
+    """アクセスログの集計結果
+
+    集計結果同士をマージできるため、ファイルごとに並列で集計してから1つにまとめられる
+    """
+
+    relative_accuracy: float = 0.01
+    # 集計するパスの種類の上限。超えた分は OTHER_PATHS にまとめる
+    max_paths: int = 1000
+    auth_path_pattern: str = DEFAULT_AUTH_PATH_PATTERN
+    total: _Stats = field(init=False)
+    paths: dict[str, _Stats] = field(init=False, default_factory=dict)
+    targets: dict[str, _Stats] = field(init=False, default_factory=dict)
+    auth_requests: int = field(init=False, default=0)
+    auth_redirects: int = field(init=False, default=0)
+    first_time: Optional[datetime] = field(init=False, default=None)
+    last_time: Optional[datetime] = field(init=False, default=None)
+
+    def __post_init__(self) -> None:
+        self.total = self._new_stats()
+
+    def _new_stats(self) -> _Stats:
+        return _Stats(sketch=LatencySketch(self.relative_accuracy))
+
+    def _stats_for(self, table: dict[str, _Stats], key: str) -> _Stats:
+        if key not in table:
+            if len(table) >= self.max_paths:
+                key = OTHER_PATHS
+            table.setdefault(key, self._new_stats())
+        return table[key]
+
+    def add(self, record: LogRecord) -> None:
+        """アクセスログの1行を集計する
+
+        Args:
+            record (LogRecord): アクセスログの1行
+        """
+        self.total.add(record)
+        path = normalize_path(record.path)
+        self._stats_for(self.paths, path).add(record)
+        if record.target != "-":
+            self._stats_for(self.targets, record.target).add(record)
+
+        # 未認証のリクエストはALBがCognitoのログイン画面にリダイレクトし、ターゲットには転送されない
+        if fnmatch(path, self.auth_path_pattern):
+            self.auth_requests += 1
+            if (
+                record.elb_status_code == 302
+                and record.target == "-"
+                and "authenticate" in record.actions_executed
+            ):
+                self.auth_redirects += 1
+
+        if self.first_time is None or record.time < self.first_time:
+            self.first_time = record.time
+        if self.last_time is None or record.time > self.last_time:
+            self.last_time = record.time
+
+    def merge(self, other: "AccessLogReport") -> None:
+        """別の集計結果を取り込む
+
+        Args:
+            other (AccessLogReport): 取り込む集計結果
+        """
+        self.total.merge(other.total)
+        for table, other_table in (
+            (self.paths, other.paths),
+            (self.targets, other.targets),
+        ):
+            for key, stats in other_table.items():
+                self._stats_for(table, key).merge(stats)
+        self.auth_requests += other.auth_requests
+        self.auth_redirects += other.auth_redirects
+        for time in (other.first_time, other.last_time):
+            if time is None:
+                continue
+            if self.first_time is None or time < self.first_time:
+                self.first_time = time
+            if self.last_time is None or time > self.last_time:
+                self.last_time = time
+
+    def duration_seconds(self) -> float:
+        """集計したアクセスログの期間（秒）。1秒未満の場合は1秒とする"""
+        if self.first_time is None or self.last_time is None:
+            return 1.0
+        return max(1.0, (self.last_time - self.first_time).total_seconds())
+
+    def to_dict(self, top: int = 10) -> dict:
+        """集計結果を辞書に変換する
+
+        Args:
+            top (int): 出力するパスとターゲットの数（リクエスト数の多い順）
+        Returns:
+            dict: 集計結果。レイテンシーはミリ秒
+        """
+        duration = self.duration_seconds()
+
+        def summarize(stats: _Stats) -> dict:
+            latency_ms = {
+                name: (
+                    round(value * 1000, 1)
+                    if (value := stats.sketch.quantile(q)) is not None
+                    else None
+                )
+                for name, q in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99))
+            }
+            return {
+                "requests": stats.count,
+                "rps": round(stats.count / duration, 3),
+                "errors_5xx": stats.errors_5xx,
+                "latency_ms": latency_ms,
+            }
+
+        def top_items(table: dict[str, _Stats]) -> dict:
+            ordered = sorted(table.items(), key=lambda item: (-item[1].count, item[0]))
+            return {key: summarize(stats) for key, stats in ordered[:top]}
+
+        return {
+            "period": {
+                "start": self.first_time.isoformat() if self.first_time else None,
+                "end": self.last_time.isoformat() if self.last_time else None,
+            },
+            "total": summarize(self.total),
+            "paths": top_items(self.paths),
+            "targets": top_items(self.targets),
+            "auth": {
+                "path_pattern": self.auth_path_pattern,
+                "requests": self.auth_requests,
+                "redirects": self.auth_redirects,
+                "redirect_ratio": (
+                    round(self.auth_redirects / self.auth_requests, 4)
+                    if self.auth_requests
+                    else None
+                ),
+            },
+        }
+
+
+def analyze(
+    locations: Iterable[str],
+    relative_accuracy: float = 0.01,
+    max_paths: int = 1000,
+    auth_path_pattern: str = DEFAULT_AUTH_PATH_PATTERN,
+) -> AccessLogReport:
+    """アクセスログを集計する
+
+    Args:
+        locations (Iterable[str]): ローカルのパスまたはS3のURL
+        relative_accuracy (float): パーセンタイルの相対誤差の上限
+        max_paths (int): 集計するパスとターゲットの種類の上限
+        auth_path_pattern (str): Cognito認証を適用しているパスのパターン
+    Returns:
+        AccessLogReport: 集計結果
+    """
+    report = AccessLogReport(
+        relative_accuracy=relative_accuracy,
+        max_paths=max_paths,
+        auth_path_pattern=auth_path_pattern,
+    )
+    for record in iter_records(iter_lines(iter_sources(locations))):
+        report.add(record)
+    return report
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("locations", nargs="+", help="directory, file or s3://")
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--relative-accuracy", type=float, default=0.01)
+    parser.add_argument("--max-paths", type=int, default=1000)
+    parser.add_argument("--auth-path-pattern", default=DEFAULT_AUTH_PATH_PATTERN)
+    args = parser.parse_args(argv)
+
+    report = analyze(
+        args.locations,
+        relative_accuracy=args.relative_accuracy,
+        max_paths=args.max_paths,
+        auth_path_pattern=args.auth_path_pattern,
+    )
+    print(json.dumps(report.to_dict(top=args.top), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
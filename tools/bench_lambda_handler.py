@@ -0,0 +1,172 @@
+"""Lambda関数のハンドラーのコールドスタートとウォームスタートを計測するベンチマーク
+
+モジュールの読み込み時間（コールドスタート時の初期化に相当）を新しいプロセスで、
+ウォームスタート時の呼び出しのレイテンシーを同じプロセスで繰り返し計測する。
+予算を超えた場合は終了コード1で終了するため、CIでコールドスタートの劣化を検知できる。
+
+使い方:
+    python -m tools.bench_lambda_handler --max-import-ms 300 --max-warm-p99-ms 1
+"""
+
+import argparse
+import importlib
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+DEFAULT_MODULE = "api_handler.app"
+
+# REST API（Cognitoオーソライザー）経由のイベント
+SAMPLE_EVENT = {
+    "resource": "/",
+    "path": "/",
+    "httpMethod": "GET",
+    "headers": {"Authorization": "Bearer dummy"},
+    "requestContext": {
+        "authorizer": {"claims": {"sub": "00000000-0000-0000-0000-000000000000"}},
+    },
+}
+
+_IMPORT_SNIPPET = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - start)"
+)
+
+
+def measure_import_time(
+    module: str = DEFAULT_MODULE, repeat: int = 5, src_dir: Path = SRC_DIR
+) -> list[float]:
+    """新しいPythonプロセスでモジュールの読み込み時間を計測する
+
+    Args:
+        module (str): 計測するモジュール
+        repeat (int): 計測する回数
+        src_dir (Path): モジュールを探すディレクトリ
+    Returns:
+        list[float]: 読み込み時間（秒）のリスト
+    """
+    results = []
+    for _ in range(repeat):
+        completed = subprocess.run(  # nosec B603
+            [sys.executable, "-c", _IMPORT_SNIPPET.format(module=module)],
+            capture_output=True,
+            check=True,
+            text=True,
+            env={"PYTHONPATH": str(src_dir), "PYTHONDONTWRITEBYTECODE": "1"},
+        )
+        results.append(float(completed.stdout.strip()))
+    return results
+
+
+def load_handler(
+    module: str = DEFAULT_MODULE, src_dir: Path = SRC_DIR
+) -> Callable[[dict, object], dict]:
+    """ハンドラーを読み込む
+
+    Args:
+        module (str): ハンドラーのモジュール
+        src_dir (Path): モジュールを探すディレクトリ
+    Returns:
+        Callable[[dict, object], dict]: ハンドラー
+    """
+    if str(src_dir) not in sys.path:
+        sys.path.insert(0, str(src_dir))
+    return importlib.import_module(module).handler
+
+
+def measure_warm_latency(
+    handler: Callable[[dict, object], dict],
+    event: dict = SAMPLE_EVENT,
+    iterations: int = 1000,
+) -> list[float]:
+    """ウォームスタート時の呼び出しのレイテンシーを計測する
+
+    Args:
+        handler (Callable[[dict, object], dict]): ハンドラー
+        event (dict): 呼び出し時のイベント
+        iterations (int): 呼び出す回数
+    Returns:
+        list[float]: レイテンシー（秒）のリスト
+    """
+    # 最初の呼び出しは計測に含めない
+    handler(event, None)
+    results = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        handler(event, None)
+        results.append(time.perf_counter() - start)
+    return results
+
+
+def percentile(values: list[float], q: float) -> float:
+    """パーセンタイルを計算する（最近傍法）
+
+    Args:
+        values (list[float]): 値のリスト
+        q (float): パーセンタイル（0〜100）
+    Returns:
+        float: パーセンタイルの値
+    """
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def run(module: str = DEFAULT_MODULE, repeat: int = 5, iterations: int = 1000) -> dict:
+    """ベンチマークを実行する
+
+    Args:
+        module (str): ハンドラーのモジュール
+        repeat (int): 読み込み時間を計測する回数
+        iterations (int): ウォームスタート時の呼び出し回数
+    Returns:
+        dict: 計測結果（ミリ秒）
+    """
+    import_times = measure_import_time(module, repeat=repeat)
+    warm_latencies = measure_warm_latency(load_handler(module), iterations=iterations)
+    return {
+        "module": module,
+        "import_ms": {
+            "median": statistics.median(import_times) * 1000,
+            "max": max(import_times) * 1000,
+        },
+        "warm_ms": {
+            "p50": percentile(warm_latencies, 50) * 1000,
+            "p99": percentile(warm_latencies, 99) * 1000,
+            "max": max(warm_latencies) * 1000,
+        },
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default=DEFAULT_MODULE)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--max-import-ms", type=float, default=None)
+    parser.add_argument("--max-warm-p99-ms", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    result = run(args.module, repeat=args.repeat, iterations=args.iterations)
+    print(json.dumps(result, indent=2))
+
+    over_budget = []
+    if args.max_import_ms is not None:
+        if result["import_ms"]["median"] > args.max_import_ms:
+            over_budget.append("import_ms.median")
+    if args.max_warm_p99_ms is not None:
+        if result["warm_ms"]["p99"] > args.max_warm_p99_ms:
+            over_budget.append("warm_ms.p99")
+    if over_budget:
+        print(f"over budget: {', '.join(over_budget)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
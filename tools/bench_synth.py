@@ -0,0 +1,168 @@
+"""`app.py` と同じ構成でスタックのsynthにかかる時間を計測するベンチマーク
+
+新しいPythonプロセスで、モジュールの読み込み（jsiiの起動を含む）、Constructの構築、
+テンプレートの出力のそれぞれにかかる時間を計測する。
+予算を超えた場合は終了コード1で終了するため、CIでsynth時間の増加を検知できる。
+
+使い方:
+    python -m tools.bench_synth --max-total-seconds 30
+    python -m tools.bench_synth -c stage=prod -c db_mode=aurora
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+
+# cdk.jsonに加えてsynthに必要な最小限のコンテキスト
+DEFAULT_CONTEXT = {
+    "app_name": "bench",
+    "stage": "dev",
+    "key_pair": "bench-key-pair",
+    "certificate_arn": (
+        "arn:aws:acm:ap-northeast-1:123456789012:certificate/"
+        "00000000-0000-0000-0000-000000000000"
+    ),
+}
+
+PHASES = ("import", "construct", "synth")
+
+_SYNTH_SNIPPET = """
+import json, time
+start = time.perf_counter()
+import aws_cdk as cdk
+from web_app.web_app_global_stack import create_web_app_stacks
+imported = time.perf_counter()
+app = cdk.App()
+create_web_app_stacks(app)
+constructed = time.perf_counter()
+app.synth()
+synthesized = time.perf_counter()
+print(json.dumps({
+    "import": imported - start,
+    "construct": constructed - imported,
+    "synth": synthesized - constructed,
+}))
+"""
+
+
+def load_cdk_context(root_dir: Path = ROOT_DIR) -> dict:
+    """cdk.jsonのコンテキスト（機能フラグ）を読み込む
+
+    Args:
+        root_dir (Path): cdk.jsonのあるディレクトリ
+    Returns:
+        dict: コンテキスト
+    """
+    cdk_json = root_dir / "cdk.json"
+    if not cdk_json.exists():
+        return {}
+    return json.loads(cdk_json.read_text()).get("context", {})
+
+
+def measure_synth_time(
+    context: dict, repeat: int = 3, root_dir: Path = ROOT_DIR
+) -> list[dict[str, float]]:
+    """新しいPythonプロセスでsynthの各フェーズの時間を計測する
+
+    コンテキストはCDK CLIと同様に環境変数CDK_CONTEXT_JSONで渡す
+
+    Args:
+        context (dict): コンテキスト
+        repeat (int): 計測する回数
+        root_dir (Path): app.pyのあるディレクトリ
+    Returns:
+        list[dict[str, float]]: フェーズごとの時間（秒）のリスト
+    """
+    results = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as outdir:
+            env = {
+                **os.environ,
+                "CDK_CONTEXT_JSON": json.dumps(context),
+                "CDK_OUTDIR": outdir,
+                "PYTHONPATH": str(root_dir),
+                "PYTHONDONTWRITEBYTECODE": "1",
+            }
+            completed = subprocess.run(  # nosec B603
+                [sys.executable, "-c", _SYNTH_SNIPPET],
+                capture_output=True,
+                check=True,
+                cwd=root_dir,
+                env=env,
+                text=True,
+            )
+        results.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def parse_context(values: list[str]) -> dict[str, str]:
+    """`key=value` 形式のコンテキストを辞書にする
+
+    Args:
+        values (list[str]): `key=value` のリスト
+    Returns:
+        dict[str, str]: コンテキスト
+    """
+    context = {}
+    for value in values:
+        key, sep, item = value.partition("=")
+        if not sep or not key:
+            raise ValueError(f"context must be key=value: {value}")
+        context[key] = item
+    return context
+
+
+def run(context: Optional[dict] = None, repeat: int = 3) -> dict:
+    """ベンチマークを実行する
+
+    Args:
+        context (Optional[dict]): DEFAULT_CONTEXTに上書きするコンテキスト
+        repeat (int): 計測する回数
+    Returns:
+        dict: 計測結果（秒）
+    """
+    context = {**load_cdk_context(), **DEFAULT_CONTEXT, **(context or {})}
+    timings = measure_synth_time(context, repeat=repeat)
+    totals = [sum(timing[phase] for phase in PHASES) for timing in timings]
+    return {
+        "context": {key: context[key] for key in sorted(context) if "@" not in key},
+        "seconds": {
+            **{
+                phase: statistics.median(timing[phase] for timing in timings)
+                for phase in PHASES
+            },
+            "total": statistics.median(totals),
+            "max_total": max(totals),
+        },
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "-c", "--context", action="append", default=[], metavar="KEY=VALUE"
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-total-seconds", type=float, default=None)
+    args = parser.parse_args(argv)
+
+    result = run(parse_context(args.context), repeat=args.repeat)
+    print(json.dumps(result, indent=2))
+
+    if args.max_total_seconds is not None:
+        if result["seconds"]["total"] > args.max_total_seconds:
+            print("over budget: seconds.total", file=sys.stderr)
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,999 @@
+"""Webアプリケーションに負荷をかけてスループットとレイテンシーを計測するツール
+
+匿名で閲覧できるページ、Cognito認証が必要な `/member/*`、API GatewayのGETを
+指定した割合で混ぜ、指定したレートでリクエストを送る。
+レスポンスを待たずに次のリクエストを送るオープンループのため、
+サーバーが遅くなってもリクエストのレートは下がらず、待ち時間もレイテンシーに含まれる。
+
+トークンはCognito（`--client-id` など）またはローカルのユーザープール（`--local`）から取得する。
+`--local` の場合はローカルのスタブサーバーに負荷をかけるため、AWSの環境なしで実行できる。
+
+使い方:
+    python -m tools.load_test --local --rate 200 --duration 10
+    python -m tools.load_test --base-url https://example.com \\
+        --api-url https://xxxxxxxxxx.execute-api.ap-northeast-1.amazonaws.com/prod \\
+        --client-id CLIENT_ID --client-secret CLIENT_SECRET \\
+        --username USERNAME --refresh-token REFRESH_TOKEN \\
+        --member-cookie "AWSELBAuthSessionCookie-0=..." \\
+        --mix anonymous=70,member=20,api=10 --rate 50 --duration 60
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import random
+import secrets
+import ssl
+import sys
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional, Protocol
+from urllib.parse import urlsplit
+
+from tools.analyze_alb_logs import LatencySketch
+
+DEFAULT_MIX = {"anonymous": 70, "member": 20, "api": 10}
+DEFAULT_ANONYMOUS_PATHS = ("/",)
+DEFAULT_MEMBER_PATHS = ("/member/index.php",)
+# ローカルのスタブサーバーでAPI Gatewayの代わりにするパス
+LOCAL_API_PREFIX = "/api"
+# ALBがCognito認証後に発行するセッションCookieの名前
+ALB_SESSION_COOKIE = "AWSELBAuthSessionCookie-0"
+
+# 出力するパーセンタイル
+PERCENTILES = (("p50", 0.5), ("p99", 0.99), ("p99.9", 0.999))
+# ヒストグラムのバケットの上限（ミリ秒）
+HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+# トークンの有効期限のこの秒数前に取り直す
+TOKEN_REFRESH_MARGIN_SECONDS = 60
+
+
+class AuthProvider(Protocol):
+    """APIの呼び出しに使うIDトークンを取得する"""
+
+    async def get_id_token(self) -> str: ...
+
+
+def _b64url_encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64url_decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def secret_hash(username: str, client_id: str, client_secret: str) -> str:
+    """クライアントシークレットを持つアプリクライアントで必要な `SECRET_HASH` を計算する
+
+    Args:
+        username (str): ユーザー名
+        client_id (str): アプリクライアントID
+        client_secret (str): クライアントシークレット
+    Returns:
+        str: SECRET_HASH
+    """
+    digest = hmac.new(
+        client_secret.encode("utf-8"),
+        (username + client_id).encode("utf-8"),
+        hashlib.sha256,
+    ).digest()
+    return base64.b64encode(digest).decode("ascii")
+
+
+class LocalUserPool:
+    """`SimpleUserPool` のユーザープールとアプリクライアントを模したローカルのユーザープール
+
+    boto3の `cognito-idp` クライアントと同じ形の `initiate_auth` を持ち、
+    Cognitoと同じクレームを持つIDトークン（HS256で署名）を発行する。
+    アプリクライアントはクライアントシークレットを持つため、`SECRET_HASH` を検証する。
+    """
+
+    def __init__(
+        self,
+        app_name: str = "sample",
+        stage: str = "local",
+        token_ttl_seconds: int = 3600,
+    ) -> None:
+        """コンストラクタ
+
+        Args:
+            app_name (str): アプリケーション名
+            stage (str): ステージ名
+            token_ttl_seconds (int): トークンの有効期限（秒）
+        """
+        self.user_pool_name = f"{app_name}-{stage}-user-pool"
+        self.user_pool_client_name = f"{app_name}-{stage}-user-pool-client"
+        self.user_pool_id = f"local_{secrets.token_hex(4)}"
+        self.client_id = secrets.token_hex(13)
+        self.client_secret = secrets.token_urlsafe(32)
+        self.issuer = f"https://cognito-idp.local/{self.user_pool_id}"
+        self.token_ttl_seconds = token_ttl_seconds
+        self._signing_key = secrets.token_bytes(32)
+        # username -> (sub, email, password)
+        self._users: dict[str, tuple[str, str, str]] = {}
+        # refresh token -> username
+        self._refresh_tokens: dict[str, str] = {}
+
+    def sign_up(self, email: str, password: str) -> str:
+        """ユーザーを登録する（メールアドレスは確認済みとする）
+
+        サインインのエイリアスはメールアドレスのため、ユーザー名はsubと同じUUIDになる
+
+        Args:
+            email (str): メールアドレス
+            password (str): パスワード
+        Returns:
+            str: ユーザー名（sub）
+        """
+        sub = str(uuid.uuid4())
+        self._users[sub] = (sub, email, password)
+        return sub
+
+    def _find_user(self, username: str) -> Optional[tuple[str, str, str]]:
+        if username in self._users:
+            return self._users[username]
+        for user in self._users.values():
+            if user[1] == username:
+                return user
+        return None
+
+    def _sign(self, claims: dict) -> str:
+        header = _b64url_encode(json.dumps({"alg": "HS256", "typ": "JWT"}).encode())
+        payload = _b64url_encode(json.dumps(claims, separators=(",", ":")).encode())
+        signature = hmac.new(
+            self._signing_key, f"{header}.{payload}".encode("ascii"), hashlib.sha256
+        ).digest()
+        return f"{header}.{payload}.{_b64url_encode(signature)}"
+
+    def _issue_tokens(self, user: tuple[str, str, str]) -> dict:
+        sub, email, _ = user
+        now = int(time.time())
+        common = {
+            "sub": sub,
+            "iss": self.issuer,
+            "auth_time": now,
+            "iat": now,
+            "exp": now + self.token_ttl_seconds,
+        }
+        id_token = self._sign(
+            {
+                **common,
+                "aud": self.client_id,
+                "token_use": "id",
+                "cognito:username": sub,
+                "email": email,
+                "email_verified": True,
+            }
+        )
+        access_token = self._sign(
+            {
+                **common,
+                "client_id": self.client_id,
+                "token_use": "access",
+                "scope": "aws.cognito.signin.user.admin",
+                "username": sub,
+            }
+        )
+        return {
+            "IdToken": id_token,
+            "AccessToken": access_token,
+            "ExpiresIn": self.token_ttl_seconds,
+            "TokenType": "Bearer",
+        }
+
+    def initiate_auth(self, AuthFlow: str, ClientId: str, AuthParameters: dict) -> dict:
+        """boto3の `initiate_auth` と同じ形でトークンを発行する
+
+        Args:
+            AuthFlow (str): `USER_PASSWORD_AUTH` または `REFRESH_TOKEN_AUTH`
+            ClientId (str): アプリクライアントID
+            AuthParameters (dict): 認証パラメーター
+        Returns:
+            dict: `AuthenticationResult` を持つレスポンス
+        """
+        if ClientId != self.client_id:
+            raise PermissionError("invalid client id")
+        username = AuthParameters.get("USERNAME", "")
+        user = self._find_user(username)
+        if user is None:
+            raise PermissionError("incorrect username or password")
+        expected = secret_hash(username, self.client_id, self.client_secret)
+        if not hmac.compare_digest(AuthParameters.get("SECRET_HASH", ""), expected):
+            raise PermissionError("unable to verify secret hash")
+
+        if AuthFlow == "USER_PASSWORD_AUTH":
+            if not hmac.compare_digest(AuthParameters.get("PASSWORD", ""), user[2]):
+                raise PermissionError("incorrect username or password")
+            result = self._issue_tokens(user)
+            result["RefreshToken"] = secrets.token_urlsafe(32)
+            self._refresh_tokens[result["RefreshToken"]] = user[0]
+        elif AuthFlow == "REFRESH_TOKEN_AUTH":
+            refresh_token = AuthParameters.get("REFRESH_TOKEN", "")
+            if self._refresh_tokens.get(refresh_token) != user[0]:
+                raise PermissionError("invalid refresh token")
+            result = self._issue_tokens(user)
+        else:
+            raise ValueError(f"unsupported auth flow: {AuthFlow}")
+        return {"AuthenticationResult": result}
+
+    def verify(self, token: str) -> Optional[dict]:
+        """このユーザープールが発行したIDトークンを検証する
+
+        Args:
+            token (str): IDトークン
+        Returns:
+            Optional[dict]: クレーム。検証できない場合はNone
+        """
+        try:
+            header, payload, signature = token.split(".")
+            expected = hmac.new(
+                self._signing_key,
+                f"{header}.{payload}".encode("ascii"),
+                hashlib.sha256,
+            ).digest()
+            if not hmac.compare_digest(_b64url_decode(signature), expected):
+                return None
+            claims = json.loads(_b64url_decode(payload))
+        except ValueError:
+            return None
+        if (
+            claims.get("token_use") != "id"
+            or claims.get("aud") != self.client_id
+            or claims.get("iss") != self.issuer
+            or claims.get("exp", 0) <= time.time()
+        ):
+            return None
+        return claims
+
+
+class CognitoAuthProvider:
+    """Cognitoのアプリクライアントでサインインし、IDトークンを取得する
+
+    `SimpleUserPool` のアプリクライアントは `ALLOW_USER_PASSWORD_AUTH` を許可していないため、
+    ホストされたUIなどで取得したリフレッシュトークンを使う（`REFRESH_TOKEN_AUTH`）。
+    `ALLOW_USER_PASSWORD_AUTH` を許可したアプリクライアントの場合はパスワードも使える。
+    トークンは有効期限が近づくまで使い回す。
+    """
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        username: str,
+        password: Optional[str] = None,
+        refresh_token: Optional[str] = None,
+        client: Optional[object] = None,
+        region: Optional[str] = None,
+    ) -> None:
+        """コンストラクタ
+
+        Args:
+            client_id (str): アプリクライアントID
+            client_secret (str): クライアントシークレット
+            username (str): ユーザー名（メールアドレスでサインインする場合はsub）
+            password (Optional[str]): パスワード
+            refresh_token (Optional[str]): リフレッシュトークン
+            client (Optional[object]): `initiate_auth` を持つクライアント。
+                未指定の場合はboto3の `cognito-idp` クライアント
+            region (Optional[str]): Cognitoのリージョン
+        """
+        if password is None and refresh_token is None:
+            raise ValueError("password or refresh_token is required")
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.username = username
+        self.password = password
+        self.refresh_token = refresh_token
+        if client is None:
+            # Cognitoを使う場合だけ必要なため、使うときに読み込む
+            import boto3
+
+            client = boto3.client("cognito-idp", region_name=region)
+        self._client = client
+        self._id_token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def _initiate_auth(self) -> dict:
+        parameters = {
+            "USERNAME": self.username,
+            "SECRET_HASH": secret_hash(
+                self.username, self.client_id, self.client_secret
+            ),
+        }
+        if self.refresh_token is not None:
+            auth_flow = "REFRESH_TOKEN_AUTH"
+            parameters["REFRESH_TOKEN"] = self.refresh_token
+        else:
+            auth_flow = "USER_PASSWORD_AUTH"
+            parameters["PASSWORD"] = self.password
+        response = self._client.initiate_auth(
+            AuthFlow=auth_flow, ClientId=self.client_id, AuthParameters=parameters
+        )
+        return response["AuthenticationResult"]
+
+    async def get_id_token(self) -> str:
+        """IDトークンを取得する。有効期限が近い場合は取り直す
+
+        Returns:
+            str: IDトークン
+        """
+        async with self._lock:
+            if self._id_token is None or time.time() >= self._expires_at:
+                # boto3の呼び出しはブロッキングのため、イベントループを止めないように別スレッドで行う
+                result = await asyncio.to_thread(self._initiate_auth)
+                self._id_token = result["IdToken"]
+                self._expires_at = (
+                    time.time() + result["ExpiresIn"] - TOKEN_REFRESH_MARGIN_SECONDS
+                )
+            return self._id_token
+
+
+class HttpError(Exception):
+    """HTTPのレスポンスを解析できない場合の例外"""
+
+
+class _Connection:
+    """Keep-AliveのHTTP/1.1の接続"""
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+class HttpClient:
+    """接続を使い回す最小限のasyncioのHTTP/1.1クライアント
+
+    負荷をかける側のオーバーヘッドを小さくするため、オリジンごとに接続をプールする
+    """
+
+    def __init__(self, timeout: float = 10.0, verify_tls: bool = True) -> None:
+        """コンストラクタ
+
+        Args:
+            timeout (float): 1リクエストあたりのタイムアウト（秒）
+            verify_tls (bool): TLSの証明書を検証するか
+        """
+        self.timeout = timeout
+        self._ssl_context = ssl.create_default_context()
+        if not verify_tls:
+            self._ssl_context.check_hostname = False
+            self._ssl_context.verify_mode = ssl.CERT_NONE
+        self._idle: dict[tuple[str, str, int], list[_Connection]] = {}
+
+    async def _connect(self, scheme: str, host: str, port: int) -> _Connection:
+        reader, writer = await asyncio.open_connection(
+            host,
+            port,
+            ssl=self._ssl_context if scheme == "https" else None,
+            server_hostname=host if scheme == "https" else None,
+        )
+        return _Connection(reader, writer)
+
+    async def request(
+        self, method: str, url: str, headers: Optional[dict[str, str]] = None
+    ) -> tuple[int, dict[str, str], bytes]:
+        """リクエストを送る
+
+        Args:
+            method (str): HTTPメソッド
+            url (str): URL
+            headers (Optional[dict[str, str]]): リクエストヘッダー
+        Returns:
+            tuple[int, dict[str, str], bytes]: ステータスコード、レスポンスヘッダー、ボディ
+        """
+        return await asyncio.wait_for(
+            self._request(method, url, headers or {}), self.timeout
+        )
+
+    async def _request(
+        self, method: str, url: str, headers: dict[str, str]
+    ) -> tuple[int, dict[str, str], bytes]:
+        parts = urlsplit(url)
+        scheme = parts.scheme
+        port = parts.port or (443 if scheme == "https" else 80)
+        origin = (scheme, parts.hostname, port)
+        target = parts.path or "/"
+        if parts.query:
+            target += f"?{parts.query}"
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {parts.netloc}",
+            "Connection: keep-alive",
+            "User-Agent: web-app-load-test",
+            *(f"{name}: {value}" for name, value in headers.items()),
+        ]
+        payload = ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+        idle = self._idle.setdefault(origin, [])
+        # プールの接続がサーバー側で閉じられていた場合は新しい接続で1回だけやり直す
+        for reused in (True, False):
+            if reused and not idle:
+                continue
+            connection = idle.pop() if reused else await self._connect(*origin)
+            try:
+                connection.writer.write(payload)
+                await connection.writer.drain()
+                status, response_headers, body = await _read_response(connection.reader)
+            except (ConnectionError, asyncio.IncompleteReadError, HttpError):
+                connection.close()
+                if reused:
+                    continue
+                raise
+            except BaseException:
+                connection.close()
+                raise
+            if response_headers.get("connection", "").lower() == "close":
+                connection.close()
+            else:
+                idle.append(connection)
+            return status, response_headers, body
+        raise HttpError("unreachable")
+
+    def close(self) -> None:
+        """プールしている接続を閉じる"""
+        for connections in self._idle.values():
+            for connection in connections:
+                connection.close()
+        self._idle.clear()
+
+
+async def _read_headers(reader: asyncio.StreamReader) -> dict[str, str]:
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if not line:
+            raise asyncio.IncompleteReadError(b"", None)
+        if line in (b"\r\n", b"\n"):
+            return headers
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+
+async def _read_response(
+    reader: asyncio.StreamReader,
+) -> tuple[int, dict[str, str], bytes]:
+    status_line = await reader.readline()
+    if not status_line:
+        raise asyncio.IncompleteReadError(b"", None)
+    try:
+        status = int(status_line.split(b" ", 2)[1])
+    except (IndexError, ValueError):
+        raise HttpError(f"invalid status line: {status_line!r}")
+    headers = await _read_headers(reader)
+
+    if headers.get("transfer-encoding", "").lower() == "chunked":
+        chunks = []
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            if size == 0:
+                # トレーラーを読み飛ばす
+                await _read_headers(reader)
+                break
+            chunks.append(await reader.readexactly(size))
+            await reader.readexactly(2)
+        body = b"".join(chunks)
+    elif "content-length" in headers:
+        body = await reader.readexactly(int(headers["content-length"]))
+    else:
+        body = await reader.read()
+        headers["connection"] = "close"
+    return status, headers, body
+
+
+class StubServer:
+    """負荷試験ツールをオフラインで試すためのスタブサーバー
+
+    ALBとAPI Gatewayの振る舞いを模す。
+
+    * `/member/*`: ALBのセッションCookie（値はローカルのユーザープールのIDトークン）がなければ
+      Cognitoのログイン画面へ302でリダイレクトする
+    * `/api/*`: `Authorization` ヘッダーのIDトークンを検証し、なければ401を返す
+    * その他: 匿名で閲覧できるページとして200を返す
+    """
+
+    def __init__(self, user_pool: LocalUserPool, delay_seconds: float = 0.0) -> None:
+        """コンストラクタ
+
+        Args:
+            user_pool (LocalUserPool): トークンを検証するユーザープール
+            delay_seconds (float): レスポンスを返すまでの待ち時間（秒）
+        """
+        self.user_pool = user_pool
+        self.delay_seconds = delay_seconds
+        self.requests = 0
+        self._server: Optional[asyncio.Server] = None
+        self._handlers: set[asyncio.Task] = set()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.sockets[0].getsockname()[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def api_url(self) -> str:
+        return self.base_url + LOCAL_API_PREFIX
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> None:
+        """サーバーを起動する
+
+        Args:
+            host (str): 待ち受けるアドレス
+            port (int): 待ち受けるポート。0の場合は空いているポート
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+
+    async def stop(self) -> None:
+        """サーバーを停止する。処理中の接続は閉じられるまで待つ"""
+        self._server.close()
+        if self._handlers:
+            await asyncio.wait(self._handlers)
+        await self._server.wait_closed()
+
+    async def __aenter__(self) -> "StubServer":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    def _route(self, path: str, headers: dict[str, str]) -> tuple[int, dict, bytes]:
+        if path.startswith("/member/"):
+            cookies = dict(
+                cookie.strip().partition("=")[::2]
+                for cookie in headers.get("cookie", "").split(";")
+                if cookie.strip()
+            )
+            if self.user_pool.verify(cookies.get(ALB_SESSION_COOKIE, "")) is None:
+                return 302, {"Location": "/oauth2/authorize"}, b""
+            return 200, {"Content-Type": "text/html"}, b"<html>member</html>"
+        if path == LOCAL_API_PREFIX or path.startswith(LOCAL_API_PREFIX + "/"):
+            token = headers.get("authorization", "").removeprefix("Bearer ")
+            claims = self.user_pool.verify(token)
+            if claims is None:
+                return (
+                    401,
+                    {"Content-Type": "application/json"},
+                    b'{"message":"Unauthorized"}',
+                )
+            body = json.dumps({"message": "Hello, World!", "user": claims["sub"]})
+            return 200, {"Content-Type": "application/json"}, body.encode()
+        return 200, {"Content-Type": "text/html"}, b"<html>anonymous</html>"
+
+    async def _handle(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        task = asyncio.current_task()
+        self._handlers.add(task)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = await _read_headers(reader)
+                if "content-length" in headers:
+                    await reader.readexactly(int(headers["content-length"]))
+                path = request_line.split(b" ")[1].decode("latin-1").split("?")[0]
+                self.requests += 1
+                if self.delay_seconds:
+                    await asyncio.sleep(self.delay_seconds)
+                status, response_headers, body = self._route(path, headers)
+                lines = [
+                    f"HTTP/1.1 {status} -",
+                    f"Content-Length: {len(body)}",
+                    *(f"{name}: {value}" for name, value in response_headers.items()),
+                ]
+                writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, IndexError, ValueError):
+            pass
+        finally:
+            writer.close()
+            self._handlers.discard(task)
+
+
+@dataclass
+class Scenario:
+    """リクエストの種類"""
+
+    name: str
+    # リクエストの割合（他のシナリオとの相対値）
+    weight: float
+    urls: tuple[str, ...]
+    # `none`: 認証なし、`cookie`: ALBのセッションCookie、`token`: AuthorizationヘッダーのIDトークン
+    auth: str = "none"
+
+
+def parse_mix(value: str) -> dict[str, float]:
+    """`anonymous=70,member=20,api=10` 形式の割合を解析する
+
+    Args:
+        value (str): 割合
+    Returns:
+        dict[str, float]: シナリオ名ごとの割合
+    """
+    mix = {}
+    for item in value.split(","):
+        name, _, weight = item.partition("=")
+        if name.strip() not in DEFAULT_MIX:
+            raise ValueError(f"unknown scenario: {name.strip()}")
+        mix[name.strip()] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise ValueError("mix must have a positive weight")
+    return mix
+
+
+def build_scenarios(
+    base_url: Optional[str],
+    api_url: Optional[str],
+    mix: dict[str, float],
+    anonymous_paths: tuple[str, ...] = DEFAULT_ANONYMOUS_PATHS,
+    member_paths: tuple[str, ...] = DEFAULT_MEMBER_PATHS,
+    api_path: str = "/",
+) -> list[Scenario]:
+    """割合からシナリオを作成する。割合が0のシナリオは作成しない
+
+    Args:
+        base_url (Optional[str]): ALB（またはCloudFront）のURL
+        api_url (Optional[str]): API GatewayのステージのURL
+        mix (dict[str, float]): シナリオ名ごとの割合
+        anonymous_paths (tuple[str, ...]): 匿名で閲覧できるページのパス
+        member_paths (tuple[str, ...]): Cognito認証が必要なページのパス
+        api_path (str): APIのパス
+    Returns:
+        list[Scenario]: シナリオ
+    """
+    scenarios = []
+    for name, weight in mix.items():
+        if weight <= 0:
+            continue
+        if name == "api":
+            if not api_url:
+                raise ValueError("api_url is required for the api scenario")
+            url = api_url.rstrip("/") + "/" + api_path.lstrip("/")
+            scenarios.append(Scenario(name, weight, (url,), "token"))
+            continue
+        if not base_url:
+            raise ValueError(f"base_url is required for the {name} scenario")
+        paths = anonymous_paths if name == "anonymous" else member_paths
+        urls = tuple(base_url.rstrip("/") + path for path in paths)
+        scenarios.append(
+            Scenario(name, weight, urls, "none" if name == "anonymous" else "cookie")
+        )
+    return scenarios
+
+
+@dataclass
+class _Stats:
+    """シナリオごとの計測値"""
+
+    sketch: LatencySketch = field(default_factory=LatencySketch)
+    histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(HISTOGRAM_BOUNDS_MS) + 1)
+    )
+    status_codes: dict[int, int] = field(default_factory=dict)
+    errors: dict[str, int] = field(default_factory=dict)
+
+    def add(self, latency: float, status: Optional[int], error: Optional[str]) -> None:
+        self.sketch.add(latency)
+        latency_ms = latency * 1000
+        index = next(
+            (i for i, bound in enumerate(HISTOGRAM_BOUNDS_MS) if latency_ms <= bound),
+            len(HISTOGRAM_BOUNDS_MS),
+        )
+        self.histogram[index] += 1
+        if status is not None:
+            self.status_codes[status] = self.status_codes.get(status, 0) + 1
+        if error is not None:
+            self.errors[error] = self.errors.get(error, 0) + 1
+
+    def merge(self, other: "_Stats") -> None:
+        self.sketch.merge(other.sketch)
+        self.histogram = [a + b for a, b in zip(self.histogram, other.histogram)]
+        for status, count in other.status_codes.items():
+            self.status_codes[status] = self.status_codes.get(status, 0) + count
+        for error, count in other.errors.items():
+            self.errors[error] = self.errors.get(error, 0) + count
+
+
+@dataclass
+class LoadTestReport:
+    """負荷試験の結果"""
+
+    target_rate: float
+    elapsed_seconds: float = 0.0
+    scheduled: int = 0
+    # 同時に処理中のリクエスト数が上限に達したため送らなかったリクエスト数
+    dropped: int = 0
+    scenarios: dict[str, _Stats] = field(default_factory=dict)
+
+    def total(self) -> _Stats:
+        """全シナリオを合わせた計測値"""
+        total = _Stats()
+        for stats in self.scenarios.values():
+            total.merge(stats)
+        return total
+
+    def to_dict(self) -> dict:
+        """結果を辞書に変換する
+
+        Returns:
+            dict: 結果。レイテンシーはミリ秒
+        """
+        elapsed = max(self.elapsed_seconds, 1e-9)
+
+        def summarize(stats: _Stats) -> dict:
+            completed = stats.sketch.count
+            ok = sum(
+                count for status, count in stats.status_codes.items() if status < 400
+            )
+            return {
+                "requests": completed,
+                "throughput_rps": round(completed / elapsed, 3),
+                "ok_rps": round(ok / elapsed, 3),
+                "status_codes": {
+                    str(status): count
+                    for status, count in sorted(stats.status_codes.items())
+                },
+                "errors": dict(sorted(stats.errors.items())),
+                "latency_ms": {
+                    **{
+                        name: (
+                            round(value * 1000, 3)
+                            if (value := stats.sketch.quantile(q)) is not None
+                            else None
+                        )
+                        for name, q in PERCENTILES
+                    },
+                    "max": round(stats.sketch.max * 1000, 3) if completed else None,
+                },
+                "histogram_ms": {
+                    **{
+                        f"<={bound}": count
+                        for bound, count in zip(HISTOGRAM_BOUNDS_MS, stats.histogram)
+                    },
+                    f">{HISTOGRAM_BOUNDS_MS[-1]}": stats.histogram[-1],
+                },
+            }
+
+        return {
+            "target_rps": self.target_rate,
+            "elapsed_seconds": round(self.elapsed_seconds, 3),
+            "scheduled": self.scheduled,
+            "dropped": self.dropped,
+            "total": summarize(self.total()),
+            "scenarios": {
+                name: summarize(stats) for name, stats in sorted(self.scenarios.items())
+            },
+        }
+
+
+async def run_load(
+    scenarios: list[Scenario],
+    rate: float,
+    duration: float,
+    auth_provider: Optional[AuthProvider] = None,
+    member_cookie: Optional[str] = None,
+    arrival: str = "poisson",
+    max_in_flight: int = 1000,
+    timeout: float = 10.0,
+    verify_tls: bool = True,
+    seed: Optional[int] = None,
+) -> LoadTestReport:
+    """オープンループで負荷をかける
+
+    リクエストは予定した時刻にレスポンスを待たずに送り、レイテンシーは予定した時刻から計測する。
+    そのため、負荷をかける側やサーバーの遅れによる待ち時間もレイテンシーに含まれる。
+
+    Args:
+        scenarios (list[Scenario]): シナリオ
+        rate (float): 1秒あたりのリクエスト数
+        duration (float): 負荷をかける秒数
+        auth_provider (Optional[AuthProvider]): `token` のシナリオで使うIDトークンの取得元
+        member_cookie (Optional[str]): `cookie` のシナリオで送るCookie
+        arrival (str): `poisson`: 指数分布の間隔、`constant`: 一定の間隔
+        max_in_flight (int): 同時に処理中のリクエスト数の上限
+        timeout (float): 1リクエストあたりのタイムアウト（秒）
+        verify_tls (bool): TLSの証明書を検証するか
+        seed (Optional[int]): 乱数のシード
+    Returns:
+        LoadTestReport: 結果
+    """
+    if rate <= 0 or duration <= 0:
+        raise ValueError("rate and duration must be positive")
+    if arrival not in ("poisson", "constant"):
+        raise ValueError(f"unknown arrival: {arrival}")
+    if any(s.auth == "token" for s in scenarios) and auth_provider is None:
+        raise ValueError("auth_provider is required for scenarios with token auth")
+
+    rng = random.Random(seed)
+    client = HttpClient(timeout=timeout, verify_tls=verify_tls)
+    report = LoadTestReport(
+        target_rate=rate, scenarios={s.name: _Stats() for s in scenarios}
+    )
+    weights = [s.weight for s in scenarios]
+    in_flight: set[asyncio.Task] = set()
+    loop = asyncio.get_running_loop()
+
+    # 計測前にトークンを取得しておく
+    if auth_provider is not None:
+        await auth_provider.get_id_token()
+
+    async def send(scenario: Scenario, url: str, scheduled_at: float) -> None:
+        headers = {}
+        if scenario.auth == "token":
+            headers["Authorization"] = await auth_provider.get_id_token()
+        elif scenario.auth == "cookie" and member_cookie:
+            headers["Cookie"] = member_cookie
+        status, error = None, None
+        try:
+            status, _, _ = await client.request("GET", url, headers)
+        except asyncio.TimeoutError:
+            error = "timeout"
+        except (OSError, asyncio.IncompleteReadError, HttpError) as e:
+            error = type(e).__name__
+        report.scenarios[scenario.name].add(
+            max(0.0, loop.time() - scheduled_at), status, error
+        )
+
+    start = loop.time()
+    next_at = start
+    try:
+        while next_at < start + duration:
+            delay = next_at - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            report.scheduled += 1
+            if len(in_flight) >= max_in_flight:
+                report.dropped += 1
+            else:
+                scenario = rng.choices(scenarios, weights)[0]
+                task = asyncio.create_task(
+                    send(scenario, rng.choice(scenario.urls), next_at)
+                )
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if arrival == "poisson":
+                next_at += rng.expovariate(rate)
+            else:
+                # 誤差が積み上がらないように開始時刻からの間隔で計算する
+                next_at = start + report.scheduled / rate
+        if in_flight:
+            await asyncio.wait(in_flight)
+    finally:
+        report.elapsed_seconds = loop.time() - start
+        client.close()
+    return report
+
+
+async def run_local(
+    mix: dict[str, float],
+    rate: float,
+    duration: float,
+    delay_seconds: float = 0.0,
+    **kwargs,
+) -> LoadTestReport:
+    """ローカルのユーザープールとスタブサーバーに対して負荷をかける
+
+    Args:
+        mix (dict[str, float]): シナリオ名ごとの割合
+        rate (float): 1秒あたりのリクエスト数
+        duration (float): 負荷をかける秒数
+        delay_seconds (float): スタブサーバーのレスポンスの待ち時間（秒）
+        **kwargs: `run_load` に渡す引数
+    Returns:
+        LoadTestReport: 結果
+    """
+    user_pool = LocalUserPool()
+    password = secrets.token_urlsafe(16)
+    username = user_pool.sign_up("load-test@example.com", password)
+    auth_provider = CognitoAuthProvider(
+        user_pool.client_id,
+        user_pool.client_secret,
+        username,
+        password=password,
+        client=user_pool,
+    )
+    member_cookie = f"{ALB_SESSION_COOKIE}={await auth_provider.get_id_token()}"
+    async with StubServer(user_pool, delay_seconds=delay_seconds) as server:
+        scenarios = build_scenarios(server.base_url, server.api_url, mix)
+        return await run_load(
+            scenarios,
+            rate,
+            duration,
+            auth_provider=auth_provider,
+            member_cookie=member_cookie,
+            **kwargs,
+        )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--local", action="store_true", help="use the local stub")
+    parser.add_argument("--base-url")
+    parser.add_argument("--api-url")
+    parser.add_argument("--mix", default="anonymous=70,member=20,api=10")
+    parser.add_argument("--anonymous-paths", default=",".join(DEFAULT_ANONYMOUS_PATHS))
+    parser.add_argument("--member-paths", default=",".join(DEFAULT_MEMBER_PATHS))
+    parser.add_argument("--api-path", default="/")
+    parser.add_argument("--rate", type=float, default=10.0)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--arrival", choices=("poisson", "constant"), default="poisson")
+    parser.add_argument("--max-in-flight", type=int, default=1000)
+    parser.add_argument("--timeout", type=float, default=10.0)
+    parser.add_argument("--insecure", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--local-delay-ms", type=float, default=0.0)
+    parser.add_argument("--client-id")
+    parser.add_argument("--client-secret")
+    parser.add_argument("--username")
+    parser.add_argument("--password")
+    parser.add_argument("--refresh-token")
+    parser.add_argument("--region")
+    parser.add_argument("--member-cookie")
+    args = parser.parse_args(argv)
+
+    mix = parse_mix(args.mix)
+    options = {
+        "arrival": args.arrival,
+        "max_in_flight": args.max_in_flight,
+        "timeout": args.timeout,
+        "verify_tls": not args.insecure,
+        "seed": args.seed,
+    }
+    if args.local:
+        report = asyncio.run(
+            run_local(
+                mix,
+                args.rate,
+                args.duration,
+                delay_seconds=args.local_delay_ms / 1000,
+                **options,
+            )
+        )
+    else:
+        auth_provider = None
+        if mix.get("api", 0) > 0:
+            if not (args.client_id and args.client_secret and args.username):
+                parser.error("--client-id, --client-secret and --username are required")
+            auth_provider = CognitoAuthProvider(
+                args.client_id,
+                args.client_secret,
+                args.username,
+                password=args.password,
+                refresh_token=args.refresh_token,
+                region=args.region,
+            )
+        scenarios = build_scenarios(
+            args.base_url,
+            args.api_url,
+            mix,
+            anonymous_paths=tuple(args.anonymous_paths.split(",")),
+            member_paths=tuple(args.member_paths.split(",")),
+            api_path=args.api_path,
+        )
+        report = asyncio.run(
+            run_load(
+                scenarios,
+                args.rate,
+                args.duration,
+                auth_provider=auth_provider,
+                member_cookie=args.member_cookie,
+                **options,
+            )
+        )
+    print(json.dumps(report.to_dict(), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+from typing import Optional
+
+from aws_cdk import Duration, Size
+from aws_cdk import aws_apigateway as apigw
+from aws_cdk import aws_apigatewayv2 as apigwv2
+from aws_cdk import aws_apigatewayv2_authorizers as apigwv2_authorizers
+from aws_cdk import aws_apigatewayv2_integrations as apigwv2_integrations
+from aws_cdk import aws_cognito as cognito
+from aws_cdk import aws_lambda as _lambda
+from constructs import Construct
+
+# APIのフロントエンドの種類
+# rest: REST API（オーソライザーのキャッシュ、メソッドキャッシュ、圧縮、スロットリング）
+# http: HTTP API（JWTオーソライザー。REST APIよりレイテンシーと料金が小さい）
+API_TYPES = ("rest", "http")
+
+
+def _parse_route_key(route_key: str) -> tuple[str, str]:
+    """`GET /path` 形式のルートキーをHTTPメソッドとパスに分割する"""
+    method, _, path = route_key.strip().partition(" ")
+    if not method or not path.startswith("/"):
+        raise ValueError(f"route key must be like 'GET /path': {route_key}")
+    return method.upper(), path
+
+
+def _to_method_options_path(route_key: str) -> str:
+    """`GET /path` 形式のルートキーをREST APIのメソッド設定のパス（`/path/GET`）に変換する"""
+    method, path = _parse_route_key(route_key)
+    return f"{path.rstrip('/')}/{method}" if path != "/" else f"//{method}"
+
+
+def create_rest_api(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    handler: _lambda.IFunction,
+    user_pool: cognito.UserPool,
+    authorizer_cache_ttl_seconds: int = 300,
+    cache_enabled: bool = False,
+    cache_ttl_seconds: int = 60,
+    cache_cluster_size: str = "0.5",
+    minimum_compression_size_bytes: int = 1024,
+    throttling_rate_limit: Optional[float] = None,
+    throttling_burst_limit: Optional[int] = None,
+    method_throttling: Optional[dict[str, dict]] = None,
+) -> apigw.RestApi:
+    """Cognito認証付きのREST APIを作成する
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        handler (_lambda.IFunction): バックエンドのLambda関数
+        user_pool (cognito.UserPool): Cognitoユーザープール
+        authorizer_cache_ttl_seconds (int): オーソライザーの結果をキャッシュする秒数
+        cache_enabled (bool): ステージのメソッドキャッシュを有効にするか
+        cache_ttl_seconds (int): メソッドキャッシュの秒数
+        cache_cluster_size (str): キャッシュクラスターのサイズ（GB）
+        minimum_compression_size_bytes (int): レスポンスを圧縮する最小サイズ（バイト）
+        throttling_rate_limit (Optional[float]): ステージ全体の1秒あたりのリクエスト数の上限
+        throttling_burst_limit (Optional[int]): ステージ全体のバーストの上限
+        method_throttling (Optional[dict[str, dict]]):
+            メソッドごとのスロットリング。`{"GET /": {"rate_limit": 50, "burst_limit": 100}}`
+    Returns:
+        apigw.RestApi: REST API
+    """
+    # ALBに設定したものと同じCognito認証を設定する
+    cognito_authorizer = apigw.CognitoUserPoolsAuthorizer(
+        scope,
+        id=f"{app_name}_{stage}_cognito_authorizer",
+        cognito_user_pools=[user_pool],
+        authorizer_name=f"{app_name}-{stage}-cognito-authorizer",
+        results_cache_ttl=Duration.seconds(authorizer_cache_ttl_seconds),
+    )
+
+    method_options: dict[str, apigw.MethodDeploymentOptions] = {
+        _to_method_options_path(route_key): apigw.MethodDeploymentOptions(
+            throttling_rate_limit=throttling.get("rate_limit"),
+            throttling_burst_limit=throttling.get("burst_limit"),
+        )
+        for route_key, throttling in (method_throttling or {}).items()
+    }
+
+    rest_api = apigw.RestApi(
+        scope,
+        id=f"{app_name}_{stage}_api",
+        rest_api_name=f"{app_name}-{stage}-api",
+        min_compression_size=Size.bytes(minimum_compression_size_bytes),
+        deploy_options=apigw.StageOptions(
+            cache_cluster_enabled=cache_enabled or None,
+            cache_cluster_size=cache_cluster_size if cache_enabled else None,
+            caching_enabled=cache_enabled or None,
+            cache_ttl=Duration.seconds(cache_ttl_seconds) if cache_enabled else None,
+            throttling_rate_limit=throttling_rate_limit,
+            throttling_burst_limit=throttling_burst_limit,
+            method_options=method_options or None,
+        ),
+    )
+
+    # 利用者ごとに異なるレスポンスを返すため、キャッシュキーにAuthorizationヘッダーを含める
+    rest_api.root.add_method(
+        "GET",
+        apigw.LambdaIntegration(
+            handler,
+            cache_key_parameters=(
+                ["method.request.header.Authorization"] if cache_enabled else None
+            ),
+        ),
+        authorizer=cognito_authorizer,
+        request_parameters=(
+            {"method.request.header.Authorization": True} if cache_enabled else None
+        ),
+    )
+
+    return rest_api
+
+
+def create_http_api(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    handler: _lambda.IFunction,
+    user_pool: cognito.UserPool,
+    user_pool_client: cognito.UserPoolClient,
+    throttling_rate_limit: Optional[float] = None,
+    throttling_burst_limit: Optional[int] = None,
+    method_throttling: Optional[dict[str, dict]] = None,
+) -> apigwv2.HttpApi:
+    """CognitoのJWTオーソライザー付きのHTTP APIを作成する
+
+    HTTP APIはメソッドキャッシュとレスポンスの圧縮に対応していない。
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        handler (_lambda.IFunction): バックエンドのLambda関数
+        user_pool (cognito.UserPool): Cognitoユーザープール
+        user_pool_client (cognito.UserPoolClient): JWTのaudienceにするユーザープールクライアント
+        throttling_rate_limit (Optional[float]): ステージ全体の1秒あたりのリクエスト数の上限
+        throttling_burst_limit (Optional[int]): ステージ全体のバーストの上限
+        method_throttling (Optional[dict[str, dict]]):
+            ルートごとのスロットリング。`{"GET /": {"rate_limit": 50, "burst_limit": 100}}`
+    Returns:
+        apigwv2.HttpApi: HTTP API
+    """
+    http_api = apigwv2.HttpApi(
+        scope,
+        id=f"{app_name}_{stage}_http_api",
+        api_name=f"{app_name}-{stage}-http-api",
+        create_default_stage=False,
+    )
+
+    default_stage = apigwv2.HttpStage(
+        scope,
+        id=f"{app_name}_{stage}_http_api_default_stage",
+        http_api=http_api,
+        stage_name="$default",
+        auto_deploy=True,
+        throttle=(
+            apigwv2.ThrottleSettings(
+                rate_limit=throttling_rate_limit,
+                burst_limit=throttling_burst_limit,
+            )
+            if throttling_rate_limit is not None or throttling_burst_limit is not None
+            else None
+        ),
+    )
+
+    # ルートごとのスロットリングはL2で指定できないため、L1のプロパティで設定する
+    if method_throttling:
+        cfn_stage: apigwv2.CfnStage = default_stage.node.default_child
+        cfn_stage.route_settings = {
+            "{} {}".format(*_parse_route_key(route_key)): {
+                "ThrottlingRateLimit": throttling.get("rate_limit"),
+                "ThrottlingBurstLimit": throttling.get("burst_limit"),
+            }
+            for route_key, throttling in method_throttling.items()
+        }
+
+    # ALBに設定したものと同じユーザープールのJWTで認証する
+    jwt_authorizer = apigwv2_authorizers.HttpUserPoolAuthorizer(
+        f"{app_name}_{stage}_jwt_authorizer",
+        user_pool,
+        authorizer_name=f"{app_name}-{stage}-jwt-authorizer",
+        user_pool_clients=[user_pool_client],
+    )
+
+    http_api.add_routes(
+        path="/",
+        methods=[apigwv2.HttpMethod.GET],
+        integration=apigwv2_integrations.HttpLambdaIntegration(
+            f"{app_name}_{stage}_http_api_integration", handler
+        ),
+        authorizer=jwt_authorizer,
+    )
+
+    return http_api
@@ -0,0 +1,195 @@
+import re
+from typing import Any, Optional
+
+import jsii
+from aws_cdk import Annotations, IAspect, Stack
+from aws_cdk import aws_apigateway as apigw
+from aws_cdk import aws_apigatewayv2 as apigwv2
+from aws_cdk import aws_autoscaling as autoscaling
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_elasticache as elasticache
+from aws_cdk import aws_elasticloadbalancingv2 as elb
+from aws_cdk import aws_lambda as _lambda
+from aws_cdk import aws_rds as rds
+from constructs import IConstruct
+
+# 検出するパフォーマンスとスケーリングの問題
+PERFORMANCE_RULES = {
+    "burstable-instance": "バースト可能なインスタンスクラス（CPUクレジットが枯渇すると性能が低下する）",
+    "single-nat-gateway": "複数のAZのプライベートサブネットが1つのNATゲートウェイを共有している",
+    "target-group-slow-start": "ターゲットグループのスロースタートが無効",
+    "db-without-proxy": "RDS Proxyを経由せずにデータベースに接続している",
+    "db-default-parameter-group": "RDSインスタンスがデフォルトのパラメータグループを使っている",
+    "lambda-memory-size": "Lambda関数のメモリサイズが明示されていない",
+    "lambda-architecture": "Lambda関数のアーキテクチャが明示されていない",
+    "api-throttling": "API Gatewayのステージにスロットリングが設定されていない",
+}
+# 本番環境でのみ検出するルール（開発環境ではコストを優先してよいもの）
+PRODUCTION_ONLY_RULES = ("burstable-instance", "single-nat-gateway")
+# 本番環境でもエラーにせず警告にとどめるルール（構成上の選択肢として残すもの）
+ADVISORY_RULES = ("db-without-proxy",)
+
+_BURSTABLE_PATTERN = re.compile(r"^(db\.|cache\.)?t\d")
+# CDKが内部で作成するカスタムリソース用のLambda関数はチェックしない
+_CDK_MANAGED_FUNCTION_PREFIXES = (
+    "Custom::",
+    "SingletonLambda",
+    "LogRetention",
+    # AwsCustomResourceの関数
+    "AWS679f53fac002430cb0da5b7982bd2287",
+)
+
+
+@jsii.implements(IAspect)
+class PerformanceChecker:
+    """構築したConstructのツリーからパフォーマンスとスケーリングの問題を検出するAspect
+
+    検出した問題は、本番環境ではエラー、それ以外では警告としてConstructに注記する。
+    エラーがある場合は `cdk synth` と `cdk deploy` が失敗する。
+    警告はルールごとのID（`web-app:performance:<ルール>`）で個別に承認できる。
+    """
+
+    def __init__(self, production: bool = False, ignore: Optional[list[str]] = None):
+        """コンストラクタ
+
+        Args:
+            production (bool): 本番環境か。本番環境では問題をエラーにする
+            ignore (Optional[list[str]]): 検出しないルールのリスト
+        """
+        unknown_rules = set(ignore or []) - set(PERFORMANCE_RULES)
+        if unknown_rules:
+            raise ValueError(
+                f"unknown performance rules: {', '.join(sorted(unknown_rules))}"
+            )
+        self._production = production
+        self._ignore = set(ignore or [])
+
+    def visit(self, node: IConstruct) -> None:
+        """Constructをチェックする
+
+        Args:
+            node (IConstruct): チェックするConstruct
+        """
+        if isinstance(node, ec2.CfnLaunchTemplate):
+            data = self._resolve(node, node.launch_template_data) or {}
+            self._check_instance_type(node, data.get("instanceType"))
+        elif isinstance(node, ec2.CfnInstance):
+            self._check_instance_type(node, self._resolve(node, node.instance_type))
+        elif isinstance(node, autoscaling.CfnAutoScalingGroup):
+            policy = self._resolve(node, node.mixed_instances_policy) or {}
+            for override in (policy.get("launchTemplate") or {}).get("overrides", []):
+                self._check_instance_type(node, override.get("instanceType"))
+        elif isinstance(node, elasticache.CfnReplicationGroup):
+            self._check_instance_type(node, self._resolve(node, node.cache_node_type))
+        elif isinstance(node, rds.CfnDBInstance):
+            self._check_db_instance(node)
+        elif isinstance(node, rds.CfnDBCluster):
+            self._check_db_proxy(node)
+        elif isinstance(node, ec2.Vpc):
+            self._check_nat_gateways(node)
+        elif isinstance(node, elb.CfnTargetGroup):
+            self._check_slow_start(node)
+        elif isinstance(node, _lambda.CfnFunction):
+            self._check_function(node)
+        elif isinstance(node, apigw.CfnStage):
+            self._check_rest_api_throttling(node)
+        elif isinstance(node, apigwv2.CfnStage):
+            self._check_http_api_throttling(node)
+
+    def _report(
+        self, node: IConstruct, rule: str, detail: Optional[str] = None
+    ) -> None:
+        """検出した問題を注記する
+
+        Args:
+            node (IConstruct): 問題のあるConstruct
+            rule (str): ルール
+            detail (Optional[str]): 詳細
+        """
+        if rule in self._ignore:
+            return
+        if rule in PRODUCTION_ONLY_RULES and not self._production:
+            return
+        message = f"[{rule}] {PERFORMANCE_RULES[rule]}"
+        if detail:
+            message += f": {detail}"
+        if self._production and rule not in ADVISORY_RULES:
+            Annotations.of(node).add_error(message)
+        else:
+            Annotations.of(node).add_warning_v2(f"web-app:performance:{rule}", message)
+
+    @staticmethod
+    def _resolve(node: IConstruct, value: Any) -> Any:
+        """トークンを解決した値を取得する"""
+        return Stack.of(node).resolve(value)
+
+    def _check_instance_type(self, node: IConstruct, instance_type: Any) -> None:
+        if isinstance(instance_type, str) and _BURSTABLE_PATTERN.match(instance_type):
+            self._report(node, "burstable-instance", instance_type)
+
+    def _check_db_instance(self, node: rds.CfnDBInstance) -> None:
+        self._check_instance_type(node, self._resolve(node, node.db_instance_class))
+        # Auroraのインスタンスはクラスターで、リードレプリカはレプリケーション元でチェックする
+        if node.db_cluster_identifier is not None:
+            return
+        if node.db_parameter_group_name is None:
+            self._report(node, "db-default-parameter-group")
+        if node.source_db_instance_identifier is None:
+            self._check_db_proxy(node)
+
+    def _check_db_proxy(self, node: IConstruct) -> None:
+        if not any(
+            isinstance(child, rds.CfnDBProxyTargetGroup)
+            for child in Stack.of(node).node.find_all()
+        ):
+            self._report(node, "db-without-proxy")
+
+    def _check_nat_gateways(self, node: ec2.Vpc) -> None:
+        private_azs = {subnet.availability_zone for subnet in node.private_subnets}
+        nat_gateways = [
+            child
+            for child in node.node.find_all()
+            if isinstance(child, ec2.CfnNatGateway)
+        ]
+        if nat_gateways and len(nat_gateways) < len(private_azs):
+            self._report(
+                node,
+                "single-nat-gateway",
+                f"{len(nat_gateways)} NAT gateway(s) for {len(private_azs)} AZs",
+            )
+
+    def _check_slow_start(self, node: elb.CfnTargetGroup) -> None:
+        # Lambda関数のターゲットにはスロースタートがない
+        if self._resolve(node, node.target_type) == "lambda":
+            return
+        attributes = {
+            attribute["key"]: attribute.get("value")
+            for attribute in self._resolve(node, node.target_group_attributes) or []
+        }
+        if attributes.get("slow_start.duration_seconds") in (None, "0"):
+            self._report(node, "target-group-slow-start")
+
+    def _check_function(self, node: _lambda.CfnFunction) -> None:
+        if any(
+            scope.node.id.startswith(_CDK_MANAGED_FUNCTION_PREFIXES)
+            for scope in node.node.scopes
+        ):
+            return
+        if node.memory_size is None:
+            self._report(node, "lambda-memory-size")
+        if node.architectures is None:
+            self._report(node, "lambda-architecture")
+
+    def _check_rest_api_throttling(self, node: apigw.CfnStage) -> None:
+        method_settings = self._resolve(node, node.method_settings) or []
+        if not any(
+            setting.get("throttlingRateLimit") is not None
+            for setting in method_settings
+            if setting.get("resourcePath") == "/*" and setting.get("httpMethod") == "*"
+        ):
+            self._report(node, "api-throttling")
+
+    def _check_http_api_throttling(self, node: apigwv2.CfnStage) -> None:
+        settings = self._resolve(node, node.default_route_settings) or {}
+        if settings.get("throttlingRateLimit") is None:
+            self._report(node, "api-throttling")
@@ -0,0 +1,130 @@
+from typing import Optional
+
+from aws_cdk import Duration
+from aws_cdk import aws_lambda as _lambda
+from aws_cdk import aws_ssm as ssm
+from constructs import Construct
+
+# Lambda関数のアーキテクチャ
+LAMBDA_ARCHITECTURES = {
+    "arm64": _lambda.Architecture.ARM_64,
+    "x86_64": _lambda.Architecture.X86_64,
+}
+
+
+def create_api_function(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    memory_size: int = 256,
+    architecture: str = "arm64",
+    provisioned_concurrency: int = 0,
+    environment: Optional[dict[str, str]] = None,
+) -> _lambda.Alias:
+    """API GatewayのバックエンドのLambda関数を作成する
+
+    バージョンを発行してエイリアスを作成し、API Gatewayからはエイリアスを呼び出す。
+    プロビジョニングされた同時実行はエイリアスに設定する。
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        memory_size (int): メモリサイズ（MB）。CPUもメモリに比例して割り当てられる
+        architecture (str): アーキテクチャ（arm64 または x86_64）
+        provisioned_concurrency (int): プロビジョニングされた同時実行数。0の場合は設定しない
+        environment (Optional[dict[str, str]]): 追加する環境変数
+    Returns:
+        _lambda.Alias: Lambda関数のエイリアス
+    """
+    if architecture not in LAMBDA_ARCHITECTURES:
+        raise ValueError(
+            f"architecture must be one of {', '.join(LAMBDA_ARCHITECTURES)}: "
+            f"{architecture}"
+        )
+    if not 128 <= memory_size <= 10240:
+        raise ValueError("memory_size must be between 128 and 10240")
+    if provisioned_concurrency < 0:
+        raise ValueError("provisioned_concurrency must not be negative")
+
+    fn = _lambda.Function(
+        scope,
+        id=f"{app_name}_{stage}_lambda_handler",
+        function_name=f"{app_name}-{stage}-lambda-handler",
+        runtime=_lambda.Runtime.PYTHON_3_12,
+        handler="api_handler.app.handler",
+        # テストやベンチマークで生成されるキャッシュはアセットに含めない
+        code=_lambda.Code.from_asset("src", exclude=["**/__pycache__"]),
+        architecture=LAMBDA_ARCHITECTURES[architecture],
+        memory_size=memory_size,
+        environment={
+            "APP_NAME": app_name,
+            "STAGE": stage,
+            **(environment or {}),
+        },
+    )
+
+    return _lambda.Alias(
+        scope,
+        id=f"{app_name}_{stage}_lambda_handler_alias",
+        alias_name="live",
+        version=fn.current_version,
+        provisioned_concurrent_executions=provisioned_concurrency or None,
+    )
+
+
+def create_pre_token_generation_function(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    feature_flags_parameter: Optional[ssm.IStringParameter] = None,
+    cache_ttl_seconds: int = 300,
+    architecture: str = "arm64",
+) -> _lambda.Function:
+    """Cognitoのトークン生成前トリガーのLambda関数を作成する
+
+    トークンの発行ごとに呼び出されるため、機能フラグは実行環境のメモリにキャッシュする。
+    Cognitoはトリガーの応答を5秒まで待つため、タイムアウトもそれに合わせる。
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        feature_flags_parameter (Optional[ssm.IStringParameter]):
+            テナントIDごとの機能フラグ（JSON）のパラメータ。未指定の場合は機能フラグなし
+        cache_ttl_seconds (int): 機能フラグをキャッシュする秒数
+        architecture (str): アーキテクチャ（arm64 または x86_64）
+    Returns:
+        _lambda.Function: Lambda関数
+    """
+    if architecture not in LAMBDA_ARCHITECTURES:
+        raise ValueError(
+            f"architecture must be one of {', '.join(LAMBDA_ARCHITECTURES)}: "
+            f"{architecture}"
+        )
+    if cache_ttl_seconds < 0:
+        raise ValueError("cache_ttl_seconds must not be negative")
+
+    environment = {
+        "APP_NAME": app_name,
+        "STAGE": stage,
+        "CLAIMS_CACHE_TTL_SECONDS": str(cache_ttl_seconds),
+    }
+    if feature_flags_parameter is not None:
+        environment["FEATURE_FLAGS_PARAMETER"] = feature_flags_parameter.parameter_name
+
+    fn = _lambda.Function(
+        scope,
+        id=f"{app_name}_{stage}_pre_token_generation",
+        function_name=f"{app_name}-{stage}-pre-token-generation",
+        runtime=_lambda.Runtime.PYTHON_3_12,
+        handler="pre_token_generation.app.handler",
+        code=_lambda.Code.from_asset("src", exclude=["**/__pycache__"]),
+        architecture=LAMBDA_ARCHITECTURES[architecture],
+        memory_size=256,
+        timeout=Duration.seconds(5),
+        environment=environment,
+    )
+    if feature_flags_parameter is not None:
+        feature_flags_parameter.grant_read(fn)
+    return fn
@@ -0,0 +1,205 @@
+from typing import Optional
+
+from aws_cdk import Duration, RemovalPolicy
+from aws_cdk import aws_certificatemanager as acm
+from aws_cdk import aws_cloudfront as cloudfront
+from aws_cdk import aws_cloudfront_origins as origins
+from aws_cdk import aws_s3 as s3
+from aws_cdk import aws_s3_deployment as s3deploy
+from constructs import Construct
+
+from web_app.lib.region.region_utils import get_regional_name
+
+# Cognito認証を行うパス。キャッシュせず、認証用のCookieをALBに転送する
+DEFAULT_AUTHENTICATED_PATHS = ("/member/*",)
+# ALBがCognitoからのコールバックを受け取るパス。認証を行うパスと同様に転送する
+ALB_AUTH_CALLBACK_PATH = "/oauth2/*"
+# 匿名で閲覧できるページでALBに転送するCookie。キャッシュキーには含めない
+DEFAULT_FORWARDED_COOKIES = ("PHPSESSID",)
+# フォームのPOSTを受け付けるためにALBに転送するヘッダー
+FORWARDED_HEADERS = ("Content-Type", "Origin", "Referer")
+
+
+class WebAppDistribution(Construct):
+    """ALBをオリジンとするCloudFrontディストリビューションを構築するモジュール
+
+    匿名で閲覧できるページはエッジでキャッシュし、静的ファイルはS3から配信する。
+    Cognito認証を行うパスはキャッシュせずにALBへそのまま転送する。
+    """
+
+    _static_bucket: s3.Bucket
+    _distribution: cloudfront.Distribution
+
+    def __init__(
+        self,
+        scope: Construct,
+        app_name: str,
+        stage: str,
+        origin_domain_name: str,
+        static_asset_path: str = "static",
+        domain_names: Optional[list[str]] = None,
+        certificate_arn: Optional[str] = None,
+        default_ttl_seconds: int = 60,
+        authenticated_paths: Optional[list[str]] = None,
+        forwarded_cookies: Optional[list[str]] = None,
+    ) -> None:
+        """コンストラクタ
+
+        Args:
+            scope (Construct): 親のConstruct
+            app_name (str): アプリケーション名
+            stage (str): ステージ名
+            origin_domain_name (str):
+                オリジンにするALBに割り当てたドメイン名。ALBの証明書と一致するもの
+            static_asset_path (str): `/static/*`で配信する静的ファイルのディレクトリ
+            domain_names (Optional[list[str]]):
+                ディストリビューションの代替ドメイン名。ALBの証明書にも含めるもの
+            certificate_arn (Optional[str]): 代替ドメイン名の証明書のARN（us-east-1）
+            default_ttl_seconds (int): 匿名で閲覧できるページのデフォルトのキャッシュ秒数
+            authenticated_paths (Optional[list[str]]): キャッシュしないCognito認証のパス
+            forwarded_cookies (Optional[list[str]]):
+                匿名で閲覧できるページでALBに転送するCookie（セッションやCSRF対策のもの）
+        """
+        super().__init__(scope, f"{app_name}_{stage}_web_app_distribution")
+
+        # CloudFrontはオリジンの証明書をドメイン名で検証するため、
+        # ALBのDNS名（*.elb.amazonaws.com）にはHTTPSで接続できない
+        if not origin_domain_name:
+            raise ValueError("origin_domain_name is required")
+        # Cognito認証を行うパスはHostヘッダーを転送するため、CloudFrontはALBの証明書を
+        # 閲覧者のHostで検証する。*.cloudfront.netはALBの証明書と一致しない
+        if not domain_names:
+            raise ValueError(
+                "domain_names is required to forward the Host header to the origin"
+            )
+        if bool(domain_names) != bool(certificate_arn):
+            raise ValueError(
+                "domain_names and certificate_arn must be specified together"
+            )
+
+        # ALBのリスナーはHTTPSのみのため、HTTPSで接続する
+        alb_origin = origins.HttpOrigin(
+            origin_domain_name,
+            protocol_policy=cloudfront.OriginProtocolPolicy.HTTPS_ONLY,
+        )
+
+        # 匿名で閲覧できるページ
+        # Cookieはキャッシュキーに含めず、クエリ文字列のみでキャッシュする
+        # フォームのPOSTなどもALBに転送する。キャッシュするのはGETとHEADのみ
+        public_cache_policy = cloudfront.CachePolicy(
+            self,
+            id=f"{app_name}_{stage}_public_cache_policy",
+            cache_policy_name=get_regional_name(
+                self, f"{app_name}-{stage}-public-cache-policy"
+            ),
+            default_ttl=Duration.seconds(default_ttl_seconds),
+            min_ttl=Duration.seconds(0),
+            max_ttl=Duration.days(1),
+            cookie_behavior=cloudfront.CacheCookieBehavior.none(),
+            header_behavior=cloudfront.CacheHeaderBehavior.none(),
+            query_string_behavior=cloudfront.CacheQueryStringBehavior.all(),
+            enable_accept_encoding_brotli=True,
+            enable_accept_encoding_gzip=True,
+        )
+        # フォームで使うセッションのCookieとヘッダーはキャッシュキーに含めずALBに転送する
+        # セッションを開始したページはPHPがCache-Control: no-storeを返すためキャッシュされない
+        public_origin_request_policy = cloudfront.OriginRequestPolicy(
+            self,
+            id=f"{app_name}_{stage}_public_origin_request_policy",
+            origin_request_policy_name=get_regional_name(
+                self, f"{app_name}-{stage}-public-origin-request-policy"
+            ),
+            cookie_behavior=cloudfront.OriginRequestCookieBehavior.allow_list(
+                *(forwarded_cookies or DEFAULT_FORWARDED_COOKIES)
+            ),
+            header_behavior=cloudfront.OriginRequestHeaderBehavior.allow_list(
+                *FORWARDED_HEADERS
+            ),
+            query_string_behavior=cloudfront.OriginRequestQueryStringBehavior.all(),
+        )
+
+        # Cognito認証を行うパス
+        # ALBがCognitoのリダイレクト先を組み立てられるようHostヘッダーも含めて全て転送する
+        authenticated_behavior = cloudfront.BehaviorOptions(
+            origin=alb_origin,
+            viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+            allowed_methods=cloudfront.AllowedMethods.ALLOW_ALL,
+            cache_policy=cloudfront.CachePolicy.CACHING_DISABLED,
+            origin_request_policy=cloudfront.OriginRequestPolicy.ALL_VIEWER,
+            compress=True,
+        )
+
+        # 静的ファイル
+        self._static_bucket = s3.Bucket(
+            self,
+            id=f"{app_name}_{stage}_static_bucket",
+            block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+            enforce_ssl=True,
+            removal_policy=RemovalPolicy.DESTROY,
+            auto_delete_objects=True,
+        )
+        static_behavior = cloudfront.BehaviorOptions(
+            origin=origins.S3BucketOrigin.with_origin_access_control(
+                self._static_bucket
+            ),
+            viewer_protocol_policy=cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS,
+            cache_policy=cloudfront.CachePolicy.CACHING_OPTIMIZED,
+            compress=True,
+        )
+
+        self._distribution = cloudfront.Distribution(
+            self,
+            id=f"{app_name}_{stage}_distribution",
+            comment=f"{app_name}-{stage}-distribution",
+            default_behavior=cloudfront.BehaviorOptions(
+                origin=alb_origin,
+                viewer_protocol_policy=(
+                    cloudfront.ViewerProtocolPolicy.REDIRECT_TO_HTTPS
+                ),
+                allowed_methods=cloudfront.AllowedMethods.ALLOW_ALL,
+                cached_methods=cloudfront.CachedMethods.CACHE_GET_HEAD,
+                cache_policy=public_cache_policy,
+                origin_request_policy=public_origin_request_policy,
+                compress=True,
+            ),
+            additional_behaviors={
+                "/static/*": static_behavior,
+                **{
+                    path: authenticated_behavior
+                    for path in [
+                        *(authenticated_paths or DEFAULT_AUTHENTICATED_PATHS),
+                        ALB_AUTH_CALLBACK_PATH,
+                    ]
+                },
+            },
+            domain_names=domain_names or None,
+            certificate=(
+                acm.Certificate.from_certificate_arn(
+                    self,
+                    f"{app_name}_{stage}_distribution_certificate",
+                    certificate_arn,
+                )
+                if certificate_arn
+                else None
+            ),
+            http_version=cloudfront.HttpVersion.HTTP2_AND_3,
+        )
+
+        # デプロイ時に静的ファイルをS3にアップロードし、キャッシュを削除する
+        s3deploy.BucketDeployment(
+            self,
+            id=f"{app_name}_{stage}_static_deployment",
+            sources=[s3deploy.Source.asset(static_asset_path, exclude=[".gitkeep"])],
+            destination_bucket=self._static_bucket,
+            destination_key_prefix="static/",
+            distribution=self._distribution,
+            distribution_paths=["/static/*"],
+        )
+
+    def get_distribution(self) -> cloudfront.Distribution:
+        """CloudFrontディストリビューションを取得する"""
+        return self._distribution
+
+    def get_static_bucket(self) -> s3.Bucket:
+        """静的ファイルのバケットを取得する"""
+        return self._static_bucket
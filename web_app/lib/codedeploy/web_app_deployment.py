@@ -0,0 +1,128 @@
+from typing import Optional, Sequence
+
+from aws_cdk import Tags
+from aws_cdk import aws_autoscaling as autoscaling
+from aws_cdk import aws_cloudwatch as cloudwatch
+from aws_cdk import aws_codedeploy as codedeploy
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_elasticloadbalancingv2 as elb
+from constructs import Construct
+
+# CodeDeployのデプロイグループに設定できるアラームの上限
+MAX_ALARMS = 10
+
+# デプロイ対象のEC2インスタンスを識別するタグのキー
+DEPLOYMENT_GROUP_TAG_KEY = "deployment_group"
+
+
+class WebAppDeployment(Construct):
+    """WebサーバーにアプリケーションをデプロイするCodeDeployのアプリケーションとデプロイグループを構築するモジュール
+
+    正常なインスタンスの割合を保ちながら、既存のインスタンスに順番にデプロイする。
+    デプロイ中はALBのターゲットグループからインスタンスを外し、
+    アプリケーションの起動とOPcacheのウォームアップが終わってから戻す。
+    デプロイが失敗した場合と、デプロイ中にアラームが発生した場合は自動でロールバックする。
+    """
+
+    _application: codedeploy.ServerApplication
+    _deployment_config: codedeploy.IServerDeploymentConfig
+    _deployment_group: codedeploy.ServerDeploymentGroup
+
+    def __init__(
+        self,
+        scope: Construct,
+        app_name: str,
+        stage: str,
+        target_group: elb.ApplicationTargetGroup,
+        auto_scaling_group: Optional[autoscaling.AutoScalingGroup] = None,
+        ec2_instances: Sequence[ec2.Instance] = (),
+        minimum_healthy_hosts_percent: int = 50,
+        alarms: Sequence[cloudwatch.IAlarm] = (),
+    ) -> None:
+        """コンストラクタ
+
+        Args:
+            scope (Construct): 親のConstruct
+            app_name (str): アプリケーション名
+            stage (str): ステージ名
+            target_group (elb.ApplicationTargetGroup): Webサーバーのターゲットグループ
+            auto_scaling_group (Optional[autoscaling.AutoScalingGroup]):
+                Webサーバーのフリート（Auto Scalingグループ）
+            ec2_instances (Sequence[ec2.Instance]):
+                Webサーバーのフリート（EC2インスタンス）。タグでデプロイグループに含める
+            minimum_healthy_hosts_percent (int):
+                デプロイ中に正常な状態を保つインスタンスの割合（%、0〜99）
+            alarms (Sequence[cloudwatch.IAlarm]):
+                デプロイ中に発生した場合にロールバックするアラーム（10個まで）
+        """
+        super().__init__(scope, f"{app_name}_{stage}_web_app_deployment")
+
+        if auto_scaling_group is None and not ec2_instances:
+            raise ValueError("auto_scaling_group or ec2_instances is required")
+        if not 0 <= minimum_healthy_hosts_percent <= 99:
+            raise ValueError("minimum_healthy_hosts_percent must be between 0 and 99")
+        if len(alarms) > MAX_ALARMS:
+            raise ValueError(f"alarms must be at most {MAX_ALARMS}")
+
+        deployment_group_name = f"{app_name}-{stage}-web"
+
+        self._application = codedeploy.ServerApplication(
+            self,
+            id=f"{app_name}_{stage}_web_application",
+            application_name=f"{app_name}-{stage}-web",
+        )
+
+        # 正常なインスタンスの割合を下回らない台数ずつデプロイする
+        self._deployment_config = codedeploy.ServerDeploymentConfig(
+            self,
+            id=f"{app_name}_{stage}_web_deployment_config",
+            deployment_config_name=(
+                f"{app_name}-{stage}-web-min-healthy-{minimum_healthy_hosts_percent}"
+            ),
+            minimum_healthy_hosts=codedeploy.MinimumHealthyHosts.percentage(
+                minimum_healthy_hosts_percent
+            ),
+        )
+
+        ec2_instance_tags: Optional[codedeploy.InstanceTagSet] = None
+        if ec2_instances:
+            for ec2_instance in ec2_instances:
+                Tags.of(ec2_instance).add(
+                    DEPLOYMENT_GROUP_TAG_KEY, deployment_group_name
+                )
+            ec2_instance_tags = codedeploy.InstanceTagSet(
+                {DEPLOYMENT_GROUP_TAG_KEY: [deployment_group_name]}
+            )
+
+        # CodeDeployAgentはUserDataまたはAMIでインストール済みのため、ここではインストールしない
+        self._deployment_group = codedeploy.ServerDeploymentGroup(
+            self,
+            id=f"{app_name}_{stage}_web_deployment_group",
+            application=self._application,
+            deployment_group_name=deployment_group_name,
+            deployment_config=self._deployment_config,
+            auto_scaling_groups=(
+                [auto_scaling_group] if auto_scaling_group is not None else None
+            ),
+            ec2_instance_tags=ec2_instance_tags,
+            install_agent=False,
+            load_balancers=[codedeploy.LoadBalancer.application(target_group)],
+            alarms=list(alarms) or None,
+            auto_rollback=codedeploy.AutoRollbackConfig(
+                failed_deployment=True,
+                stopped_deployment=True,
+                deployment_in_alarm=bool(alarms),
+            ),
+        )
+
+    def get_application(self) -> codedeploy.ServerApplication:
+        """CodeDeployのアプリケーションを取得する"""
+        return self._application
+
+    def get_deployment_config(self) -> codedeploy.IServerDeploymentConfig:
+        """デプロイ設定を取得する"""
+        return self._deployment_config
+
+    def get_deployment_group(self) -> codedeploy.ServerDeploymentGroup:
+        """デプロイグループを取得する"""
+        return self._deployment_group
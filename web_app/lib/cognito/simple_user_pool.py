@@ -1,6 +1,13 @@
+from typing import Optional
+
 from aws_cdk import aws_cognito as cognito
+from aws_cdk import aws_lambda as _lambda
 from constructs import Construct
 
+# アプリケーションのクレームの元になるカスタム属性
+# ユーザー自身が変更できないように、クライアントからは書き込めないようにする
+APP_CLAIM_ATTRIBUTES = ("role", "tenant_id")
+
 
 class SimpleUserPool(Construct):
     """一般的なAmazon Cognitoユーザープールを構築するモジュール"""
@@ -9,16 +16,27 @@ class SimpleUserPool(Construct):
     _user_pool_client: cognito.UserPoolClient
     _user_pool_domain: cognito.UserPoolDomain
 
-    def __init__(self, scope: Construct, app_name: str, stage: str) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        app_name: str,
+        stage: str,
+        pre_token_generation: Optional[_lambda.IFunction] = None,
+    ) -> None:
         """コンストラクタ
 
         Args:
             scope (Construct): 親のConstruct
             app_name (str): アプリケーション名
             stage (str): ステージ名
+            pre_token_generation (Optional[_lambda.IFunction]):
+                トークン生成前トリガーのLambda関数。指定した場合はロールとテナントの
+                カスタム属性を追加し、IDトークンとアクセストークンにクレームを追加する
         """
         super().__init__(scope, f"{app_name}_{stage}_simple_user_pool")
 
+        app_claims_enabled = pre_token_generation is not None
+
         self._user_pool = cognito.UserPool(
             self,
             id=f"{app_name}_{stage}_user_pool",
@@ -31,7 +49,23 @@ class SimpleUserPool(Construct):
             auto_verify=cognito.AutoVerifiedAttrs(
                 email=True,
             ),
+            custom_attributes=(
+                {
+                    name: cognito.StringAttribute(mutable=True)
+                    for name in APP_CLAIM_ATTRIBUTES
+                }
+                if app_claims_enabled
+                else None
+            ),
+            # アクセストークンのカスタマイズ（トリガーのバージョン2）にはEssentials以上が必要
+            feature_plan=cognito.FeaturePlan.ESSENTIALS if app_claims_enabled else None,
         )
+        if pre_token_generation is not None:
+            self._user_pool.add_trigger(
+                cognito.UserPoolOperation.PRE_TOKEN_GENERATION_CONFIG,
+                pre_token_generation,
+                cognito.LambdaVersion.V2_0,
+            )
 
         self._user_pool_client: cognito.UserPoolClient = cognito.UserPoolClient(
             self,
@@ -39,6 +73,20 @@ class SimpleUserPool(Construct):
             user_pool=self._user_pool,
             user_pool_client_name=f"{app_name}-{stage}-user-pool-client",
             generate_secret=True,
+            write_attributes=(
+                cognito.ClientAttributes().with_standard_attributes(
+                    email=True,
+                    fullname=True,
+                    given_name=True,
+                    family_name=True,
+                    nickname=True,
+                    preferred_username=True,
+                    locale=True,
+                    timezone=True,
+                )
+                if app_claims_enabled
+                else None
+            ),
         )
 
         self._user_pool_domain: cognito.UserPoolDomain = cognito.UserPoolDomain(
@@ -0,0 +1,132 @@
+import json
+from typing import Any, Optional
+
+from constructs import Node
+
+
+def get_context_str(
+    node: Node, key: str, default: Optional[str] = None
+) -> Optional[str]:
+    """コンテキストから文字列の値を取得する
+
+    Args:
+        node (Node): コンテキストを参照するConstructのノード
+        key (str): コンテキストのキー
+        default (Optional[str]): 未指定の場合のデフォルト値
+    Returns:
+        Optional[str]: コンテキストの値
+    """
+    value = node.try_get_context(key)
+    if value is None:
+        return default
+    return str(value)
+
+
+def get_context_int(
+    node: Node, key: str, default: Optional[int] = None
+) -> Optional[int]:
+    """コンテキストから整数の値を取得する
+
+    `cdk deploy -c key=value` で渡した値は文字列になるため、整数に変換する
+
+    Args:
+        node (Node): コンテキストを参照するConstructのノード
+        key (str): コンテキストのキー
+        default (Optional[int]): 未指定の場合のデフォルト値
+    Returns:
+        Optional[int]: コンテキストの値
+    """
+    value = node.try_get_context(key)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be an integer: {value}")
+
+
+def get_context_float(
+    node: Node, key: str, default: Optional[float] = None
+) -> Optional[float]:
+    """コンテキストから数値の値を取得する
+
+    Args:
+        node (Node): コンテキストを参照するConstructのノード
+        key (str): コンテキストのキー
+        default (Optional[float]): 未指定の場合のデフォルト値
+    Returns:
+        Optional[float]: コンテキストの値
+    """
+    value = node.try_get_context(key)
+    if value is None:
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number: {value}")
+
+
+def get_context_bool(node: Node, key: str, default: bool = False) -> bool:
+    """コンテキストから真偽値を取得する
+
+    Args:
+        node (Node): コンテキストを参照するConstructのノード
+        key (str): コンテキストのキー
+        default (bool): 未指定の場合のデフォルト値
+    Returns:
+        bool: コンテキストの値
+    """
+    value = node.try_get_context(key)
+    if value is None:
+        return default
+    if isinstance(value, bool):
+        return value
+    if str(value).lower() in ("true", "1", "yes"):
+        return True
+    if str(value).lower() in ("false", "0", "no"):
+        return False
+    raise ValueError(f"{key} must be a boolean: {value}")
+
+
+def get_context_list(
+    node: Node, key: str, default: Optional[list[str]] = None
+) -> list[str]:
+    """コンテキストからカンマ区切りの文字列のリストを取得する
+
+    Args:
+        node (Node): コンテキストを参照するConstructのノード
+        key (str): コンテキストのキー
+        default (Optional[list[str]]): 未指定の場合のデフォルト値
+    Returns:
+        list[str]: コンテキストの値
+    """
+    value = node.try_get_context(key)
+    if value is None:
+        return list(default or [])
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [v.strip() for v in str(value).split(",") if v.strip()]
+
+
+def get_context_dict(node: Node, key: str) -> dict[str, Any]:
+    """コンテキストから辞書の値を取得する
+
+    cdk.jsonではオブジェクトで、`-c key=value` ではJSON文字列で指定する
+
+    Args:
+        node (Node): コンテキストを参照するConstructのノード
+        key (str): コンテキストのキー
+    Returns:
+        dict[str, Any]: コンテキストの値。未指定の場合は空の辞書
+    """
+    value = node.try_get_context(key)
+    if value is None:
+        return {}
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            raise ValueError(f"{key} must be a JSON object: {value}")
+    if not isinstance(value, dict):
+        raise ValueError(f"{key} must be a JSON object: {value}")
+    return value
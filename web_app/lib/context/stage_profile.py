@@ -0,0 +1,338 @@
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+from aws_cdk import aws_ec2 as ec2
+from constructs import Node
+
+from web_app.lib.context.context_utils import get_context_dict, get_context_str
+from web_app.lib.ec2.instance_types import get_instance_spec
+
+# gp3のIOPSとスループット（MiB/s）の範囲。ベースラインは3000IOPS、125MiB/s
+GP3_IOPS_RANGE = (3000, 16000)
+GP3_THROUGHPUT_RANGE = (125, 1000)
+
+# RDS for PostgreSQLのgp3は400GiB以上でIOPSとスループットを指定できる
+# ベースラインは12000IOPS、500MiB/s
+RDS_GP3_MIN_PROVISIONED_STORAGE_GIB = 400
+RDS_GP3_IOPS_RANGE = (12000, 64000)
+RDS_GP3_THROUGHPUT_RANGE = (500, 4000)
+# 拡張モニタリングの間隔（秒）
+RDS_MONITORING_INTERVALS = (1, 5, 10, 15, 30, 60)
+
+LAMBDA_ARCHITECTURES = ("arm64", "x86_64")
+
+
+def get_architecture(instance_type: str) -> ec2.InstanceArchitecture:
+    """インスタンスタイプのアーキテクチャを取得する
+
+    Args:
+        instance_type (str): インスタンスタイプ（`m7g.large` 形式）
+    Returns:
+        ec2.InstanceArchitecture: アーキテクチャ
+    """
+    return ec2.InstanceType(instance_type.removeprefix("db.")).architecture
+
+
+def _validate_gp3(
+    section: str, size_gib: int, iops: Optional[int], throughput: Optional[int]
+) -> None:
+    if iops is not None:
+        if not GP3_IOPS_RANGE[0] <= iops <= GP3_IOPS_RANGE[1]:
+            raise ValueError(f"{section}.volume_iops must be between 3000 and 16000")
+        # gp3のIOPSは1GiBあたり500まで
+        if iops > 3000 and iops > size_gib * 500:
+            raise ValueError(f"{section}.volume_iops must be at most 500 per GiB")
+    if throughput is not None:
+        if not GP3_THROUGHPUT_RANGE[0] <= throughput <= GP3_THROUGHPUT_RANGE[1]:
+            raise ValueError(
+                f"{section}.volume_throughput_mibps must be between 125 and 1000"
+            )
+        # gp3のスループットはIOPSあたり0.25MiB/sまで
+        if throughput > 125 and throughput > (iops or GP3_IOPS_RANGE[0]) / 4:
+            raise ValueError(
+                f"{section}.volume_throughput_mibps must be at most 0.25 per IOPS"
+            )
+
+
+@dataclass(frozen=True)
+class VpcProfile:
+    """VPCのサイズ"""
+
+    max_azs: int = 2
+    # AZごとにNATゲートウェイを作成するか
+    nat_gateway_per_az: bool = False
+
+    def __post_init__(self) -> None:
+        if self.max_azs < 2:
+            # ALBとRDSのサブネットグループは2つ以上のAZが必要
+            raise ValueError("vpc.max_azs must be at least 2")
+
+
+@dataclass(frozen=True)
+class WebProfile:
+    """Webサーバーのインスタンスタイプ、台数、EBSボリューム"""
+
+    instance_type: str = "t3a.micro"
+    # スポット混在時のインスタンスタイプ。instance_typeと同じアーキテクチャにする
+    spot_instance_types: tuple[str, ...] = ()
+    min_capacity: int = 2
+    max_capacity: int = 4
+    volume_size_gib: int = 10
+    # gp3のIOPSとスループット（MiB/s）。未指定の場合はベースライン
+    volume_iops: Optional[int] = None
+    volume_throughput_mibps: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        # スポットのリストはcdk.jsonでは配列で指定する
+        object.__setattr__(self, "spot_instance_types", tuple(self.spot_instance_types))
+        instance_types = [self.instance_type, *self.spot_instance_types]
+        for instance_type in instance_types:
+            # Apache、PHP-FPMの設定をメモリサイズから算出するため、サイズを決められるものに限る
+            get_instance_spec(instance_type)
+        if len({get_architecture(t) for t in instance_types}) > 1:
+            raise ValueError(
+                "web.spot_instance_types must have the same architecture as "
+                "web.instance_type"
+            )
+        if self.min_capacity > self.max_capacity:
+            raise ValueError("web.min_capacity must be less than or equal to max")
+        if self.volume_size_gib < 8:
+            raise ValueError("web.volume_size_gib must be at least 8")
+        _validate_gp3(
+            "web", self.volume_size_gib, self.volume_iops, self.volume_throughput_mibps
+        )
+
+
+@dataclass(frozen=True)
+class DbProfile:
+    """データベースのインスタンスクラスとストレージ"""
+
+    # `db.` を除いたインスタンスクラス
+    instance_type: str = "t4g.micro"
+    allocated_storage_gib: int = 100
+    # ストレージの自動スケーリングの上限。未指定の場合は自動スケーリングしない
+    max_allocated_storage_gib: Optional[int] = None
+    read_replica_count: int = 1
+    aurora_min_acu: float = 0.5
+    aurora_max_acu: float = 4.0
+    aurora_reader_count: int = 1
+    # パラメータグループ、gp3、Performance Insights、拡張モニタリングを設定するか
+    performance_tuning: bool = False
+    # gp3のIOPSとスループット（MiB/s）。allocated_storage_gibが400以上の場合に指定できる
+    storage_iops: Optional[int] = None
+    storage_throughput_mibps: Optional[int] = None
+    monitoring_interval_seconds: int = 60
+    multi_az: bool = False
+
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "instance_type", self.instance_type.removeprefix("db.")
+        )
+        get_instance_spec(self.instance_type)
+        if self.allocated_storage_gib < 20:
+            raise ValueError("db.allocated_storage_gib must be at least 20")
+        if (
+            self.max_allocated_storage_gib is not None
+            and self.max_allocated_storage_gib < self.allocated_storage_gib
+        ):
+            raise ValueError(
+                "db.max_allocated_storage_gib must be at least allocated_storage_gib"
+            )
+        if self.monitoring_interval_seconds not in RDS_MONITORING_INTERVALS:
+            raise ValueError(
+                "db.monitoring_interval_seconds must be one of "
+                f"{', '.join(map(str, RDS_MONITORING_INTERVALS))}"
+            )
+        if self.storage_iops is None and self.storage_throughput_mibps is None:
+            return
+        if self.allocated_storage_gib < RDS_GP3_MIN_PROVISIONED_STORAGE_GIB:
+            raise ValueError(
+                "db.storage_iops and db.storage_throughput_mibps require "
+                "allocated_storage_gib of at least 400"
+            )
+        if self.storage_iops is not None and not (
+            RDS_GP3_IOPS_RANGE[0] <= self.storage_iops <= RDS_GP3_IOPS_RANGE[1]
+        ):
+            raise ValueError("db.storage_iops must be between 12000 and 64000")
+        if self.storage_throughput_mibps is not None:
+            if not (
+                RDS_GP3_THROUGHPUT_RANGE[0]
+                <= self.storage_throughput_mibps
+                <= RDS_GP3_THROUGHPUT_RANGE[1]
+            ):
+                raise ValueError(
+                    "db.storage_throughput_mibps must be between 500 and 4000"
+                )
+            # スループットはIOPSあたり0.25MiB/sまで
+            iops = self.storage_iops or RDS_GP3_IOPS_RANGE[0]
+            if self.storage_throughput_mibps > iops / 4:
+                raise ValueError(
+                    "db.storage_throughput_mibps must be at most 0.25 per IOPS"
+                )
+
+
+@dataclass(frozen=True)
+class CacheProfile:
+    """ElastiCacheのノードタイプとレプリカ数"""
+
+    node_type: str = "cache.t4g.micro"
+    replica_count: int = 1
+
+
+@dataclass(frozen=True)
+class LambdaProfile:
+    """Lambda関数のメモリサイズとアーキテクチャ"""
+
+    memory_size: int = 256
+    architecture: str = "arm64"
+    provisioned_concurrency: int = 0
+
+    def __post_init__(self) -> None:
+        if self.architecture not in LAMBDA_ARCHITECTURES:
+            raise ValueError(
+                f"lambda.architecture must be one of {', '.join(LAMBDA_ARCHITECTURES)}"
+                f": {self.architecture}"
+            )
+        if not 128 <= self.memory_size <= 10240:
+            raise ValueError("lambda.memory_size must be between 128 and 10240")
+        if self.provisioned_concurrency < 0:
+            raise ValueError("lambda.provisioned_concurrency must not be negative")
+
+
+@dataclass(frozen=True)
+class StageProfile:
+    """ステージごとのキャパシティのプロファイル
+
+    インスタンスタイプや台数、ストレージなど、サイズに関わる設定を1か所にまとめる
+    """
+
+    name: str
+    vpc: VpcProfile = field(default_factory=VpcProfile)
+    web: WebProfile = field(default_factory=WebProfile)
+    db: DbProfile = field(default_factory=DbProfile)
+    cache: CacheProfile = field(default_factory=CacheProfile)
+    function: LambdaProfile = field(default_factory=LambdaProfile)
+
+
+# 組み込みのプロファイル
+# dev: バースト可能なインスタンスで費用を抑える
+# prod: バースト可能でないGravitonのインスタンスで、CPUクレジットの枯渇による性能低下を避ける
+PROFILES: dict[str, StageProfile] = {
+    "dev": StageProfile(name="dev"),
+    "prod": StageProfile(
+        name="prod",
+        vpc=VpcProfile(nat_gateway_per_az=True),
+        web=WebProfile(
+            instance_type="m7g.large",
+            spot_instance_types=("m6g.large", "m7g.large", "c7g.xlarge"),
+            min_capacity=2,
+            max_capacity=8,
+            volume_size_gib=20,
+            volume_iops=3000,
+            volume_throughput_mibps=250,
+        ),
+        db=DbProfile(
+            instance_type="m7g.large",
+            allocated_storage_gib=400,
+            max_allocated_storage_gib=1000,
+            read_replica_count=1,
+            aurora_min_acu=2.0,
+            aurora_max_acu=16.0,
+            aurora_reader_count=1,
+            performance_tuning=True,
+            storage_iops=12000,
+            storage_throughput_mibps=500,
+            multi_az=True,
+        ),
+        cache=CacheProfile(node_type="cache.m7g.large", replica_count=1),
+        function=LambdaProfile(memory_size=1024, provisioned_concurrency=2),
+    ),
+}
+DEFAULT_PROFILE = "dev"
+
+_SECTIONS = {
+    "vpc": VpcProfile,
+    "web": WebProfile,
+    "db": DbProfile,
+    "cache": CacheProfile,
+    "lambda": LambdaProfile,
+}
+_SECTION_FIELDS = {"lambda": "function"}
+
+
+def _override(section: str, base: Any, overrides: Any) -> Any:
+    if not isinstance(overrides, dict):
+        raise ValueError(f"stage_profiles {section} must be a JSON object")
+    names = {f.name for f in dataclasses.fields(base)}
+    unknown = sorted(set(overrides) - names)
+    if unknown:
+        raise ValueError(f"unknown keys in stage_profiles {section}: {unknown}")
+    for key, value in overrides.items():
+        current = getattr(base, key)
+        if current is None or value is None:
+            continue
+        # cdk.jsonの配列はlist、整数はfloatの項目にも指定できる
+        expected = {tuple: (list, tuple), float: (int, float)}.get(
+            type(current), type(current)
+        )
+        if not isinstance(value, expected) or (
+            isinstance(value, bool) and not isinstance(current, bool)
+        ):
+            raise ValueError(
+                f"stage_profiles {section}.{key} must be {type(current).__name__}"
+                f": {value}"
+            )
+    return dataclasses.replace(base, **overrides)
+
+
+def build_stage_profile(
+    name: str, overrides: Optional[dict[str, Any]] = None
+) -> StageProfile:
+    """組み込みのプロファイルに上書きする値を適用する
+
+    Args:
+        name (str): プロファイル名。組み込みにない場合はdevを元にする
+        overrides (Optional[dict[str, Any]]):
+            セクション（vpc、web、db、cache、lambda）ごとの上書きする値
+    Returns:
+        StageProfile: プロファイル
+    """
+    profile = dataclasses.replace(
+        PROFILES.get(name, PROFILES[DEFAULT_PROFILE]), name=name
+    )
+    overrides = overrides or {}
+    unknown = sorted(set(overrides) - set(_SECTIONS))
+    if unknown:
+        raise ValueError(f"unknown sections in stage_profiles {name}: {unknown}")
+    for section, values in overrides.items():
+        attribute = _SECTION_FIELDS.get(section, section)
+        profile = dataclasses.replace(
+            profile,
+            **{
+                attribute: _override(
+                    f"{name}.{section}", getattr(profile, attribute), values
+                )
+            },
+        )
+    return profile
+
+
+def load_stage_profile(node: Node, stage: str) -> StageProfile:
+    """コンテキストからステージのプロファイルを読み込む
+
+    プロファイル名は `stage_profile` で指定する。未指定の場合はステージ名と同じ組み込みのプロファイル、
+    なければdevを使う。`stage_profiles` でプロファイルごとに値を上書き・追加できる。
+
+    Args:
+        node (Node): コンテキストを参照するConstructのノード
+        stage (str): ステージ名
+    Returns:
+        StageProfile: プロファイル
+    """
+    stage_profiles = get_context_dict(node, "stage_profiles")
+    default_name = stage if stage in PROFILES or stage in stage_profiles else None
+    name = get_context_str(node, "stage_profile", default_name or DEFAULT_PROFILE)
+    if name not in PROFILES and name not in stage_profiles:
+        raise ValueError(f"unknown stage_profile: {name}")
+    return build_stage_profile(name, stage_profiles.get(name))
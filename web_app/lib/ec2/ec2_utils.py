@@ -1,7 +1,308 @@
+from typing import Optional
+
 from aws_cdk import aws_ec2 as ec2
 from aws_cdk import aws_iam as iam
 from constructs import Construct
 
+from web_app.lib.ec2.web_server_tuning import PHP_FPM_WWW_CONF, get_web_tuning_commands
+
+# Webサーバーのイメージのモード
+# boot: 起動時にUserDataでパッケージをインストールする
+# bake: EC2 Image BuilderでパッケージをインストールしたAMIから起動する
+IMAGE_MODES = ("boot", "bake")
+
+# アプリケーションに渡す環境変数を定義するApacheの設定ファイル
+WEB_APP_ENV_CONF = "/etc/httpd/conf.d/web-app-env.conf"
+
+# ALBとAuto Scalingグループのヘルスチェック（死活監視）のパス
+# DBなどの依存先は確認しない。依存先の障害で全インスタンスが異常と判定され、
+# Auto Scalingグループがすべてのインスタンスを置き換えてしまうのを防ぐ
+WEB_LIVENESS_CHECK_PATH = "/livez"
+
+# 死活監視のPHP。PHP-FPMが応答できれば200を返す
+LIVEZ_PHP = """<?php
+header('Content-Type: application/json');
+header('Cache-Control: no-store');
+echo json_encode(['status' => 'ok']);
+"""
+
+# 依存先を含めたヘルスチェックのパス。監視とデプロイ時の確認に使う
+WEB_HEALTH_CHECK_PATH = "/healthz"
+
+# ヘルスチェックのPHP
+# PHP-FPMで実行されていること、DB（とキャッシュ）にTCPで接続できることを確認し、
+# いずれかに失敗した場合は503を返す
+HEALTHZ_PHP = """<?php
+header('Content-Type: application/json');
+header('Cache-Control: no-store');
+$checks = ['php_fpm' => PHP_SAPI === 'fpm-fcgi'];
+$dependencies = [
+    'db' => [getenv('DB_HOST'), getenv('DB_PORT')],
+    'cache' => [getenv('CACHE_HOST'), getenv('CACHE_PORT')],
+];
+foreach ($dependencies as $name => [$host, $port]) {
+    if (!$host) {
+        continue;
+    }
+    $connection = @fsockopen($host, (int) $port, $errno, $errstr, 1.0);
+    $checks[$name] = $connection !== false;
+    if ($connection !== false) {
+        fclose($connection);
+    }
+}
+$healthy = !in_array(false, $checks, true);
+http_response_code($healthy ? 200 : 503);
+echo json_encode(['status' => $healthy ? 'ok' : 'error', 'checks' => $checks]);
+"""
+
+# OPcacheのウォームアップのパス。インスタンス内（localhost）からのリクエストのみ許可する
+WEB_OPCACHE_WARMUP_PATH = "/opcache-warmup"
+
+# OPcacheのウォームアップのPHP
+# PHP-FPMのワーカーで実行し、ドキュメントルート配下のPHPをOPcacheの共有メモリにコンパイルする。
+# デプロイ後にトラフィックを戻す前に実行し、最初のリクエストでコンパイルを待たないようにする
+OPCACHE_WARMUP_PHP = """<?php
+header('Content-Type: application/json');
+header('Cache-Control: no-store');
+if (!function_exists('opcache_compile_file')) {
+    http_response_code(503);
+    echo json_encode(['status' => 'error', 'reason' => 'opcache is not enabled']);
+    exit;
+}
+set_time_limit(0);
+$compiled = 0;
+$failed = 0;
+$files = new RecursiveIteratorIterator(
+    new RecursiveDirectoryIterator(
+        $_SERVER['DOCUMENT_ROOT'],
+        FilesystemIterator::SKIP_DOTS
+    )
+);
+foreach ($files as $file) {
+    if ($file->getExtension() !== 'php') {
+        continue;
+    }
+    if (@opcache_compile_file($file->getPathname())) {
+        $compiled++;
+    } else {
+        $failed++;
+    }
+}
+$status = opcache_get_status(false);
+echo json_encode([
+    'status' => 'ok',
+    'compiled' => $compiled,
+    'failed' => $failed,
+    'cached_scripts' => $status['opcache_statistics']['num_cached_scripts'],
+    'cache_full' => $status['cache_full'],
+]);
+"""
+
+# ウォームアップのPHPはALBから参照できないよう、ドキュメントルートの外に置く
+OPCACHE_WARMUP_CONF = f"""\
+Alias {WEB_OPCACHE_WARMUP_PATH} /var/www/web-app/opcache-warmup.php
+<Directory /var/www/web-app>
+    Require local
+</Directory>
+"""
+
+
+def get_web_instance_type(instance_type: str = "t3a.micro") -> ec2.InstanceType:
+    """Webサーバー用のインスタンスタイプを取得する
+
+    Args:
+        instance_type (str): インスタンスタイプ（`t3a.micro` 形式）
+    Returns:
+        ec2.InstanceType: インスタンスタイプ
+    """
+    return ec2.InstanceType(instance_type)
+
+
+def get_web_machine_image(
+    instance_type: Optional[ec2.InstanceType] = None,
+) -> ec2.IMachineImage:
+    """Webサーバー用の最新のAmazon Linux 2023のAMIを取得する
+
+    Args:
+        instance_type (Optional[ec2.InstanceType]):
+            インスタンスタイプ。Gravitonの場合はarm64のAMIにする
+    Returns:
+        ec2.IMachineImage: AMI
+    """
+    if (
+        instance_type is not None
+        and instance_type.architecture == ec2.InstanceArchitecture.ARM_64
+    ):
+        return ec2.MachineImage.latest_amazon_linux2023(
+            cpu_type=ec2.AmazonLinuxCpuType.ARM_64
+        )
+    return ec2.MachineImage.latest_amazon_linux2023()
+
+
+def get_web_block_devices(
+    volume_size_gib: int = 10,
+    iops: Optional[int] = None,
+    throughput_mibps: Optional[int] = None,
+) -> list[ec2.BlockDevice]:
+    """Webサーバー用のブロックデバイスを取得する
+
+    Args:
+        volume_size_gib (int): ルートボリュームのサイズ（GiB）
+        iops (Optional[int]): gp3のIOPS。未指定の場合はベースライン
+        throughput_mibps (Optional[int]): gp3のスループット（MiB/s）。未指定の場合はベースライン
+    Returns:
+        list[ec2.BlockDevice]: ブロックデバイスのリスト
+    """
+    volume_type = None
+    if iops is not None or throughput_mibps is not None:
+        volume_type = ec2.EbsDeviceVolumeType.GP3
+    return [
+        ec2.BlockDevice(
+            device_name="/dev/xvda",
+            volume=ec2.BlockDeviceVolume.ebs(
+                volume_size_gib,
+                volume_type=volume_type,
+                iops=iops,
+                throughput=throughput_mibps,
+            ),
+        )
+    ]
+
+
+def get_web_install_commands(php_redis: bool = False) -> list[str]:
+    """Webサーバーのパッケージをインストールするコマンドを取得する
+
+    CodeDeployAgentとApache、PHPをインストールする。
+    起動時にインストールする場合はUserDataで、
+    AMIに焼き込む場合はEC2 Image Builderのコンポーネントで実行する。
+
+    Args:
+        php_redis (bool): セッションをElastiCacheに保存するためのPHPのredis拡張をインストールするか
+    Returns:
+        list[str]: コマンドのリスト
+    """
+    commands = [
+        "dnf update -y",
+        "dnf install -y wget",
+        "cd",
+        # CodeDeployAgentはインスタンスを起動したリージョンのバケットから取得する
+        "TOKEN=$(curl -sS -X PUT http://169.254.169.254/latest/api/token"
+        " -H 'X-aws-ec2-metadata-token-ttl-seconds: 300')",
+        'REGION=$(curl -sS -H "X-aws-ec2-metadata-token: $TOKEN"'
+        " http://169.254.169.254/latest/meta-data/placement/region)",
+        "wget https://aws-codedeploy-${REGION}.s3.${REGION}.amazonaws.com"
+        "/latest/install",
+        "chmod +x ./install",
+        "sudo ./install auto",
+        "dnf install -y httpd wget php-fpm php-mysqli php-json php php-devel",
+        "systemctl enable codedeploy-agent",
+        "systemctl enable httpd",
+    ]
+    if php_redis:
+        # Amazon Linux 2023にはredis拡張のパッケージがないためPECLでビルドする
+        commands += [
+            "dnf install -y php-pear gcc",
+            "yes '' | pecl install -f redis",
+            "echo 'extension=redis.so' > /etc/php.d/40-redis.ini",
+        ]
+    return commands
+
+
+def get_web_runtime_commands(
+    environment: Optional[dict[str, str]] = None,
+    session_save_path: Optional[str] = None,
+) -> list[str]:
+    """Webサーバーの起動時に毎回実行するコマンドを取得する
+
+    Args:
+        environment (Optional[dict[str, str]]):
+            アプリケーションに渡す環境変数。ApacheのSetEnvでPHPに渡す
+        session_save_path (Optional[str]):
+            PHPのセッションを保存するElastiCacheのURL（`tls://host:6379`）。
+            未指定の場合はローカルのファイルに保存する
+    Returns:
+        list[str]: コマンドのリスト
+    """
+    commands = []
+    if session_save_path:
+        # インスタンス間でセッションを共有し、スティッキーセッションなしで負荷を分散させる
+        commands += [
+            "sed -i"
+            " -e 's|^php_value\\[session.save_handler\\].*|"
+            "php_value[session.save_handler] = redis|'"
+            " -e 's|^php_value\\[session.save_path\\].*|"
+            f'php_value[session.save_path] = "{session_save_path}"|\''
+            f" {PHP_FPM_WWW_CONF}",
+            # 同じセッションへの同時リクエストで更新が失われないようにロックする
+            "echo 'php_value[redis.session.locking_enabled] = 1'"
+            f" >> {PHP_FPM_WWW_CONF}",
+        ]
+    if environment:
+        commands.append(f"echo -n > {WEB_APP_ENV_CONF}")
+        commands.extend(
+            f"echo 'SetEnv {key} \"{value}\"' >> {WEB_APP_ENV_CONF}"
+            for key, value in environment.items()
+        )
+    return commands + [
+        f"cat > /var/www/html/livez.php <<'EOF'\n{LIVEZ_PHP}EOF",
+        f"cat > /var/www/html/healthz.php <<'EOF'\n{HEALTHZ_PHP}EOF",
+        "cat > /etc/httpd/conf.d/healthz.conf <<'EOF'\n"
+        f"Alias {WEB_LIVENESS_CHECK_PATH} /var/www/html/livez.php\n"
+        f"Alias {WEB_HEALTH_CHECK_PATH} /var/www/html/healthz.php\nEOF",
+        "mkdir -p /var/www/web-app",
+        f"cat > /var/www/web-app/opcache-warmup.php <<'EOF'\n{OPCACHE_WARMUP_PHP}EOF",
+        "cat > /etc/httpd/conf.d/opcache-warmup.conf <<'EOF'\n"
+        f"{OPCACHE_WARMUP_CONF}EOF",
+        "systemctl start codedeploy-agent",
+        # AMIに焼き込んだ場合はApacheとPHP-FPMが起動済みのため、
+        # 書き込んだ設定を反映するよう再起動する
+        "systemctl restart php-fpm httpd",
+        "echo 'Health check' > /var/www/html/health_check.html",
+    ]
+
+
+def create_web_user_data(
+    image_mode: str = "boot",
+    environment: Optional[dict[str, str]] = None,
+    session_save_path: Optional[str] = None,
+    instance_type: Optional[ec2.InstanceType] = None,
+    php_worker_rss_mib: int = 64,
+) -> ec2.UserData:
+    """Webサーバー用のUserDataを作成する
+
+    EC2インスタンスとAuto Scalingグループの起動テンプレートで共用する。
+
+    Args:
+        image_mode (str): boot: 起動時にパッケージをインストールする
+            bake: パッケージを焼き込んだAMIを使うため、起動時のコマンドのみ実行する
+        environment (Optional[dict[str, str]]): アプリケーションに渡す環境変数
+        session_save_path (Optional[str]): PHPのセッションを保存するElastiCacheのURL
+        instance_type (Optional[ec2.InstanceType]):
+            Apache、PHP-FPM、OPcacheの設定を合わせるインスタンスタイプ。未指定の場合はWebサーバー用のもの
+        php_worker_rss_mib (int): PHP-FPMのワーカー1つあたりのメモリ使用量（MiB）
+    Returns:
+        ec2.UserData: UserData
+    """
+    if image_mode not in IMAGE_MODES:
+        raise ValueError(
+            f"image_mode must be one of {', '.join(IMAGE_MODES)}: {image_mode}"
+        )
+
+    user_data = ec2.UserData.for_linux()
+    if image_mode == "boot":
+        user_data.add_commands(
+            *get_web_install_commands(php_redis=session_save_path is not None)
+        )
+    # チューニングの設定は起動時のコマンドの最後の再起動で反映する
+    user_data.add_commands(
+        *get_web_tuning_commands(
+            instance_type or get_web_instance_type(), php_worker_rss_mib
+        )
+    )
+    user_data.add_commands(*get_web_runtime_commands(environment, session_save_path))
+
+    return user_data
+
 
 def create_web_ec2_instance(
     scope: Construct,
@@ -12,6 +313,10 @@ def create_web_ec2_instance(
     security_group: ec2.SecurityGroup,
     instance_profile: iam.Role,
     key_pair_name: str,
+    user_data: Optional[ec2.UserData] = None,
+    machine_image: Optional[ec2.IMachineImage] = None,
+    instance_type: Optional[ec2.InstanceType] = None,
+    block_devices: Optional[list[ec2.BlockDevice]] = None,
 ) -> ec2.Instance:
     """Webサーバー用のEC2インスタンスを作成する
 
@@ -24,6 +329,12 @@ def create_web_ec2_instance(
         security_group (ec2.SecurityGroup): EC2インスタンス用のセキュリティグループ
         instance_profile (iam.Role): インスタンスプロファイル
         key_pair_name (str): キーペア名
+        user_data (Optional[ec2.UserData]): UserData。未指定の場合は起動時にパッケージをインストールする
+        machine_image (Optional[ec2.IMachineImage]): AMI。未指定の場合は最新のAmazon Linux 2023
+        instance_type (Optional[ec2.InstanceType]):
+            インスタンスタイプ。未指定の場合はWebサーバー用のもの
+        block_devices (Optional[list[ec2.BlockDevice]]):
+            ブロックデバイス。未指定の場合はWebサーバー用のもの
     Returns:
         ec2.SecurityGroup: EC2インスタンス
     """
@@ -33,38 +344,24 @@ def create_web_ec2_instance(
         scope, f"{app_name}_{stage}_key_pair_{suffix}", key_pair_name
     )
 
-    user_data=ec2.UserData.for_linux()
-    user_data.add_commands("dnf update -y")
-    user_data.add_commands("dnf install -y wget")
-    user_data.add_commands("cd")
-    user_data.add_commands("wget https://aws-codedeploy-ap-northeast-1.s3.ap-northeast-1.amazonaws.com/latest/install")
-    user_data.add_commands("chmod +x ./install")
-    user_data.add_commands("sudo ./install auto")
-    user_data.add_commands("dnf install -y httpd wget php-fpm php-mysqli php-json php php-devel")
-    user_data.add_commands("systemctl enable codedeploy-agent")
-    user_data.add_commands("systemctl start codedeploy-agent")
-    
-    user_data.add_commands("systemctl start httpd")
-    user_data.add_commands("systemctl enable httpd")
-    user_data.add_commands("echo 'Health check' > /var/www/html/health_check.html")
+    if instance_type is None:
+        instance_type = get_web_instance_type()
+    if user_data is None:
+        user_data = create_web_user_data(instance_type=instance_type)
+    if machine_image is None:
+        machine_image = get_web_machine_image(instance_type)
 
     return ec2.Instance(
         scope,
         id=f"{app_name}_{stage}_web_ec2_{suffix}",
         instance_name=f"{app_name}-{stage}-web-ec2-{suffix}",
         vpc=vpc,
-        instance_type=ec2.InstanceType.of(
-            ec2.InstanceClass.T3A, ec2.InstanceSize.MICRO
-        ),
-        machine_image=ec2.MachineImage.latest_amazon_linux2023(),
+        instance_type=instance_type,
+        machine_image=machine_image,
         key_pair=key_pair,
-        block_devices=[
-            ec2.BlockDevice(
-                device_name="/dev/xvda", volume=ec2.BlockDeviceVolume.ebs(10)
-            )
-        ],
+        block_devices=block_devices or get_web_block_devices(),
         role=instance_profile,
         security_group=security_group,
         # UserDataの使ってインスタンス起動時にスクリプトを実行、CodeDeployAgentとApacheをインストール
-        user_data=user_data
+        user_data=user_data,
     )
@@ -0,0 +1,118 @@
+import re
+import warnings
+from dataclasses import dataclass
+from typing import Union
+
+from aws_cdk import aws_ec2 as ec2
+
+
+@dataclass(frozen=True)
+class InstanceSpec:
+    """インスタンスタイプのvCPU数とメモリサイズ"""
+
+    vcpus: int
+    memory_mib: int
+
+
+# インスタンスファミリーごとのサイズとvCPU数、メモリサイズ（MiB）
+_BURSTABLE_SIZES = {
+    "nano": InstanceSpec(2, 512),
+    "micro": InstanceSpec(2, 1024),
+    "small": InstanceSpec(2, 2048),
+    "medium": InstanceSpec(2, 4096),
+    "large": InstanceSpec(2, 8192),
+    "xlarge": InstanceSpec(4, 16384),
+    "2xlarge": InstanceSpec(8, 32768),
+}
+# 汎用（m）、コンピューティング最適化（c）、メモリ最適化（r）はvCPUあたりのメモリが4GiB、2GiB、8GiB
+_STANDARD_VCPUS = {"large": 2, "xlarge": 4, "2xlarge": 8, "4xlarge": 16}
+_MEMORY_MIB_PER_VCPU = {"m": 4096, "c": 2048, "r": 8192}
+_STANDARD_GENERATIONS = ("6g", "6i", "7g", "7i")
+
+# インスタンスタイプ（`t3a.micro` 形式）ごとのvCPU数とメモリサイズ
+# EC2とRDS（`db.` を除いたもの）で共用する
+INSTANCE_SPECS: dict[str, InstanceSpec] = {
+    **{
+        f"{family}.{size}": spec
+        for family in ("t3", "t3a", "t4g")
+        for size, spec in _BURSTABLE_SIZES.items()
+    },
+    **{
+        f"{category}{generation}.{size}": InstanceSpec(
+            vcpus, vcpus * _MEMORY_MIB_PER_VCPU[category]
+        )
+        for category in _MEMORY_MIB_PER_VCPU
+        for generation in _STANDARD_GENERATIONS
+        for size, vcpus in _STANDARD_VCPUS.items()
+    },
+}
+
+
+# 表にないインスタンスタイプのファミリーとサイズ
+# ファミリーは種類（m、c、r など）、世代の数字、属性（a、g、d、n、-flex など）からなる
+_INSTANCE_TYPE_PATTERN = re.compile(
+    r"^(?P<category>[a-z]+)\d[a-z0-9-]*\.(?P<size>[a-z0-9]+)$"
+)
+_XLARGE_PATTERN = re.compile(r"^(?P<multiplier>\d*)xlarge$")
+# 種類がわからない場合のvCPUあたりのメモリ（汎用と同じ4GiB）
+_DEFAULT_MEMORY_MIB_PER_VCPU = _MEMORY_MIB_PER_VCPU["m"]
+
+
+def estimate_instance_spec(name: str) -> InstanceSpec:
+    """表にないインスタンスタイプのvCPU数とメモリサイズをファミリーとサイズから推定する
+
+    バースト可能（t）はt3と同じ、それ以外はlargeを2vCPUとしてサイズに比例させ、
+    メモリはvCPU数に種類ごとのvCPUあたりのメモリを掛ける。
+
+    Args:
+        name (str): `m5.large` 形式のインスタンスタイプ
+    Returns:
+        InstanceSpec: 推定したvCPU数とメモリサイズ
+    """
+    match = _INSTANCE_TYPE_PATTERN.match(name)
+    if match is None:
+        raise ValueError(f"invalid instance type: {name}")
+    category, size = match.group("category", "size")
+
+    if category == "t" and size in _BURSTABLE_SIZES:
+        return _BURSTABLE_SIZES[size]
+
+    if size == "medium":
+        vcpus = 1
+    elif size == "large":
+        vcpus = 2
+    elif (xlarge := _XLARGE_PATTERN.match(size)) is not None:
+        vcpus = 4 * int(xlarge.group("multiplier") or 1)
+    else:
+        # metalなどはサイズからvCPU数を決められない
+        raise ValueError(f"unsupported instance size: {name}")
+    return InstanceSpec(
+        vcpus,
+        vcpus * _MEMORY_MIB_PER_VCPU.get(category, _DEFAULT_MEMORY_MIB_PER_VCPU),
+    )
+
+
+def get_instance_spec(instance_type: Union[ec2.InstanceType, str]) -> InstanceSpec:
+    """インスタンスタイプのvCPU数とメモリサイズを取得する
+
+    表にないインスタンスタイプはファミリーとサイズから推定し、警告を出す。
+
+    Args:
+        instance_type (Union[ec2.InstanceType, str]):
+            インスタンスタイプ。`db.` から始まるRDSのインスタンスクラスも指定できる
+    Returns:
+        InstanceSpec: vCPU数とメモリサイズ
+    """
+    if isinstance(instance_type, ec2.InstanceType):
+        instance_type = instance_type.to_string()
+    name = instance_type.removeprefix("db.")
+    if name in INSTANCE_SPECS:
+        return INSTANCE_SPECS[name]
+
+    spec = estimate_instance_spec(name)
+    warnings.warn(
+        f"{name} is not in INSTANCE_SPECS; estimated {spec.vcpus} vCPUs and "
+        f"{spec.memory_mib} MiB from its family and size",
+        stacklevel=2,
+    )
+    return spec
@@ -0,0 +1,197 @@
+from typing import Optional
+
+from aws_cdk import Duration
+from aws_cdk import aws_autoscaling as autoscaling
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_iam as iam
+from constructs import Construct
+
+from web_app.lib.ec2.ec2_utils import (
+    get_web_block_devices,
+    get_web_instance_type,
+    get_web_machine_image,
+)
+
+# スケーリングモード
+# request_count: ALBRequestCountPerTargetのターゲット追跡
+# cpu: CPU使用率のターゲット追跡
+# request_count_and_cpu: 両方のターゲット追跡（いずれかがスケールアウトを要求すればスケールアウト）
+# none: スケーリングポリシーを設定しない（固定台数）
+SCALING_MODES = ("request_count", "cpu", "request_count_and_cpu", "none")
+
+
+class WebAutoScalingGroup(Construct):
+    """Webサーバー用の起動テンプレートとAuto Scalingグループを構築するモジュール"""
+
+    _launch_template: ec2.LaunchTemplate
+    _auto_scaling_group: autoscaling.AutoScalingGroup
+
+    def __init__(
+        self,
+        scope: Construct,
+        app_name: str,
+        stage: str,
+        vpc: ec2.Vpc,
+        security_group: ec2.SecurityGroup,
+        instance_profile: iam.Role,
+        key_pair_name: str,
+        user_data: ec2.UserData,
+        min_capacity: int = 2,
+        max_capacity: int = 4,
+        desired_capacity: Optional[int] = None,
+        on_demand_base_capacity: int = 0,
+        on_demand_percentage_above_base_capacity: int = 100,
+        instance_types: Optional[list[ec2.InstanceType]] = None,
+        machine_image: Optional[ec2.IMachineImage] = None,
+        instance_type: Optional[ec2.InstanceType] = None,
+        block_devices: Optional[list[ec2.BlockDevice]] = None,
+    ) -> None:
+        """コンストラクタ
+
+        Args:
+            scope (Construct): 親のConstruct
+            app_name (str): アプリケーション名
+            stage (str): ステージ名
+            vpc (ec2.Vpc): VPC
+            security_group (ec2.SecurityGroup): EC2インスタンス用のセキュリティグループ
+            instance_profile (iam.Role): インスタンスプロファイル
+            key_pair_name (str): キーペア名
+            user_data (ec2.UserData): UserData
+            min_capacity (int): 最小台数
+            max_capacity (int): 最大台数
+            desired_capacity (Optional[int]): 希望台数。未指定の場合はデプロイ時に台数を変更しない
+            on_demand_base_capacity (int): オンデマンドで起動するベース台数
+            on_demand_percentage_above_base_capacity (int):
+                ベース台数を超える分のオンデマンドの割合（%）。100未満の場合はスポットを混在させる
+            instance_types (Optional[list[ec2.InstanceType]]):
+                スポット混在時に使用するインスタンスタイプのリスト
+            machine_image (Optional[ec2.IMachineImage]):
+                AMI。未指定の場合はインスタンスタイプのアーキテクチャの最新のAmazon Linux 2023
+            instance_type (Optional[ec2.InstanceType]):
+                起動テンプレートのインスタンスタイプ。未指定の場合はWebサーバー用のもの
+            block_devices (Optional[list[ec2.BlockDevice]]):
+                ブロックデバイス。未指定の場合はWebサーバー用のもの
+        """
+        super().__init__(scope, f"{app_name}_{stage}_web_auto_scaling_group")
+
+        if min_capacity > max_capacity:
+            raise ValueError("min_capacity must be less than or equal to max_capacity")
+        if desired_capacity is not None and not (
+            min_capacity <= desired_capacity <= max_capacity
+        ):
+            raise ValueError(
+                "desired_capacity must be between min_capacity and max_capacity"
+            )
+        if not 0 <= on_demand_percentage_above_base_capacity <= 100:
+            raise ValueError(
+                "on_demand_percentage_above_base_capacity must be between 0 and 100"
+            )
+
+        if instance_type is None:
+            instance_type = get_web_instance_type()
+        # 起動テンプレートのAMIは1つのため、スポットのインスタンスタイプもアーキテクチャを揃える
+        if any(
+            override_type.architecture != instance_type.architecture
+            for override_type in instance_types or []
+        ):
+            raise ValueError(
+                "instance_types must have the same architecture as instance_type"
+            )
+
+        # キーペア名から既存のキーペアオブジェクトを取得
+        key_pair = ec2.KeyPair.from_key_pair_name(
+            self, f"{app_name}_{stage}_web_key_pair", key_pair_name
+        )
+
+        self._launch_template = ec2.LaunchTemplate(
+            self,
+            id=f"{app_name}_{stage}_web_launch_template",
+            launch_template_name=f"{app_name}-{stage}-web-launch-template",
+            instance_type=instance_type,
+            machine_image=(machine_image or get_web_machine_image(instance_type)),
+            key_pair=key_pair,
+            block_devices=block_devices or get_web_block_devices(),
+            role=instance_profile,
+            security_group=security_group,
+            user_data=user_data,
+        )
+
+        # スポットを混在させる場合は複数のインスタンスタイプから起動できるようにする
+        mixed_instances_policy: Optional[autoscaling.MixedInstancesPolicy] = None
+        if on_demand_percentage_above_base_capacity < 100:
+            mixed_instances_policy = autoscaling.MixedInstancesPolicy(
+                launch_template=self._launch_template,
+                instances_distribution=autoscaling.InstancesDistribution(
+                    on_demand_base_capacity=on_demand_base_capacity,
+                    on_demand_percentage_above_base_capacity=(
+                        on_demand_percentage_above_base_capacity
+                    ),
+                    spot_allocation_strategy=(
+                        autoscaling.SpotAllocationStrategy.PRICE_CAPACITY_OPTIMIZED
+                    ),
+                ),
+                launch_template_overrides=[
+                    autoscaling.LaunchTemplateOverrides(instance_type=override_type)
+                    for override_type in (instance_types or [instance_type])
+                ],
+            )
+
+        self._auto_scaling_group = autoscaling.AutoScalingGroup(
+            self,
+            id=f"{app_name}_{stage}_web_asg",
+            auto_scaling_group_name=f"{app_name}-{stage}-web-asg",
+            vpc=vpc,
+            vpc_subnets=ec2.SubnetSelection(
+                subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+            ),
+            launch_template=(
+                self._launch_template if mixed_instances_policy is None else None
+            ),
+            mixed_instances_policy=mixed_instances_policy,
+            min_capacity=min_capacity,
+            max_capacity=max_capacity,
+            desired_capacity=desired_capacity,
+            # ALBのヘルスチェック（死活監視）に失敗したインスタンスも置き換える
+            health_check=autoscaling.HealthCheck.elb(grace=Duration.minutes(5)),
+            capacity_rebalance=mixed_instances_policy is not None,
+        )
+
+    def add_target_tracking_policies(
+        self,
+        scaling_mode: str,
+        requests_per_target: int = 1000,
+        cpu_utilization_percent: int = 50,
+    ) -> None:
+        """ターゲット追跡スケーリングポリシーを追加する
+
+        ALBRequestCountPerTargetを使うため、ALBのターゲットグループに登録した後に呼び出すこと
+
+        Args:
+            scaling_mode (str): スケーリングモード（SCALING_MODESのいずれか）
+            requests_per_target (int): 1ターゲットあたりの1分間のリクエスト数の目標値
+            cpu_utilization_percent (int): CPU使用率の目標値（%）
+        """
+        if scaling_mode not in SCALING_MODES:
+            raise ValueError(
+                f"scaling_mode must be one of {', '.join(SCALING_MODES)}: "
+                f"{scaling_mode}"
+            )
+
+        if scaling_mode in ("request_count", "request_count_and_cpu"):
+            self._auto_scaling_group.scale_on_request_count(
+                "request_count_scaling",
+                target_requests_per_minute=requests_per_target,
+            )
+        if scaling_mode in ("cpu", "request_count_and_cpu"):
+            self._auto_scaling_group.scale_on_cpu_utilization(
+                "cpu_scaling",
+                target_utilization_percent=cpu_utilization_percent,
+            )
+
+    def get_launch_template(self) -> ec2.LaunchTemplate:
+        """起動テンプレートを取得する"""
+        return self._launch_template
+
+    def get_auto_scaling_group(self) -> autoscaling.AutoScalingGroup:
+        """Auto Scalingグループを取得する"""
+        return self._auto_scaling_group
@@ -0,0 +1,194 @@
+import math
+from dataclasses import dataclass
+from typing import Union
+
+from aws_cdk import aws_ec2 as ec2
+
+from web_app.lib.ec2.instance_types import get_instance_spec
+
+# 生成する設定ファイル
+PHP_FPM_WWW_CONF = "/etc/php-fpm.d/www.conf"
+HTTPD_MPM_CONF = "/etc/httpd/conf.modules.d/00-mpm.conf"
+HTTPD_TUNING_CONF = "/etc/httpd/conf.d/web-app-tuning.conf"
+PHP_TUNING_INI = "/etc/php.d/99-web-app-tuning.ini"
+
+# mpm_eventの1プロセスあたりのスレッド数
+HTTPD_THREADS_PER_CHILD = 25
+
+# ALBのアイドルタイムアウト（60秒）より長くし、ALBとの接続をWebサーバー側から切らないようにする
+HTTPD_KEEP_ALIVE_TIMEOUT_SECONDS = 65
+
+
+@dataclass(frozen=True)
+class WebServerTuning:
+    """インスタンスサイズから求めたApache、PHP-FPM、OPcacheの設定値"""
+
+    instance_type: str
+    memory_mib: int
+    vcpus: int
+    pm: str
+    pm_max_children: int
+    pm_start_servers: int
+    pm_min_spare_servers: int
+    pm_max_spare_servers: int
+    pm_max_requests: int
+    httpd_server_limit: int
+    httpd_max_request_workers: int
+    opcache_memory_mib: int
+    opcache_interned_strings_buffer_mib: int
+    opcache_max_accelerated_files: int
+    realpath_cache_size_kib: int
+
+
+def calculate_web_server_tuning(
+    instance_type: Union[ec2.InstanceType, str],
+    php_worker_rss_mib: int = 64,
+) -> WebServerTuning:
+    """インスタンスサイズからApache、PHP-FPM、OPcacheの設定値を求める
+
+    PHP-FPMのワーカー数は、メモリからOS・Apache・CodeDeployAgent・OPcacheの分を除き、
+    ワーカー1つあたりのメモリ使用量（RSS）で割って求める。
+
+    Args:
+        instance_type (Union[ec2.InstanceType, str]): インスタンスタイプ
+        php_worker_rss_mib (int): PHP-FPMのワーカー1つあたりのメモリ使用量（MiB）
+    Returns:
+        WebServerTuning: 設定値
+    """
+    if php_worker_rss_mib <= 0:
+        raise ValueError("php_worker_rss_mib must be positive")
+    if isinstance(instance_type, ec2.InstanceType):
+        instance_type = instance_type.to_string()
+    spec = get_instance_spec(instance_type)
+
+    # OPcacheは共有メモリのため、ワーカー数によらず1つ分だけ確保する
+    if spec.memory_mib <= 2048:
+        opcache_memory_mib, interned_strings_mib, max_files = 64, 8, 10000
+    elif spec.memory_mib <= 8192:
+        opcache_memory_mib, interned_strings_mib, max_files = 128, 16, 20000
+    else:
+        opcache_memory_mib, interned_strings_mib, max_files = 256, 32, 40000
+
+    # OSとApache、CodeDeployAgentの分として256MiBとメモリの10%を残す
+    reserved_mib = 256 + spec.memory_mib // 10 + opcache_memory_mib
+    max_children = max(2, (spec.memory_mib - reserved_mib) // php_worker_rss_mib)
+
+    # バースト可能なインスタンスはアイドル時のメモリを空けておくためdynamic、
+    # それ以外はワーカーの起動待ちをなくすためstaticにする
+    pm = "dynamic" if instance_type.startswith("t") else "static"
+    min_spare_servers = max(1, min(spec.vcpus, max_children // 4))
+    max_spare_servers = max(min_spare_servers, max_children // 2)
+
+    # PHP-FPMのワーカー数の4倍を上限に、静的ファイルやKeep-Aliveの接続をスレッドで処理する
+    server_limit = max(2, math.ceil(max_children * 4 / HTTPD_THREADS_PER_CHILD))
+
+    return WebServerTuning(
+        instance_type=instance_type,
+        memory_mib=spec.memory_mib,
+        vcpus=spec.vcpus,
+        pm=pm,
+        pm_max_children=max_children,
+        pm_start_servers=min_spare_servers,
+        pm_min_spare_servers=min_spare_servers,
+        pm_max_spare_servers=max_spare_servers,
+        pm_max_requests=500,
+        httpd_server_limit=server_limit,
+        httpd_max_request_workers=server_limit * HTTPD_THREADS_PER_CHILD,
+        opcache_memory_mib=opcache_memory_mib,
+        opcache_interned_strings_buffer_mib=interned_strings_mib,
+        opcache_max_accelerated_files=max_files,
+        realpath_cache_size_kib=4096,
+    )
+
+
+def render_web_server_config(tuning: WebServerTuning) -> dict[str, str]:
+    """Apache、OPcacheの設定ファイルを生成する
+
+    Args:
+        tuning (WebServerTuning): 設定値
+    Returns:
+        dict[str, str]: 設定ファイルのパスと内容
+    """
+    return {
+        # preforkではなくeventを使い、Keep-Aliveの接続でワーカーを占有しない
+        HTTPD_MPM_CONF: "LoadModule mpm_event_module modules/mod_mpm_event.so\n",
+        HTTPD_TUNING_CONF: (
+            f"# {tuning.instance_type}\n"
+            "<IfModule mpm_event_module>\n"
+            "    StartServers 2\n"
+            f"    ServerLimit {tuning.httpd_server_limit}\n"
+            f"    ThreadsPerChild {HTTPD_THREADS_PER_CHILD}\n"
+            f"    MaxRequestWorkers {tuning.httpd_max_request_workers}\n"
+            f"    MinSpareThreads {HTTPD_THREADS_PER_CHILD}\n"
+            f"    MaxSpareThreads {HTTPD_THREADS_PER_CHILD * 3}\n"
+            "    MaxConnectionsPerChild 0\n"
+            "</IfModule>\n"
+            "KeepAlive On\n"
+            f"KeepAliveTimeout {HTTPD_KEEP_ALIVE_TIMEOUT_SECONDS}\n"
+            "MaxKeepAliveRequests 0\n"
+        ),
+        PHP_TUNING_INI: (
+            f"; {tuning.instance_type}\n"
+            "opcache.enable=1\n"
+            f"opcache.memory_consumption={tuning.opcache_memory_mib}\n"
+            "opcache.interned_strings_buffer="
+            f"{tuning.opcache_interned_strings_buffer_mib}\n"
+            f"opcache.max_accelerated_files={tuning.opcache_max_accelerated_files}\n"
+            "opcache.validate_timestamps=1\n"
+            "opcache.revalidate_freq=60\n"
+            f"realpath_cache_size={tuning.realpath_cache_size_kib}K\n"
+            "realpath_cache_ttl=600\n"
+        ),
+    }
+
+
+def render_php_fpm_pool_config(tuning: WebServerTuning) -> str:
+    """PHP-FPMのプールのプロセス管理の設定を生成する
+
+    Args:
+        tuning (WebServerTuning): 設定値
+    Returns:
+        str: www.confに追記する設定
+    """
+    lines = [
+        f"pm = {tuning.pm}",
+        f"pm.max_children = {tuning.pm_max_children}",
+    ]
+    if tuning.pm == "dynamic":
+        lines += [
+            f"pm.start_servers = {tuning.pm_start_servers}",
+            f"pm.min_spare_servers = {tuning.pm_min_spare_servers}",
+            f"pm.max_spare_servers = {tuning.pm_max_spare_servers}",
+        ]
+    # メモリリークでワーカーのRSSが増え続けないよう、一定回数で再起動する
+    lines.append(f"pm.max_requests = {tuning.pm_max_requests}")
+    return "\n".join(lines) + "\n"
+
+
+def get_web_tuning_commands(
+    instance_type: Union[ec2.InstanceType, str],
+    php_worker_rss_mib: int = 64,
+) -> list[str]:
+    """Apache、PHP-FPM、OPcacheの設定ファイルを書き込むコマンドを取得する
+
+    UserDataで実行する。AMIに焼き込んだ場合はApacheとPHP-FPMが起動済みのため、
+    設定を反映するには実行後に両方を再起動する。
+
+    Args:
+        instance_type (Union[ec2.InstanceType, str]): インスタンスタイプ
+        php_worker_rss_mib (int): PHP-FPMのワーカー1つあたりのメモリ使用量（MiB）
+    Returns:
+        list[str]: コマンドのリスト
+    """
+    tuning = calculate_web_server_tuning(instance_type, php_worker_rss_mib)
+    commands = [
+        f"cat > {path} <<'EOF'\n{content}EOF"
+        for path, content in render_web_server_config(tuning).items()
+    ]
+    # 既存のプロセス管理の設定を削除してから追記する
+    commands += [
+        f"sed -i '/^pm\\(\\.[a-z_]*\\)\\? *=/d' {PHP_FPM_WWW_CONF}",
+        f"cat >> {PHP_FPM_WWW_CONF} <<'EOF'\n"
+        f"{render_php_fpm_pool_config(tuning)}EOF",
+    ]
+    return commands
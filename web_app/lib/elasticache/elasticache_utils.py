@@ -0,0 +1,66 @@
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_elasticache as elasticache
+from constructs import Construct
+
+# セッションとアプリケーションのキャッシュに使うポート
+CACHE_PORT = 6379
+
+
+def create_cache_replication_group(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    vpc: ec2.Vpc,
+    security_group: ec2.SecurityGroup,
+    node_type: str = "cache.t4g.micro",
+    replica_count: int = 1,
+    engine_version: str = "8.0",
+) -> elasticache.CfnReplicationGroup:
+    """ElastiCache（Valkey）のレプリケーショングループを作成する
+
+    Webサーバーで共有するPHPのセッションとアプリケーションのキャッシュに使う。
+    レプリカがある場合は自動フェイルオーバーとマルチAZを有効にする。
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        vpc (ec2.Vpc): VPC
+        security_group (ec2.SecurityGroup): ElastiCache用のセキュリティグループ
+        node_type (str): ノードタイプ
+        replica_count (int): レプリカの数（0〜5）
+        engine_version (str): Valkeyのバージョン
+    Returns:
+        elasticache.CfnReplicationGroup: レプリケーショングループ
+    """
+    if not 0 <= replica_count <= 5:
+        raise ValueError("replica_count must be between 0 and 5")
+
+    # DB用のプライベートサブネット（NATゲートウェイに接続しない）に配置する
+    subnet_group = elasticache.CfnSubnetGroup(
+        scope,
+        id=f"{app_name}_{stage}_cache_subnet_group",
+        cache_subnet_group_name=f"{app_name}-{stage}-cache-subnet-group",
+        description=f"{app_name}-{stage}-cache-subnet-group",
+        subnet_ids=vpc.select_subnets(
+            subnet_type=ec2.SubnetType.PRIVATE_ISOLATED
+        ).subnet_ids,
+    )
+
+    return elasticache.CfnReplicationGroup(
+        scope,
+        id=f"{app_name}_{stage}_cache",
+        replication_group_id=f"{app_name}-{stage}-cache",
+        replication_group_description=f"{app_name}-{stage}-cache",
+        engine="valkey",
+        engine_version=engine_version,
+        cache_node_type=node_type,
+        num_cache_clusters=replica_count + 1,
+        automatic_failover_enabled=replica_count > 0,
+        multi_az_enabled=replica_count > 0,
+        port=CACHE_PORT,
+        cache_subnet_group_name=subnet_group.ref,
+        security_group_ids=[security_group.security_group_id],
+        at_rest_encryption_enabled=True,
+        transit_encryption_enabled=True,
+    )
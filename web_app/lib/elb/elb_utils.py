@@ -1,11 +1,201 @@
+from typing import Optional
+
+from aws_cdk import Duration, RemovalPolicy, Stack
 from aws_cdk import aws_certificatemanager as acm
 from aws_cdk import aws_cognito as cognito
 from aws_cdk import aws_ec2 as ec2
 from aws_cdk import aws_elasticloadbalancingv2 as elb
 from aws_cdk import aws_elasticloadbalancingv2_actions as actions
-from aws_cdk import aws_elasticloadbalancingv2_targets as tg
+from aws_cdk import aws_iam as iam
+from aws_cdk import aws_s3 as s3
+from aws_cdk import region_info
 from constructs import Construct
 
+from web_app.lib.ec2.ec2_utils import WEB_LIVENESS_CHECK_PATH
+
+# ロードバランシングのアルゴリズム
+LOAD_BALANCING_ALGORITHMS = {
+    "round_robin": elb.TargetGroupLoadBalancingAlgorithmType.ROUND_ROBIN,
+    "least_outstanding_requests": (
+        elb.TargetGroupLoadBalancingAlgorithmType.LEAST_OUTSTANDING_REQUESTS
+    ),
+    "weighted_random": elb.TargetGroupLoadBalancingAlgorithmType.WEIGHTED_RANDOM,
+}
+
+# アクセスログを書き込むS3のプレフィックス
+ALB_ACCESS_LOG_PREFIX = "alb"
+
+
+def create_alb_log_bucket(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    retention_days: int = 90,
+    infrequent_access_days: int = 30,
+) -> s3.Bucket:
+    """ALBのアクセスログを保存するS3バケットを作成する
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        retention_days (int): アクセスログを保存する日数
+        infrequent_access_days (int): 標準-IAに移行するまでの日数
+    Returns:
+        s3.Bucket: S3バケット
+    """
+    # 標準-IAは30日以上経過したオブジェクトにしか移行できない
+    if infrequent_access_days < 30:
+        raise ValueError("infrequent_access_days must be at least 30")
+    if retention_days <= infrequent_access_days:
+        raise ValueError("retention_days must be greater than infrequent_access_days")
+
+    return s3.Bucket(
+        scope,
+        id=f"{app_name}_{stage}_alb_log_bucket",
+        # ALBのアクセスログはSSE-S3で暗号化したバケットにしか書き込めない
+        encryption=s3.BucketEncryption.S3_MANAGED,
+        block_public_access=s3.BlockPublicAccess.BLOCK_ALL,
+        enforce_ssl=True,
+        lifecycle_rules=[
+            s3.LifecycleRule(
+                id="expire-access-logs",
+                transitions=[
+                    s3.Transition(
+                        storage_class=s3.StorageClass.INFREQUENT_ACCESS,
+                        transition_after=Duration.days(infrequent_access_days),
+                    )
+                ],
+                expiration=Duration.days(retention_days),
+                abort_incomplete_multipart_upload_after=Duration.days(1),
+            )
+        ],
+        removal_policy=RemovalPolicy.DESTROY,
+        auto_delete_objects=True,
+    )
+
+
+def _enable_alb_access_logs(
+    alb: elb.ApplicationLoadBalancer, bucket: s3.IBucket, prefix: str
+) -> None:
+    """ALBのアクセスログを有効にする
+
+    `ApplicationLoadBalancer.log_access_logs` はリージョンを指定しないスタックでは使えないため、
+    ELBのアカウントIDをリージョンごとのマッピングから参照してバケットポリシーを設定する
+
+    Args:
+        alb (elb.ApplicationLoadBalancer): ALB
+        bucket (s3.IBucket): アクセスログを保存するS3バケット
+        prefix (str): アクセスログを書き込むS3のプレフィックス
+    """
+    stack = Stack.of(alb)
+    log_object_arn = bucket.arn_for_objects(f"{prefix}/AWSLogs/{stack.account}/*")
+    # 2022年8月以前に提供されたリージョンはELBのアカウント、それ以降のリージョンはサービスプリンシパルが書き込む
+    elb_account = stack.regional_fact(region_info.FactName.ELBV2_ACCOUNT)
+    bucket.add_to_resource_policy(
+        iam.PolicyStatement(
+            actions=["s3:PutObject"],
+            resources=[log_object_arn],
+            principals=[
+                iam.AccountPrincipal(elb_account),
+                iam.ServicePrincipal("logdelivery.elasticloadbalancing.amazonaws.com"),
+            ],
+        )
+    )
+
+    alb.set_attribute("access_logs.s3.enabled", "true")
+    alb.set_attribute("access_logs.s3.bucket", bucket.bucket_name)
+    alb.set_attribute("access_logs.s3.prefix", prefix)
+
+    # ALBはアクセスログを有効にするときにバケットへの書き込みを確認する
+    if bucket.policy is not None:
+        alb.node.add_dependency(bucket.policy)
+
+
+def create_web_target_group(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    vpc: ec2.Vpc,
+    targets: list[elb.IApplicationLoadBalancerTarget],
+    load_balancing_algorithm: str = "least_outstanding_requests",
+    slow_start_seconds: int = 60,
+    deregistration_delay_seconds: int = 30,
+    health_check_path: str = WEB_LIVENESS_CHECK_PATH,
+    health_check_interval_seconds: int = 10,
+    health_check_timeout_seconds: int = 5,
+    healthy_threshold_count: int = 2,
+    unhealthy_threshold_count: int = 2,
+) -> elb.ApplicationTargetGroup:
+    """Webサーバー用のターゲットグループを作成する
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        vpc (ec2.Vpc): VPC
+        targets (list[elb.IApplicationLoadBalancerTarget]):
+            ターゲットとなるEC2インスタンスまたはAuto Scalingグループのリスト
+        load_balancing_algorithm (str): ロードバランシングのアルゴリズム
+            （round_robin、least_outstanding_requests、weighted_random）
+        slow_start_seconds (int):
+            新しいターゲットへのリクエストを徐々に増やす秒数（30〜900）。0の場合は無効
+        deregistration_delay_seconds (int): 登録解除時に処理中のリクエストの完了を待つ秒数
+        health_check_path (str): ヘルスチェックのパス
+        health_check_interval_seconds (int): ヘルスチェックの間隔（秒）
+        health_check_timeout_seconds (int): ヘルスチェックのタイムアウト（秒）
+        healthy_threshold_count (int): 正常と判定するまでの連続成功回数
+        unhealthy_threshold_count (int): 異常と判定するまでの連続失敗回数
+    Returns:
+        elb.ApplicationTargetGroup: ターゲットグループ
+    """
+    if load_balancing_algorithm not in LOAD_BALANCING_ALGORITHMS:
+        raise ValueError(
+            "load_balancing_algorithm must be one of "
+            f"{', '.join(LOAD_BALANCING_ALGORITHMS)}: {load_balancing_algorithm}"
+        )
+    if slow_start_seconds and not 30 <= slow_start_seconds <= 900:
+        raise ValueError("slow_start_seconds must be 0 or between 30 and 900")
+    # 重み付きランダムはスロースタートに対応していない
+    if slow_start_seconds and load_balancing_algorithm == "weighted_random":
+        raise ValueError("slow start is not supported with weighted_random")
+    if health_check_timeout_seconds >= health_check_interval_seconds:
+        raise ValueError(
+            "health_check_timeout_seconds must be less than "
+            "health_check_interval_seconds"
+        )
+
+    return elb.ApplicationTargetGroup(
+        scope,
+        id=f"{app_name}_{stage}_target_group",
+        target_group_name=f"{app_name}-{stage}-target-group",
+        port=80,
+        vpc=vpc,
+        protocol=elb.ApplicationProtocol.HTTP,
+        targets=targets,
+        # 処理中のリクエストが少ないターゲットに振り分け、遅いターゲットにリクエストが偏らないようにする
+        load_balancing_algorithm_type=LOAD_BALANCING_ALGORITHMS[
+            load_balancing_algorithm
+        ],
+        # 起動直後のOPcacheが空のターゲットにいきなり全量を送らない
+        slow_start=(
+            Duration.seconds(slow_start_seconds) if slow_start_seconds else None
+        ),
+        # スケールインを早めるため、デフォルト（300秒）より短くする
+        deregistration_delay=Duration.seconds(deregistration_delay_seconds),
+        # PHP-FPMが応答しない場合は異常と判定する
+        # DBなどの依存先の障害ではインスタンスを置き換えても回復しないため確認しない
+        health_check=elb.HealthCheck(
+            path=health_check_path,
+            protocol=elb.Protocol.HTTP,
+            healthy_http_codes="200",
+            interval=Duration.seconds(health_check_interval_seconds),
+            timeout=Duration.seconds(health_check_timeout_seconds),
+            healthy_threshold_count=healthy_threshold_count,
+            unhealthy_threshold_count=unhealthy_threshold_count,
+        ),
+    )
+
 
 def create_alb_instance(
     scope: Construct,
@@ -13,11 +203,12 @@ def create_alb_instance(
     stage: str,
     vpc: ec2.Vpc,
     security_group: ec2.SecurityGroup,
-    ec2_instances: list[ec2.Instance],
+    target_group: elb.ApplicationTargetGroup,
     user_pool: cognito.UserPool,
     user_pool_client: cognito.UserPoolClient,
     user_pool_domain: cognito.UserPoolDomain,
     certificate_arn: str,
+    access_log_bucket: Optional[s3.IBucket] = None,
 ) -> elb.ApplicationLoadBalancer:
     """ALBを作成する
 
@@ -27,11 +218,13 @@ def create_alb_instance(
         stage (str): ステージ名
         vpc (ec2.Vpc): VPC
         security_group (ec2.SecurityGroup): ALB用のセキュリティグループ
-        ec2_instances (List[ec2.Instance]): ターゲットとなるEC2インスタンスのリスト
+        target_group (elb.ApplicationTargetGroup): Webサーバーのターゲットグループ
         user_pool (cognito.UserPool): Cognitoユーザープール
         user_pool_client (cognito.UserPoolClient): Cognitoユーザープールクライアント
         user_pool_domain (cognito.UserPoolDomain): Cognitoユーザープールドメイン
         certificate_arn (str): 証明書のARN
+        access_log_bucket (Optional[s3.IBucket]):
+            アクセスログを保存するS3バケット。指定しない場合はアクセスログを無効にする
     Returns:
         elb.ApplicationLoadBalancer: ALB
     """
@@ -44,28 +237,13 @@ def create_alb_instance(
         internet_facing=True,
     )
 
+    if access_log_bucket is not None:
+        _enable_alb_access_logs(alb, access_log_bucket, ALB_ACCESS_LOG_PREFIX)
+
     certificate: acm.Certificate = acm.Certificate.from_certificate_arn(
         scope, f"{app_name}_{stage}_certificate", certificate_arn
     )
 
-    # ターゲットグループの作成
-    target_group: elb.ApplicationTargetGroup = elb.ApplicationTargetGroup(
-        scope,
-        id=f"{app_name}_{stage}_target_group",
-        target_group_name=f"{app_name}-{stage}-target-group",
-        port=80,
-        vpc=vpc,
-        protocol=elb.ApplicationProtocol.HTTP,
-        targets=[
-            tg.InstanceIdTarget(instance_id=ec2_instance.instance_id)
-            for ec2_instance in ec2_instances
-        ],
-        health_check=elb.HealthCheck(
-            path="/health_check.html",
-            protocol=elb.Protocol.HTTP,
-        ),
-    )
-
     listener = alb.add_listener("listener", port=443, certificates=[certificate])
     # `/member/`から始まるURLの場合、Cognito認証を適用
     listener.add_action(
@@ -0,0 +1,277 @@
+import hashlib
+import json
+from typing import Optional
+
+import jsii
+from aws_cdk import Aws
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_iam as iam
+from aws_cdk import aws_imagebuilder as imagebuilder
+from constructs import Construct
+
+from web_app.lib.ec2.ec2_utils import get_web_install_commands, get_web_instance_type
+from web_app.lib.region.region_utils import get_regional_name
+
+# ルートボリュームのボリュームタイプ
+ROOT_VOLUME_TYPE = "gp3"
+
+
+def get_content_version(content: str) -> str:
+    """内容のハッシュからImage Builderのセマンティックバージョンを作成する
+
+    Image Builderのバージョンの各数値は2^30-1までのため、
+    SHA-256の先頭60ビットを30ビットずつマイナーとパッチに割り当てる。
+
+    Args:
+        content (str): バージョンを付ける内容
+    Returns:
+        str: major.minor.patch 形式のバージョン
+    """
+    digest = int(hashlib.sha256(content.encode()).hexdigest()[:15], 16)
+    return f"1.{digest >> 30}.{digest & (2**30 - 1)}"
+
+
+@jsii.implements(ec2.IMachineImage)
+class BakedMachineImage:
+    """EC2 Image Builderで作成したAMIを参照するマシンイメージ"""
+
+    def __init__(self, image_id: str) -> None:
+        """コンストラクタ
+
+        Args:
+            image_id (str): AMIのID
+        """
+        self._image_id = image_id
+
+    def get_image(self, scope: Construct) -> ec2.MachineImageConfig:
+        """マシンイメージの設定を取得する"""
+        return ec2.MachineImageConfig(
+            image_id=self._image_id,
+            os_type=ec2.OperatingSystemType.LINUX,
+            user_data=ec2.UserData.for_linux(),
+        )
+
+
+class GoldenAmiPipeline(Construct):
+    """Webサーバーのパッケージを焼き込んだAMIをEC2 Image Builderで作成するモジュール
+
+    スケールアウト時に`dnf update`やCodeDeployAgentのダウンロードを待たずに済むよう、
+    UserDataで実行していたインストール処理を事前にAMIへ焼き込む。
+    デプロイ時にAMIを1つ作成し、以降はパイプラインを手動実行して作り直す。
+    """
+
+    _component: imagebuilder.CfnComponent
+    _image_recipe: imagebuilder.CfnImageRecipe
+    _image_pipeline: imagebuilder.CfnImagePipeline
+    _image: imagebuilder.CfnImage
+
+    def __init__(
+        self,
+        scope: Construct,
+        app_name: str,
+        stage: str,
+        vpc: ec2.Vpc,
+        parent_image: Optional[str] = None,
+        php_redis: bool = False,
+        instance_type: Optional[ec2.InstanceType] = None,
+        volume_size_gib: int = 10,
+    ) -> None:
+        """コンストラクタ
+
+        Args:
+            scope (Construct): 親のConstruct
+            app_name (str): アプリケーション名
+            stage (str): ステージ名
+            vpc (ec2.Vpc): ビルド用インスタンスを起動するVPC
+            parent_image (Optional[str]): ベースにするAWS管理のImage Builderイメージ名。
+                未指定の場合はインスタンスタイプのアーキテクチャのAmazon Linux 2023
+            php_redis (bool): PHPのredis拡張をAMIに焼き込むか
+            instance_type (Optional[ec2.InstanceType]):
+                ビルド用インスタンスのインスタンスタイプ。未指定の場合はWebサーバー用のもの
+            volume_size_gib (int): ルートボリュームのサイズ（GiB）
+        """
+        super().__init__(scope, f"{app_name}_{stage}_golden_ami_pipeline")
+
+        # AMIのアーキテクチャはWebサーバーのインスタンスタイプに合わせる
+        if instance_type is None:
+            instance_type = get_web_instance_type()
+        if parent_image is None:
+            parent_image = (
+                "amazon-linux-2023-arm64"
+                if instance_type.architecture == ec2.InstanceArchitecture.ARM_64
+                else "amazon-linux-2023-x86"
+            )
+
+        # コンポーネントとレシピは同じバージョンで内容を変更できないため、
+        # それぞれの内容のハッシュをバージョンにする
+        component_data = json.dumps(
+            {
+                "name": f"{app_name}-{stage}-web-server",
+                "schemaVersion": 1.0,
+                "phases": [
+                    {
+                        "name": "build",
+                        "steps": [
+                            {
+                                "name": "InstallWebServer",
+                                "action": "ExecuteBash",
+                                "inputs": {
+                                    "commands": get_web_install_commands(php_redis)
+                                },
+                            }
+                        ],
+                    }
+                ],
+            },
+            indent=2,
+        )
+
+        self._component = imagebuilder.CfnComponent(
+            self,
+            id=f"{app_name}_{stage}_web_component",
+            name=f"{app_name}-{stage}-web-component",
+            platform="Linux",
+            version=get_content_version(component_data),
+            data=component_data,
+        )
+
+        # レシピはコンポーネントに加えて、ベースのイメージとボリュームにも依存する
+        recipe_version = get_content_version(
+            json.dumps(
+                {
+                    "component_version": self._component.version,
+                    "parent_image": parent_image,
+                    "volume_size_gib": volume_size_gib,
+                    "volume_type": ROOT_VOLUME_TYPE,
+                },
+                sort_keys=True,
+            )
+        )
+        self._image_recipe = imagebuilder.CfnImageRecipe(
+            self,
+            id=f"{app_name}_{stage}_web_image_recipe",
+            name=f"{app_name}-{stage}-web-image-recipe",
+            version=recipe_version,
+            # x.x.xを指定するとビルド時点で最新のAmazon Linux 2023をベースにする
+            parent_image=(
+                f"arn:{Aws.PARTITION}:imagebuilder:{Aws.REGION}:aws:image/"
+                f"{parent_image}/x.x.x"
+            ),
+            components=[
+                imagebuilder.CfnImageRecipe.ComponentConfigurationProperty(
+                    component_arn=self._component.attr_arn,
+                )
+            ],
+            block_device_mappings=[
+                imagebuilder.CfnImageRecipe.InstanceBlockDeviceMappingProperty(
+                    device_name="/dev/xvda",
+                    ebs=imagebuilder.CfnImageRecipe.EbsInstanceBlockDeviceSpecificationProperty(  # noqa: E501
+                        volume_size=volume_size_gib,
+                        volume_type=ROOT_VOLUME_TYPE,
+                        delete_on_termination=True,
+                    ),
+                )
+            ],
+        )
+
+        # ビルド用インスタンスのインスタンスプロファイル
+        build_role = iam.Role(
+            self,
+            id=f"{app_name}_{stage}_image_builder_role",
+            role_name=get_regional_name(self, f"{app_name}-{stage}-image-builder-role"),
+            assumed_by=iam.ServicePrincipal("ec2.amazonaws.com"),
+            description="for image builder instance profile",
+            managed_policies=[
+                iam.ManagedPolicy.from_aws_managed_policy_name(
+                    "AmazonSSMManagedInstanceCore"
+                ),
+                iam.ManagedPolicy.from_aws_managed_policy_name(
+                    "EC2InstanceProfileForImageBuilder"
+                ),
+            ],
+        )
+        build_instance_profile = iam.CfnInstanceProfile(
+            self,
+            id=f"{app_name}_{stage}_image_builder_instance_profile",
+            instance_profile_name=get_regional_name(
+                self, f"{app_name}-{stage}-image-builder-instance-profile"
+            ),
+            roles=[build_role.role_name],
+        )
+
+        # ビルド用インスタンスはパッケージを取得するためNATゲートウェイ経由で通信する
+        build_sg = ec2.SecurityGroup(
+            self,
+            id=f"{app_name}_{stage}_image_builder_sg",
+            security_group_name=f"{app_name}-{stage}-image-builder-sg",
+            vpc=vpc,
+            allow_all_outbound=True,
+        )
+
+        infrastructure_configuration = imagebuilder.CfnInfrastructureConfiguration(
+            self,
+            id=f"{app_name}_{stage}_image_builder_infrastructure",
+            name=f"{app_name}-{stage}-image-builder-infrastructure",
+            instance_profile_name=build_instance_profile.ref,
+            instance_types=[instance_type.to_string()],
+            subnet_id=vpc.select_subnets(
+                subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+            ).subnet_ids[0],
+            security_group_ids=[build_sg.security_group_id],
+            terminate_instance_on_failure=True,
+        )
+
+        distribution_configuration = imagebuilder.CfnDistributionConfiguration(
+            self,
+            id=f"{app_name}_{stage}_image_builder_distribution",
+            name=f"{app_name}-{stage}-image-builder-distribution",
+            distributions=[
+                imagebuilder.CfnDistributionConfiguration.DistributionProperty(
+                    region=Aws.REGION,
+                    ami_distribution_configuration={
+                        "Name": f"{app_name}-{stage}-web-"
+                        + "{{imagebuilder:buildDate}}",
+                        "AmiTags": {"app_name": app_name, "stage": stage},
+                    },
+                )
+            ],
+        )
+
+        # パッケージを更新したAMIを作り直すためのパイプライン
+        self._image_pipeline = imagebuilder.CfnImagePipeline(
+            self,
+            id=f"{app_name}_{stage}_web_image_pipeline",
+            name=f"{app_name}-{stage}-web-image-pipeline",
+            image_recipe_arn=self._image_recipe.attr_arn,
+            infrastructure_configuration_arn=infrastructure_configuration.attr_arn,
+            distribution_configuration_arn=distribution_configuration.attr_arn,
+        )
+
+        # デプロイ時にAMIを作成し、Webサーバーの起動に使用する
+        self._image = imagebuilder.CfnImage(
+            self,
+            id=f"{app_name}_{stage}_web_image",
+            image_recipe_arn=self._image_recipe.attr_arn,
+            infrastructure_configuration_arn=infrastructure_configuration.attr_arn,
+            distribution_configuration_arn=distribution_configuration.attr_arn,
+        )
+
+    def get_machine_image(self) -> ec2.IMachineImage:
+        """焼き込んだAMIのマシンイメージを取得する"""
+        return BakedMachineImage(self._image.attr_image_id)
+
+    def get_component(self) -> imagebuilder.CfnComponent:
+        """Webサーバーをインストールするコンポーネントを取得する"""
+        return self._component
+
+    def get_image_recipe(self) -> imagebuilder.CfnImageRecipe:
+        """イメージレシピを取得する"""
+        return self._image_recipe
+
+    def get_image_pipeline(self) -> imagebuilder.CfnImagePipeline:
+        """イメージパイプラインを取得する"""
+        return self._image_pipeline
+
+    def get_image(self) -> imagebuilder.CfnImage:
+        """デプロイ時に作成するイメージを取得する"""
+        return self._image
@@ -0,0 +1,423 @@
+from typing import Optional, Union
+
+from aws_cdk import Duration
+from aws_cdk import aws_apigateway as apigw
+from aws_cdk import aws_apigatewayv2 as apigwv2
+from aws_cdk import aws_autoscaling as autoscaling
+from aws_cdk import aws_cloudwatch as cloudwatch
+from aws_cdk import aws_cloudwatch_actions as cloudwatch_actions
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_elasticloadbalancingv2 as elb
+from aws_cdk import aws_lambda as _lambda
+from aws_cdk import aws_rds as rds
+from aws_cdk import aws_sns as sns
+from aws_cdk import aws_sns_subscriptions as subscriptions
+from constructs import Construct
+
+from web_app.lib.region.region_utils import get_regional_name
+from web_app.lib.sqs.async_job_queue import AsyncJobQueue
+
+# アラームの閾値のデフォルト値。ステージごとにコンテキストで上書きする
+DEFAULT_ALARM_THRESHOLDS = {
+    # ALBのターゲットのレスポンスタイムのp99（秒）
+    "target_response_time_p99_seconds": 1.0,
+    # ターゲットが返した5xxの件数（1分間）
+    "target_5xx_count": 10,
+    # ALB自身が返した5xxの件数（1分間）
+    "elb_5xx_count": 10,
+    # 正常なターゲットの最小数
+    "healthy_host_count_min": 1,
+    # RDSのCPU使用率（%）
+    "db_cpu_percent": 80,
+    # RDSの接続数
+    "db_connections": 80,
+    # RDSの読み取りレイテンシー（秒）
+    "db_read_latency_seconds": 0.02,
+    # RDSの書き込みレイテンシー（秒）
+    "db_write_latency_seconds": 0.05,
+    # Lambda関数の実行時間のp99（ミリ秒）
+    "lambda_duration_p99_ms": 1000,
+    # Lambda関数のスロットリングの件数（1分間）
+    "lambda_throttles": 1,
+    # API Gatewayの5xxの件数（1分間）
+    "api_5xx_count": 10,
+}
+
+# ジョブのキューを監視する場合に追加するアラームの閾値のデフォルト値
+DEFAULT_JOB_ALARM_THRESHOLDS = {
+    # ジョブのキューの最も古いメッセージの経過時間（秒）
+    "job_queue_age_seconds": 300,
+    # デッドレターキューのメッセージ数
+    "job_dlq_messages": 1,
+}
+
+# Webサーバーのデプロイで悪化を検知するアラーム。CodeDeployのロールバックに使う
+WEB_ALARM_NAMES = (
+    "target_response_time_p99",
+    "target_5xx",
+    "elb_5xx",
+    "healthy_host_count",
+)
+
+
+class WebAppMonitoring(Construct):
+    """ALB、EC2、RDS、Lambda、API GatewayのダッシュボードとアラームをCloudWatchに構築するモジュール"""
+
+    _dashboard: cloudwatch.Dashboard
+    _alarm_topic: sns.Topic
+    _alarms: list[cloudwatch.Alarm]
+    _web_alarms: list[cloudwatch.Alarm]
+
+    def __init__(
+        self,
+        scope: Construct,
+        app_name: str,
+        stage: str,
+        alb: elb.ApplicationLoadBalancer,
+        target_group: elb.ApplicationTargetGroup,
+        database: Union[rds.DatabaseInstance, rds.DatabaseCluster],
+        handler: _lambda.IFunction,
+        api: Union[apigw.RestApi, apigwv2.HttpApi],
+        auto_scaling_group: Optional[autoscaling.AutoScalingGroup] = None,
+        ec2_instances: Optional[list[ec2.Instance]] = None,
+        job_queue: Optional[AsyncJobQueue] = None,
+        alarm_thresholds: Optional[dict[str, float]] = None,
+        alarm_email: Optional[str] = None,
+    ) -> None:
+        """コンストラクタ
+
+        Args:
+            scope (Construct): 親のConstruct
+            app_name (str): アプリケーション名
+            stage (str): ステージ名
+            alb (elb.ApplicationLoadBalancer): ALB
+            target_group (elb.ApplicationTargetGroup): Webサーバーのターゲットグループ
+            database (Union[rds.DatabaseInstance, rds.DatabaseCluster]):
+                RDSインスタンスまたはAuroraクラスター
+            handler (_lambda.IFunction): API GatewayのバックエンドのLambda関数
+            api (Union[apigw.RestApi, apigwv2.HttpApi]): API Gateway
+            auto_scaling_group (Optional[autoscaling.AutoScalingGroup]):
+                WebサーバーのAuto Scalingグループ
+            ec2_instances (Optional[list[ec2.Instance]]): WebサーバーのEC2インスタンスのリスト
+            job_queue (Optional[AsyncJobQueue]): ジョブのキューとワーカー
+            alarm_thresholds (Optional[dict[str, float]]):
+                アラームの閾値。DEFAULT_ALARM_THRESHOLDSとDEFAULT_JOB_ALARM_THRESHOLDSの
+                キーを上書きする
+            alarm_email (Optional[str]): アラームの通知先のメールアドレス
+        """
+        super().__init__(scope, f"{app_name}_{stage}_web_app_monitoring")
+
+        unknown_keys = (
+            set(alarm_thresholds or {})
+            - set(DEFAULT_ALARM_THRESHOLDS)
+            - set(DEFAULT_JOB_ALARM_THRESHOLDS)
+        )
+        if unknown_keys:
+            raise ValueError(
+                f"unknown alarm thresholds: {', '.join(sorted(unknown_keys))}"
+            )
+        thresholds = {
+            **DEFAULT_ALARM_THRESHOLDS,
+            **DEFAULT_JOB_ALARM_THRESHOLDS,
+            **(alarm_thresholds or {}),
+        }
+
+        period = Duration.minutes(1)
+
+        # ALB
+        alb_metrics = alb.metrics
+        response_time_metrics = [
+            alb_metrics.target_response_time(
+                statistic=statistic, period=period, label=statistic
+            )
+            for statistic in ("p50", "p90", "p99")
+        ]
+        request_count_metric = alb_metrics.request_count(statistic="Sum", period=period)
+        target_5xx_metric = alb_metrics.http_code_target(
+            code=elb.HttpCodeTarget.TARGET_5XX_COUNT, statistic="Sum", period=period
+        )
+        elb_5xx_metric = alb_metrics.http_code_elb(
+            code=elb.HttpCodeElb.ELB_5XX_COUNT, statistic="Sum", period=period
+        )
+        healthy_host_metric = target_group.metrics.healthy_host_count(
+            statistic="Minimum", period=period
+        )
+        unhealthy_host_metric = target_group.metrics.unhealthy_host_count(
+            statistic="Maximum", period=period
+        )
+
+        # EC2
+        ec2_cpu_metrics: list[cloudwatch.IMetric] = []
+        if auto_scaling_group is not None:
+            ec2_cpu_metrics.append(
+                cloudwatch.Metric(
+                    namespace="AWS/EC2",
+                    metric_name="CPUUtilization",
+                    dimensions_map={
+                        "AutoScalingGroupName": (
+                            auto_scaling_group.auto_scaling_group_name
+                        )
+                    },
+                    statistic="Average",
+                    period=period,
+                    label="ASG average",
+                )
+            )
+        for ec2_instance in ec2_instances or []:
+            ec2_cpu_metrics.append(
+                cloudwatch.Metric(
+                    namespace="AWS/EC2",
+                    metric_name="CPUUtilization",
+                    dimensions_map={"InstanceId": ec2_instance.instance_id},
+                    statistic="Average",
+                    period=period,
+                )
+            )
+
+        # RDS
+        db_cpu_metric = database.metric_cpu_utilization(period=period)
+        db_connections_metric = database.metric_database_connections(
+            statistic="Maximum", period=period
+        )
+        db_read_latency_metric = database.metric(
+            "ReadLatency", statistic="Average", period=period
+        )
+        db_write_latency_metric = database.metric(
+            "WriteLatency", statistic="Average", period=period
+        )
+
+        # Lambda
+        lambda_duration_metrics = [
+            handler.metric_duration(statistic=statistic, period=period, label=statistic)
+            for statistic in ("p50", "p99")
+        ]
+        lambda_throttles_metric = handler.metric_throttles(
+            statistic="Sum", period=period
+        )
+        lambda_errors_metric = handler.metric_errors(statistic="Sum", period=period)
+
+        # API Gateway
+        api_latency_metrics = [
+            api.metric_latency(statistic=statistic, period=period, label=statistic)
+            for statistic in ("p50", "p99")
+        ]
+        api_count_metric = api.metric_count(statistic="Sum", period=period)
+        api_5xx_metric = api.metric_server_error(statistic="Sum", period=period)
+
+        # ジョブのキュー
+        job_widgets: list[cloudwatch.IWidget] = []
+        job_alarm_definitions = []
+        if job_queue is not None:
+            queue = job_queue.get_queue()
+            dead_letter_queue = job_queue.get_dead_letter_queue()
+            job_queue_age_metric = queue.metric_approximate_age_of_oldest_message(
+                statistic="Maximum", period=period
+            )
+            job_queue_visible_metric = (
+                queue.metric_approximate_number_of_messages_visible(
+                    statistic="Maximum", period=period
+                )
+            )
+            job_dlq_visible_metric = (
+                dead_letter_queue.metric_approximate_number_of_messages_visible(
+                    statistic="Maximum", period=period
+                )
+            )
+            job_worker = job_queue.get_worker()
+            job_widgets = [
+                cloudwatch.GraphWidget(
+                    title="Job Queue Age / Messages",
+                    left=[job_queue_age_metric],
+                    right=[job_queue_visible_metric, job_dlq_visible_metric],
+                    width=12,
+                ),
+                cloudwatch.GraphWidget(
+                    title="Job Worker Duration / Errors",
+                    left=[
+                        job_worker.metric_duration(
+                            statistic=statistic, period=period, label=statistic
+                        )
+                        for statistic in ("p50", "p99")
+                    ],
+                    right=[
+                        job_worker.metric_errors(statistic="Sum", period=period),
+                        job_worker.metric_throttles(statistic="Sum", period=period),
+                    ],
+                    width=12,
+                ),
+            ]
+            job_alarm_definitions = [
+                (
+                    "job_queue_age",
+                    job_queue_age_metric,
+                    thresholds["job_queue_age_seconds"],
+                ),
+                (
+                    "job_dlq_messages",
+                    job_dlq_visible_metric,
+                    thresholds["job_dlq_messages"],
+                ),
+            ]
+
+        self._dashboard = cloudwatch.Dashboard(
+            self,
+            id=f"{app_name}_{stage}_dashboard",
+            dashboard_name=get_regional_name(self, f"{app_name}-{stage}-performance"),
+            widgets=[
+                [
+                    cloudwatch.GraphWidget(
+                        title="ALB TargetResponseTime",
+                        left=response_time_metrics,
+                        width=12,
+                    ),
+                    cloudwatch.GraphWidget(
+                        title="ALB Requests / 5xx",
+                        left=[request_count_metric],
+                        right=[target_5xx_metric, elb_5xx_metric],
+                        width=12,
+                    ),
+                ],
+                [
+                    cloudwatch.GraphWidget(
+                        title="Target Group Hosts",
+                        left=[healthy_host_metric, unhealthy_host_metric],
+                        width=12,
+                    ),
+                    cloudwatch.GraphWidget(
+                        title="EC2 CPUUtilization",
+                        left=ec2_cpu_metrics,
+                        width=12,
+                    ),
+                ],
+                [
+                    cloudwatch.GraphWidget(
+                        title="RDS CPU / Connections",
+                        left=[db_cpu_metric],
+                        right=[db_connections_metric],
+                        width=12,
+                    ),
+                    cloudwatch.GraphWidget(
+                        title="RDS Read / Write Latency",
+                        left=[db_read_latency_metric, db_write_latency_metric],
+                        width=12,
+                    ),
+                ],
+                [
+                    cloudwatch.GraphWidget(
+                        title="Lambda Duration / Throttles",
+                        left=lambda_duration_metrics,
+                        right=[lambda_throttles_metric, lambda_errors_metric],
+                        width=12,
+                    ),
+                    cloudwatch.GraphWidget(
+                        title="API Gateway Latency / 5xx",
+                        left=api_latency_metrics,
+                        right=[api_count_metric, api_5xx_metric],
+                        width=12,
+                    ),
+                ],
+                *([job_widgets] if job_widgets else []),
+            ],
+        )
+
+        # アラーム
+        self._alarm_topic = sns.Topic(
+            self,
+            id=f"{app_name}_{stage}_alarm_topic",
+            topic_name=f"{app_name}-{stage}-alarm-topic",
+        )
+        if alarm_email:
+            self._alarm_topic.add_subscription(
+                subscriptions.EmailSubscription(alarm_email)
+            )
+
+        greater = cloudwatch.ComparisonOperator.GREATER_THAN_OR_EQUAL_TO_THRESHOLD
+        less = cloudwatch.ComparisonOperator.LESS_THAN_THRESHOLD
+        alarm_definitions = [
+            (
+                "target_response_time_p99",
+                response_time_metrics[2],
+                thresholds["target_response_time_p99_seconds"],
+                greater,
+            ),
+            ("target_5xx", target_5xx_metric, thresholds["target_5xx_count"], greater),
+            ("elb_5xx", elb_5xx_metric, thresholds["elb_5xx_count"], greater),
+            (
+                "healthy_host_count",
+                healthy_host_metric,
+                thresholds["healthy_host_count_min"],
+                less,
+            ),
+            ("db_cpu", db_cpu_metric, thresholds["db_cpu_percent"], greater),
+            (
+                "db_connections",
+                db_connections_metric,
+                thresholds["db_connections"],
+                greater,
+            ),
+            (
+                "db_read_latency",
+                db_read_latency_metric,
+                thresholds["db_read_latency_seconds"],
+                greater,
+            ),
+            (
+                "db_write_latency",
+                db_write_latency_metric,
+                thresholds["db_write_latency_seconds"],
+                greater,
+            ),
+            (
+                "lambda_duration_p99",
+                lambda_duration_metrics[1],
+                thresholds["lambda_duration_p99_ms"],
+                greater,
+            ),
+            (
+                "lambda_throttles",
+                lambda_throttles_metric,
+                thresholds["lambda_throttles"],
+                greater,
+            ),
+            ("api_5xx", api_5xx_metric, thresholds["api_5xx_count"], greater),
+            *(
+                (name, metric, threshold, greater)
+                for name, metric, threshold in job_alarm_definitions
+            ),
+        ]
+
+        # 一時的なスパイクで通知しないよう、5分間のうち3分間閾値を超えたらアラームにする
+        self._alarms = []
+        self._web_alarms = []
+        for name, metric, threshold, comparison_operator in alarm_definitions:
+            alarm = cloudwatch.Alarm(
+                self,
+                id=f"{app_name}_{stage}_{name}_alarm",
+                alarm_name=f"{app_name}-{stage}-{name.replace('_', '-')}",
+                metric=metric,
+                threshold=threshold,
+                comparison_operator=comparison_operator,
+                evaluation_periods=5,
+                datapoints_to_alarm=3,
+                treat_missing_data=cloudwatch.TreatMissingData.NOT_BREACHING,
+            )
+            alarm.add_alarm_action(cloudwatch_actions.SnsAction(self._alarm_topic))
+            self._alarms.append(alarm)
+            if name in WEB_ALARM_NAMES:
+                self._web_alarms.append(alarm)
+
+    def get_dashboard(self) -> cloudwatch.Dashboard:
+        """ダッシュボードを取得する"""
+        return self._dashboard
+
+    def get_alarm_topic(self) -> sns.Topic:
+        """アラームの通知先のトピックを取得する"""
+        return self._alarm_topic
+
+    def get_alarms(self) -> list[cloudwatch.Alarm]:
+        """アラームのリストを取得する"""
+        return self._alarms
+
+    def get_web_alarms(self) -> list[cloudwatch.Alarm]:
+        """ALBとWebサーバーのアラームのリストを取得する"""
+        return self._web_alarms
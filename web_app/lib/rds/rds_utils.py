@@ -1,7 +1,117 @@
+from typing import Optional, Sequence
+
+from aws_cdk import Duration
 from aws_cdk import aws_ec2 as ec2
 from aws_cdk import aws_rds as rds
+from aws_cdk import aws_secretsmanager as secretsmanager
 from constructs import Construct
 
+from web_app.lib.ec2.instance_types import get_instance_spec
+
+# データベースのモード
+# single: RDSインスタンス1台
+# replicas: RDSインスタンスとリードレプリカ
+# aurora: Aurora PostgreSQL Serverless v2（ライターとリーダー）
+DB_MODES = ("single", "replicas", "aurora")
+
+POSTGRES_ENGINE_VERSION = rds.PostgresEngineVersion.VER_17_2
+# max_connectionsの範囲
+POSTGRES_MAX_CONNECTIONS_RANGE = (100, 5000)
+
+
+def get_db_instance_type(instance_type: str = "t4g.micro") -> ec2.InstanceType:
+    """RDS用のインスタンスタイプを取得する
+
+    Args:
+        instance_type (str): `db.` を除いたインスタンスクラス（`t4g.micro` 形式）
+    Returns:
+        ec2.InstanceType: インスタンスタイプ
+    """
+    return ec2.InstanceType(instance_type.removeprefix("db."))
+
+
+def get_postgres_parameters(instance_type: ec2.InstanceType) -> dict[str, str]:
+    """インスタンスクラスのメモリサイズからPostgreSQLのパラメータを算出する
+
+    * shared_buffers: メモリの25%（8KB単位）
+    * effective_cache_size: メモリの75%（8KB単位）
+    * max_connections: メモリ16MiBあたり1接続（100〜5000）
+    * work_mem: shared_buffers以外のメモリを、全接続が2つずつソートやハッシュを使っても
+      収まるように割り当てる（KB単位、1MB以上）
+
+    Args:
+        instance_type (ec2.InstanceType): インスタンスタイプ
+    Returns:
+        dict[str, str]: パラメータ
+    """
+    memory_kib = get_instance_spec(instance_type).memory_mib * 1024
+    shared_buffers_kib = memory_kib // 4
+    max_connections = min(
+        max(memory_kib // 1024 // 16, POSTGRES_MAX_CONNECTIONS_RANGE[0]),
+        POSTGRES_MAX_CONNECTIONS_RANGE[1],
+    )
+    work_mem_kib = max((memory_kib - shared_buffers_kib) // (max_connections * 2), 1024)
+    return {
+        "shared_buffers": str(shared_buffers_kib // 8),
+        "effective_cache_size": str(memory_kib * 3 // 4 // 8),
+        "max_connections": str(max_connections),
+        "work_mem": str(work_mem_kib),
+        # クエリごとの実行回数や実行時間を集計する
+        "shared_preload_libraries": "pg_stat_statements",
+        "pg_stat_statements.track": "top",
+        "pg_stat_statements.max": "10000",
+        "track_io_timing": "1",
+    }
+
+
+def create_db_parameter_group(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    instance_type: ec2.InstanceType,
+) -> rds.ParameterGroup:
+    """インスタンスクラスに合わせたPostgreSQLのパラメータグループを作成する
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        instance_type (ec2.InstanceType): インスタンスタイプ
+    Returns:
+        rds.ParameterGroup: パラメータグループ
+    """
+    return rds.ParameterGroup(
+        scope,
+        id=f"{app_name}_{stage}_db_parameter_group",
+        engine=rds.DatabaseInstanceEngine.postgres(version=POSTGRES_ENGINE_VERSION),
+        description=(
+            f"{app_name}-{stage} PostgreSQL tuned for {instance_type.to_string()}"
+        ),
+        parameters=get_postgres_parameters(instance_type),
+    )
+
+
+def _get_performance_options(
+    performance_tuning: bool,
+    parameter_group: Optional[rds.IParameterGroup],
+    storage_iops: Optional[int],
+    storage_throughput_mibps: Optional[int],
+    monitoring_interval_seconds: int,
+) -> dict:
+    """RDSインスタンスとリードレプリカで共通の性能に関わるプロパティ"""
+    if not performance_tuning:
+        return {}
+    return {
+        "parameter_group": parameter_group,
+        "storage_type": rds.StorageType.GP3,
+        "iops": storage_iops,
+        "storage_throughput": storage_throughput_mibps,
+        # 7日間の保持期間は無料で使える
+        "enable_performance_insights": True,
+        "performance_insight_retention": rds.PerformanceInsightRetention.DEFAULT,
+        "monitoring_interval": Duration.seconds(monitoring_interval_seconds),
+    }
+
 
 def create_rds_instance(
     scope: Construct,
@@ -9,6 +119,15 @@ def create_rds_instance(
     stage: str,
     vpc: ec2.Vpc,
     security_group: ec2.SecurityGroup,
+    instance_type: Optional[ec2.InstanceType] = None,
+    allocated_storage_gib: int = 100,
+    max_allocated_storage_gib: Optional[int] = None,
+    performance_tuning: bool = False,
+    storage_iops: Optional[int] = None,
+    storage_throughput_mibps: Optional[int] = None,
+    monitoring_interval_seconds: int = 60,
+    multi_az: bool = False,
+    parameter_group: Optional[rds.IParameterGroup] = None,
 ) -> rds.DatabaseInstance:
     """RDSインスタンスを作成する
 
@@ -18,9 +137,25 @@ def create_rds_instance(
         stage (str): ステージ名
         vpc (ec2.Vpc): VPC
         security_group (ec2.SecurityGroup): RDS用のセキュリティグループ
+        instance_type (Optional[ec2.InstanceType]):
+            インスタンスタイプ。未指定の場合はRDS用のもの
+        allocated_storage_gib (int): ストレージのサイズ（GiB）
+        max_allocated_storage_gib (Optional[int]):
+            ストレージの自動スケーリングの上限（GiB）。未指定の場合は自動スケーリングしない
+        performance_tuning (bool): インスタンスクラスに合わせたパラメータグループ、gp3、
+            Performance Insights、拡張モニタリングを設定するか
+        storage_iops (Optional[int]): gp3のIOPS。未指定の場合はベースライン
+        storage_throughput_mibps (Optional[int]):
+            gp3のスループット（MiB/s）。未指定の場合はベースライン
+        monitoring_interval_seconds (int): 拡張モニタリングの間隔（秒）
+        multi_az (bool): マルチAZ配置にするか
+        parameter_group (Optional[rds.IParameterGroup]): パラメータグループ。
+            未指定でperformance_tuningの場合はインスタンスクラスに合わせて作成する
     Returns:
         rds.DatabaseInstance: RDSインスタンス
     """
+    if instance_type is None:
+        instance_type = get_db_instance_type()
 
     db_subnet_group = rds.SubnetGroup(
         scope,
@@ -31,19 +166,336 @@ def create_rds_instance(
         vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_ISOLATED),
     )
 
+    if performance_tuning and parameter_group is None:
+        parameter_group = create_db_parameter_group(
+            scope, app_name, stage, instance_type
+        )
+
     return rds.DatabaseInstance(
         scope,
         id=f"{app_name}_{stage}_rds",
         database_name=f"{app_name}_{stage}_rds",
         instance_identifier=f"{app_name}-{stage}-rds",
-        engine=rds.DatabaseInstanceEngine.postgres(
-            version=rds.PostgresEngineVersion.VER_17_2
+        engine=rds.DatabaseInstanceEngine.postgres(version=POSTGRES_ENGINE_VERSION),
+        instance_type=instance_type,
+        allocated_storage=allocated_storage_gib,
+        max_allocated_storage=max_allocated_storage_gib,
+        multi_az=multi_az,
+        vpc=vpc,
+        security_groups=[security_group],
+        subnet_group=db_subnet_group,
+        **_get_performance_options(
+            performance_tuning,
+            parameter_group,
+            storage_iops,
+            storage_throughput_mibps,
+            monitoring_interval_seconds,
         ),
-        instance_type=ec2.InstanceType.of(
-            instance_class=ec2.InstanceClass.BURSTABLE4_GRAVITON,
-            instance_size=ec2.InstanceSize.MICRO,
+    )
+
+
+def create_rds_read_replicas(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    vpc: ec2.Vpc,
+    security_group: ec2.SecurityGroup,
+    source_instance: rds.DatabaseInstance,
+    count: int,
+    instance_type: Optional[ec2.InstanceType] = None,
+    parameter_group: Optional[rds.IParameterGroup] = None,
+    performance_tuning: bool = False,
+    storage_iops: Optional[int] = None,
+    storage_throughput_mibps: Optional[int] = None,
+    monitoring_interval_seconds: int = 60,
+) -> list[rds.DatabaseInstanceReadReplica]:
+    """RDSインスタンスのリードレプリカを作成する
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        vpc (ec2.Vpc): VPC
+        security_group (ec2.SecurityGroup): RDS用のセキュリティグループ
+        source_instance (rds.DatabaseInstance): レプリケーション元のRDSインスタンス
+        count (int): リードレプリカの台数
+        instance_type (Optional[ec2.InstanceType]):
+            インスタンスタイプ。未指定の場合はRDS用のもの
+        parameter_group (Optional[rds.IParameterGroup]):
+            パラメータグループ。レプリケーション元と同じものを指定する
+        performance_tuning (bool): gp3、Performance Insights、拡張モニタリングを設定するか
+        storage_iops (Optional[int]): gp3のIOPS。未指定の場合はベースライン
+        storage_throughput_mibps (Optional[int]):
+            gp3のスループット（MiB/s）。未指定の場合はベースライン
+        monitoring_interval_seconds (int): 拡張モニタリングの間隔（秒）
+    Returns:
+        list[rds.DatabaseInstanceReadReplica]: リードレプリカのリスト
+    """
+    if count < 1:
+        raise ValueError("read replica count must be at least 1")
+
+    return [
+        rds.DatabaseInstanceReadReplica(
+            scope,
+            id=f"{app_name}_{stage}_rds_replica_{i}",
+            instance_identifier=f"{app_name}-{stage}-rds-replica-{i}",
+            source_database_instance=source_instance,
+            instance_type=instance_type or get_db_instance_type(),
+            vpc=vpc,
+            vpc_subnets=ec2.SubnetSelection(
+                subnet_type=ec2.SubnetType.PRIVATE_ISOLATED
+            ),
+            security_groups=[security_group],
+            **_get_performance_options(
+                performance_tuning,
+                parameter_group,
+                storage_iops,
+                storage_throughput_mibps,
+                monitoring_interval_seconds,
+            ),
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+def create_aurora_serverless_cluster(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    vpc: ec2.Vpc,
+    security_group: ec2.SecurityGroup,
+    min_capacity: float = 0.5,
+    max_capacity: float = 4,
+    reader_count: int = 1,
+    performance_tuning: bool = False,
+    monitoring_interval_seconds: int = 60,
+    secret_replica_regions: Sequence[str] = (),
+    global_cluster_identifier: Optional[str] = None,
+) -> rds.DatabaseCluster:
+    """Aurora PostgreSQL Serverless v2のクラスターを作成する
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        vpc (ec2.Vpc): VPC
+        security_group (ec2.SecurityGroup): RDS用のセキュリティグループ
+        min_capacity (float): 最小ACU
+        max_capacity (float): 最大ACU
+        reader_count (int): リーダーインスタンスの台数
+        performance_tuning (bool): Performance Insightsと拡張モニタリングを設定するか。
+            Serverless v2はメモリサイズが変わるため、パラメータはAuroraの既定値のままにする
+        monitoring_interval_seconds (int): 拡張モニタリングの間隔（秒）
+        secret_replica_regions (Sequence[str]): 認証情報のシークレットを複製するリージョン。
+            Aurora Global Databaseのプライマリの場合に、セカンダリのリージョンを指定する
+        global_cluster_identifier (Optional[str]):
+            セカンダリとして参加するAurora Global Databaseの識別子。
+            認証情報とデータベースはプライマリから引き継ぎ、書き込みはプライマリに転送する
+    Returns:
+        rds.DatabaseCluster: Auroraクラスター
+    """
+    if secret_replica_regions and global_cluster_identifier is not None:
+        raise ValueError(
+            "secret_replica_regions cannot be used with global_cluster_identifier"
+        )
+    if not 0.5 <= min_capacity <= max_capacity <= 256:
+        raise ValueError(
+            "ACU range must satisfy 0.5 <= min_capacity <= max_capacity <= 256"
+        )
+    if reader_count < 0:
+        raise ValueError("reader_count must not be negative")
+
+    credentials: Optional[rds.Credentials] = None
+    if secret_replica_regions:
+        # セカンダリのリージョンのWebサーバーは複製したシークレットを名前で参照する
+        credentials = rds.Credentials.from_generated_secret(
+            "postgres",
+            secret_name=get_aurora_secret_name(app_name, stage),
+            replica_regions=[
+                secretsmanager.ReplicaRegion(region=region)
+                for region in secret_replica_regions
+            ],
+        )
+
+    cluster = rds.DatabaseCluster(
+        scope,
+        id=f"{app_name}_{stage}_aurora",
+        cluster_identifier=f"{app_name}-{stage}-aurora",
+        default_database_name=f"{app_name}_{stage}_rds",
+        credentials=credentials,
+        engine=rds.DatabaseClusterEngine.aurora_postgres(
+            version=rds.AuroraPostgresEngineVersion.VER_16_6
         ),
+        writer=rds.ClusterInstance.serverless_v2("writer"),
+        # リーダーはライターと同じ容量でスケールさせ、フェイルオーバー先にもする
+        readers=[
+            rds.ClusterInstance.serverless_v2(f"reader{i}", scale_with_writer=True)
+            for i in range(1, reader_count + 1)
+        ],
+        serverless_v2_min_capacity=min_capacity,
+        serverless_v2_max_capacity=max_capacity,
         vpc=vpc,
+        vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_ISOLATED),
         security_groups=[security_group],
-        subnet_group=db_subnet_group,
+        enable_performance_insights=performance_tuning or None,
+        performance_insight_retention=(
+            rds.PerformanceInsightRetention.DEFAULT if performance_tuning else None
+        ),
+        monitoring_interval=(
+            Duration.seconds(monitoring_interval_seconds)
+            if performance_tuning
+            else None
+        ),
+    )
+
+    if global_cluster_identifier is not None:
+        # セカンダリのクラスターには認証情報とデータベース名を指定できない
+        cfn_cluster: rds.CfnDBCluster = cluster.node.default_child
+        cfn_cluster.global_cluster_identifier = global_cluster_identifier
+        cfn_cluster.enable_global_write_forwarding = True
+        cfn_cluster.add_property_deletion_override("MasterUsername")
+        cfn_cluster.add_property_deletion_override("MasterUserPassword")
+        cfn_cluster.add_property_deletion_override("DatabaseName")
+    return cluster
+
+
+def get_aurora_global_cluster_identifier(app_name: str, stage: str) -> str:
+    """Aurora Global Databaseの識別子を取得する
+
+    Args:
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+    Returns:
+        str: グローバルクラスターの識別子
+    """
+    return f"{app_name}-{stage}-global"
+
+
+def get_aurora_secret_name(app_name: str, stage: str) -> str:
+    """Aurora Global Databaseの認証情報のシークレット名を取得する
+
+    Args:
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+    Returns:
+        str: シークレット名
+    """
+    return f"{app_name}-{stage}-aurora-credentials"
+
+
+def create_aurora_global_cluster(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    source_cluster: rds.DatabaseCluster,
+) -> rds.CfnGlobalCluster:
+    """Auroraクラスターをプライマリとして、Aurora Global Databaseを作成する
+
+    セカンダリのリージョンのクラスターはストレージのレプリケーションで読み取りを
+    ローカルに処理し、書き込みはプライマリに転送する
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        source_cluster (rds.DatabaseCluster): プライマリのAuroraクラスター
+    Returns:
+        rds.CfnGlobalCluster: グローバルクラスター
+    """
+    return rds.CfnGlobalCluster(
+        scope,
+        id=f"{app_name}_{stage}_aurora_global",
+        global_cluster_identifier=get_aurora_global_cluster_identifier(app_name, stage),
+        source_db_cluster_identifier=source_cluster.cluster_identifier,
+    )
+
+
+def create_rds_proxy(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    vpc: ec2.Vpc,
+    security_group: ec2.SecurityGroup,
+    proxy_target: rds.ProxyTarget,
+    secret: secretsmanager.ISecret,
+    borrow_timeout_seconds: int = 30,
+    max_connections_percent: int = 90,
+    max_idle_connections_percent: int = 50,
+) -> rds.DatabaseProxy:
+    """RDS Proxyを作成する
+
+    Webサーバーからの接続をプールし、RDSのmax_connectionsの枯渇と接続確立のコストを抑える。
+    RDSの認証情報はSecrets Managerのシークレットから取得するため、
+    Secrets Managerに到達できるNATゲートウェイに接続したプライベートサブネットに配置する。
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        vpc (ec2.Vpc): VPC
+        security_group (ec2.SecurityGroup): RDS Proxy用のセキュリティグループ
+        proxy_target (rds.ProxyTarget): 接続先のRDSインスタンスまたはAuroraクラスター
+        secret (secretsmanager.ISecret): 接続先の認証情報のシークレット
+        borrow_timeout_seconds (int): プールから接続を取得できるまで待つ秒数
+        max_connections_percent (int): RDSのmax_connectionsに対してプールできる接続数の割合（%）
+        max_idle_connections_percent (int):
+            RDSのmax_connectionsに対してアイドル状態で保持する接続数の割合（%）
+    Returns:
+        rds.DatabaseProxy: RDS Proxy
+    """
+    if not 1 <= max_connections_percent <= 100:
+        raise ValueError("max_connections_percent must be between 1 and 100")
+    if not 0 <= max_idle_connections_percent <= max_connections_percent:
+        raise ValueError(
+            "max_idle_connections_percent must be between 0 and max_connections_percent"
+        )
+
+    return rds.DatabaseProxy(
+        scope,
+        id=f"{app_name}_{stage}_rds_proxy",
+        db_proxy_name=f"{app_name}-{stage}-rds-proxy",
+        proxy_target=proxy_target,
+        secrets=[secret],
+        vpc=vpc,
+        vpc_subnets=ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+        security_groups=[security_group],
+        borrow_timeout=Duration.seconds(borrow_timeout_seconds),
+        max_connections_percent=max_connections_percent,
+        max_idle_connections_percent=max_idle_connections_percent,
+        require_tls=True,
+    )
+
+
+def create_rds_proxy_reader_endpoint(
+    scope: Construct,
+    app_name: str,
+    stage: str,
+    vpc: ec2.Vpc,
+    security_group: ec2.SecurityGroup,
+    db_proxy: rds.DatabaseProxy,
+) -> rds.CfnDBProxyEndpoint:
+    """RDS Proxyの読み取り専用エンドポイントを作成する
+
+    Auroraクラスターのリーダーに接続するエンドポイント。
+
+    Args:
+        scope (Construct): 親のConstruct
+        app_name (str): アプリケーション名
+        stage (str): ステージ名
+        vpc (ec2.Vpc): VPC
+        security_group (ec2.SecurityGroup): RDS Proxy用のセキュリティグループ
+        db_proxy (rds.DatabaseProxy): RDS Proxy
+    Returns:
+        rds.CfnDBProxyEndpoint: 読み取り専用エンドポイント
+    """
+    return rds.CfnDBProxyEndpoint(
+        scope,
+        id=f"{app_name}_{stage}_rds_proxy_reader_endpoint",
+        db_proxy_endpoint_name=f"{app_name}-{stage}-rds-proxy-reader",
+        db_proxy_name=db_proxy.db_proxy_name,
+        vpc_subnet_ids=vpc.select_subnets(
+            subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+        ).subnet_ids,
+        vpc_security_group_ids=[security_group.security_group_id],
+        target_role="READ_ONLY",
     )
@@ -0,0 +1,61 @@
+from typing import Optional
+
+from aws_cdk import Stack, Token
+from constructs import Construct, Node
+
+from web_app.lib.context.context_utils import get_context_list
+
+# グローバルスタックのルーティング
+# latency: Route 53のレイテンシーベースのレコードで最も近いリージョンのALBに振り分ける
+# accelerator: Global AcceleratorのエニーキャストIPで最も近いリージョンのALBに振り分ける
+GLOBAL_ROUTING_MODES = ("latency", "accelerator")
+
+# Global Acceleratorのリソースはこのリージョンのスタックで作成する必要がある
+GLOBAL_ACCELERATOR_REGION = "us-west-2"
+
+
+def get_regions(node: Node) -> list[str]:
+    """コンテキスト `regions` からスタックを作成するリージョンのリストを取得する
+
+    先頭のリージョンをプライマリとする
+
+    Args:
+        node (Node): コンテキストを参照するConstructのノード
+    Returns:
+        list[str]: リージョンのリスト。未指定の場合は空のリスト
+    """
+    regions = get_context_list(node, "regions")
+    if len(set(regions)) != len(regions):
+        raise ValueError(f"regions must not contain duplicates: {regions}")
+    return regions
+
+
+def get_primary_region(node: Node) -> Optional[str]:
+    """複数のリージョンに作成する場合のプライマリのリージョンを取得する
+
+    Args:
+        node (Node): コンテキストを参照するConstructのノード
+    Returns:
+        Optional[str]: プライマリのリージョン。複数のリージョンに作成しない場合はNone
+    """
+    regions = get_regions(node)
+    return regions[0] if len(regions) > 1 else None
+
+
+def get_regional_name(scope: Construct, name: str) -> str:
+    """アカウント内で一意にする必要がある名前にリージョンを付与する
+
+    IAMロールやCloudWatchのダッシュボードなどの名前はリージョンをまたいで一意のため、
+    複数のリージョンに作成する場合はリージョンを末尾に付与して衝突を避ける。
+    単一のリージョンの場合は既存のリソースを置き換えないよう名前を変えない。
+
+    Args:
+        scope (Construct): 名前を付けるリソースのスコープ
+        name (str): 名前
+    Returns:
+        str: 名前
+    """
+    region = Stack.of(scope).region
+    if get_primary_region(scope.node) is None or Token.is_unresolved(region):
+        return name
+    return f"{name}-{region}"
@@ -0,0 +1,167 @@
+from typing import Optional
+
+from aws_cdk import Duration
+from aws_cdk import aws_iam as iam
+from aws_cdk import aws_lambda as _lambda
+from aws_cdk import aws_lambda_event_sources as event_sources
+from aws_cdk import aws_sqs as sqs
+from constructs import Construct
+
+from web_app.lib.awslambda.lambda_utils import LAMBDA_ARCHITECTURES
+
+# SQSのイベントソースのバッチサイズの上限（標準キュー）
+MAX_BATCH_SIZE = 10000
+# バッチウィンドウの上限（秒）
+MAX_BATCHING_WINDOW_SECONDS = 300
+# イベントソースの最大同時実行数の範囲
+MAX_CONCURRENCY_RANGE = (2, 1000)
+
+
+class AsyncJobQueue(Construct):
+    """重い処理を非同期に実行するSQSキューとワーカーのLambda関数を構築するモジュール
+
+    Webサーバーや API Gatewayのバックエンドはキューにジョブを送ってすぐに応答し、
+    ワーカーがリクエストとは別にスケールしてバッチで処理する。
+    """
+
+    _dead_letter_queue: sqs.Queue
+    _queue: sqs.Queue
+    _worker: _lambda.Function
+
+    def __init__(
+        self,
+        scope: Construct,
+        app_name: str,
+        stage: str,
+        batch_size: int = 10,
+        max_batching_window_seconds: int = 0,
+        max_concurrency: Optional[int] = None,
+        max_receive_count: int = 3,
+        worker_timeout_seconds: int = 60,
+        worker_memory_size: int = 512,
+        architecture: str = "arm64",
+    ) -> None:
+        """コンストラクタ
+
+        Args:
+            scope (Construct): 親のConstruct
+            app_name (str): アプリケーション名
+            stage (str): ステージ名
+            batch_size (int): 1回の呼び出しで処理するメッセージの最大数
+            max_batching_window_seconds (int):
+                バッチサイズに達するまでメッセージを待つ最大秒数。
+                batch_sizeが10を超える場合は1以上にする
+            max_concurrency (Optional[int]):
+                ワーカーの最大同時実行数（2〜1000）。未指定の場合は制限しない
+            max_receive_count (int): デッドレターキューに移動するまでの受信回数
+            worker_timeout_seconds (int): ワーカーのタイムアウト（秒）
+            worker_memory_size (int): ワーカーのメモリサイズ（MB）
+            architecture (str): ワーカーのアーキテクチャ（arm64 または x86_64）
+        """
+        super().__init__(scope, f"{app_name}_{stage}_async_job_queue")
+
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError(f"batch_size must be between 1 and {MAX_BATCH_SIZE}")
+        if not 0 <= max_batching_window_seconds <= MAX_BATCHING_WINDOW_SECONDS:
+            raise ValueError(
+                "max_batching_window_seconds must be between 0 and "
+                f"{MAX_BATCHING_WINDOW_SECONDS}"
+            )
+        if batch_size > 10 and max_batching_window_seconds < 1:
+            raise ValueError(
+                "max_batching_window_seconds must be at least 1 "
+                "when batch_size is greater than 10"
+            )
+        if max_concurrency is not None and not (
+            MAX_CONCURRENCY_RANGE[0] <= max_concurrency <= MAX_CONCURRENCY_RANGE[1]
+        ):
+            raise ValueError("max_concurrency must be between 2 and 1000")
+        if max_receive_count < 1:
+            raise ValueError("max_receive_count must be at least 1")
+        if not 1 <= worker_timeout_seconds <= 900:
+            raise ValueError("worker_timeout_seconds must be between 1 and 900")
+        if architecture not in LAMBDA_ARCHITECTURES:
+            raise ValueError(
+                f"architecture must be one of {', '.join(LAMBDA_ARCHITECTURES)}: "
+                f"{architecture}"
+            )
+
+        self._dead_letter_queue = sqs.Queue(
+            self,
+            id=f"{app_name}_{stage}_job_dead_letter_queue",
+            queue_name=f"{app_name}-{stage}-job-dlq",
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            retention_period=Duration.days(14),
+        )
+
+        # 処理中のメッセージが他のワーカーに渡らないよう、可視性タイムアウトは
+        # ワーカーのタイムアウトの6倍とバッチウィンドウの合計にする
+        self._queue = sqs.Queue(
+            self,
+            id=f"{app_name}_{stage}_job_queue",
+            queue_name=f"{app_name}-{stage}-job-queue",
+            encryption=sqs.QueueEncryption.SQS_MANAGED,
+            enforce_ssl=True,
+            visibility_timeout=Duration.seconds(
+                worker_timeout_seconds * 6 + max_batching_window_seconds
+            ),
+            # メッセージがない場合も空の応答をすぐに返さず待つ（ロングポーリング）
+            receive_message_wait_time=Duration.seconds(20),
+            dead_letter_queue=sqs.DeadLetterQueue(
+                queue=self._dead_letter_queue,
+                max_receive_count=max_receive_count,
+            ),
+        )
+
+        self._worker = _lambda.Function(
+            self,
+            id=f"{app_name}_{stage}_job_worker",
+            function_name=f"{app_name}-{stage}-job-worker",
+            runtime=_lambda.Runtime.PYTHON_3_12,
+            handler="job_worker.app.handler",
+            code=_lambda.Code.from_asset("src", exclude=["**/__pycache__"]),
+            architecture=LAMBDA_ARCHITECTURES[architecture],
+            memory_size=worker_memory_size,
+            timeout=Duration.seconds(worker_timeout_seconds),
+            environment={
+                "APP_NAME": app_name,
+                "STAGE": stage,
+            },
+        )
+        # 失敗したメッセージだけを返し、成功したメッセージは再処理しない
+        self._worker.add_event_source(
+            event_sources.SqsEventSource(
+                self._queue,
+                batch_size=batch_size,
+                max_batching_window=(
+                    Duration.seconds(max_batching_window_seconds)
+                    if max_batching_window_seconds
+                    else None
+                ),
+                max_concurrency=max_concurrency,
+                report_batch_item_failures=True,
+            )
+        )
+
+    def grant_send_messages(self, grantee: iam.IGrantable) -> iam.Grant:
+        """キューにジョブを送る権限を付与する
+
+        Args:
+            grantee (iam.IGrantable): 権限を付与する対象
+        Returns:
+            iam.Grant: 付与した権限
+        """
+        return self._queue.grant_send_messages(grantee)
+
+    def get_queue(self) -> sqs.Queue:
+        """ジョブのキューを取得する"""
+        return self._queue
+
+    def get_dead_letter_queue(self) -> sqs.Queue:
+        """デッドレターキューを取得する"""
+        return self._dead_letter_queue
+
+    def get_worker(self) -> _lambda.Function:
+        """ワーカーのLambda関数を取得する"""
+        return self._worker
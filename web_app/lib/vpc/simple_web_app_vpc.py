@@ -1,6 +1,18 @@
+from typing import Optional
+
 from aws_cdk import aws_ec2 as ec2
 from constructs import Construct
 
+# インターフェイス型のVPCエンドポイント
+# セッションマネージャー（SSM、SSM Messages、EC2 Messages）、CloudWatch Logs、Secrets Manager
+INTERFACE_ENDPOINT_SERVICES = {
+    "ssm": ec2.InterfaceVpcEndpointAwsService.SSM,
+    "ssm-messages": ec2.InterfaceVpcEndpointAwsService.SSM_MESSAGES,
+    "ec2-messages": ec2.InterfaceVpcEndpointAwsService.EC2_MESSAGES,
+    "logs": ec2.InterfaceVpcEndpointAwsService.CLOUDWATCH_LOGS,
+    "secrets-manager": ec2.InterfaceVpcEndpointAwsService.SECRETS_MANAGER,
+}
+
 
 class SimpleWebAppVPC(Construct):
     """一般的なWEBアプリケーションに使用するVPCを構築するモジュール"""
@@ -9,26 +21,46 @@ class SimpleWebAppVPC(Construct):
     _elb_sg: ec2.SecurityGroup
     _web_sg: ec2.SecurityGroup
     _db_sg: ec2.SecurityGroup
+    _db_proxy_sg: Optional[ec2.SecurityGroup] = None
+    _cache_sg: Optional[ec2.SecurityGroup] = None
+    _endpoint_sgs: dict[str, ec2.SecurityGroup]
 
-    def __init__(self, scope: Construct, app_name: str, stage: str) -> None:
+    def __init__(
+        self,
+        scope: Construct,
+        app_name: str,
+        stage: str,
+        enable_db_proxy: bool = False,
+        enable_vpc_endpoints: bool = False,
+        nat_gateway_per_az: bool = False,
+        enable_cache: bool = False,
+        max_azs: int = 2,
+    ) -> None:
         """コンストラクタ
 
         Args:
             scope (Construct): 親のConstruct
             app_name (str): アプリケーション名
             stage (str): ステージ名
+            enable_db_proxy (bool): RDS Proxy用のセキュリティグループを作成するか
+            enable_vpc_endpoints (bool):
+                S3、SSM、CloudWatch Logs、Secrets ManagerへのVPCエンドポイントを作成するか
+            nat_gateway_per_az (bool): AZごとにNATゲートウェイを作成するか
+            enable_cache (bool): ElastiCache用のセキュリティグループを作成するか
+            max_azs (int): 使用するAZの最大数
         """
         super().__init__(scope, f"{app_name}_{stage}_simple_vpc")
 
         # VPC
         # パブリックサブネット、NATゲートウェイに接続したプライベートサブネット、DB用のプライベートサブネットを作成
         # DB用のプライベートサブネットはNATゲートウェイには接続しない
+        # AZごとにNATゲートウェイを作成すると、AZをまたぐ通信と単一障害点がなくなる
         self._vpc = ec2.Vpc(
             self,
             id=f"{app_name}_{stage}_vpc",
             vpc_name=f"{app_name}-{stage}-vpc",
-            max_azs=2,
-            nat_gateways=1,
+            max_azs=max_azs,
+            nat_gateways=max_azs if nat_gateway_per_az else 1,
             subnet_configuration=[
                 ec2.SubnetConfiguration(
                     name=f"{app_name}-{stage}-public-subnet",
@@ -80,6 +112,75 @@ class SimpleWebAppVPC(Construct):
             connection=ec2.Port.tcp(5432),
         )
 
+        # RDS Proxyを使う場合、EC2からはRDS Proxy経由でRDSに接続する
+        if enable_db_proxy:
+            self._db_proxy_sg = ec2.SecurityGroup(
+                self,
+                id=f"{app_name}_{stage}_rds_proxy_sg",
+                security_group_name=f"{app_name}-{stage}-rds-proxy-sg",
+                vpc=self._vpc,
+                allow_all_outbound=True,
+            )
+            self._db_proxy_sg.add_ingress_rule(
+                peer=self._web_sg,
+                connection=ec2.Port.tcp(5432),
+            )
+            self._db_sg.add_ingress_rule(
+                peer=self._db_proxy_sg,
+                connection=ec2.Port.tcp(5432),
+            )
+
+        # ElastiCacheにはEC2からのみ接続できるようにする
+        if enable_cache:
+            self._cache_sg = ec2.SecurityGroup(
+                self,
+                id=f"{app_name}_{stage}_cache_sg",
+                security_group_name=f"{app_name}-{stage}-cache-sg",
+                vpc=self._vpc,
+                allow_all_outbound=False,
+            )
+            self._cache_sg.add_ingress_rule(
+                peer=self._web_sg,
+                connection=ec2.Port.tcp(6379),
+            )
+
+        # VPCエンドポイント
+        # S3、SSM、CloudWatch Logs、Secrets Managerへの通信がNATゲートウェイを経由しないようにする
+        # プライベートDNSを有効にするとVPC内のすべての通信がエンドポイントに向くため、
+        # EC2だけでなくImage Builderのビルド用インスタンスやRDS Proxyからも接続できるようにする
+        self._endpoint_sgs = {}
+        if enable_vpc_endpoints:
+            self._vpc.add_gateway_endpoint(
+                f"{app_name}_{stage}_s3_endpoint",
+                service=ec2.GatewayVpcEndpointAwsService.S3,
+                subnets=[
+                    ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS),
+                    ec2.SubnetSelection(subnet_type=ec2.SubnetType.PRIVATE_ISOLATED),
+                ],
+            )
+            for name, service in INTERFACE_ENDPOINT_SERVICES.items():
+                endpoint_sg = ec2.SecurityGroup(
+                    self,
+                    id=f"{app_name}_{stage}_{name}_endpoint_sg",
+                    security_group_name=f"{app_name}-{stage}-{name}-endpoint-sg",
+                    vpc=self._vpc,
+                    allow_all_outbound=False,
+                )
+                endpoint_sg.add_ingress_rule(
+                    peer=ec2.Peer.ipv4(self._vpc.vpc_cidr_block),
+                    connection=ec2.Port.tcp(443),
+                )
+                self._vpc.add_interface_endpoint(
+                    f"{app_name}_{stage}_{name}_endpoint",
+                    service=service,
+                    subnets=ec2.SubnetSelection(
+                        subnet_type=ec2.SubnetType.PRIVATE_WITH_EGRESS
+                    ),
+                    security_groups=[endpoint_sg],
+                    private_dns_enabled=True,
+                )
+                self._endpoint_sgs[name] = endpoint_sg
+
     def get_vpc(self) -> ec2.Vpc:
         """VPCを取得する"""
         return self._vpc
@@ -107,3 +208,15 @@ class SimpleWebAppVPC(Construct):
     def get_db_sg(self) -> ec2.SecurityGroup:
         """RDSのセキュリティグループを取得する"""
         return self._db_sg
+
+    def get_db_proxy_sg(self) -> Optional[ec2.SecurityGroup]:
+        """RDS Proxyのセキュリティグループを取得する"""
+        return self._db_proxy_sg
+
+    def get_cache_sg(self) -> Optional[ec2.SecurityGroup]:
+        """ElastiCacheのセキュリティグループを取得する"""
+        return self._cache_sg
+
+    def get_endpoint_sgs(self) -> dict[str, ec2.SecurityGroup]:
+        """インターフェイス型のVPCエンドポイントのセキュリティグループを取得する"""
+        return self._endpoint_sgs
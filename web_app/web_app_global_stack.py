@@ -0,0 +1,195 @@
+from typing import Optional, Sequence
+
+from aws_cdk import Environment, Stack, Tags
+from aws_cdk import aws_globalaccelerator as globalaccelerator
+from aws_cdk import aws_globalaccelerator_endpoints as globalaccelerator_endpoints
+from aws_cdk import aws_route53 as route53
+from aws_cdk import aws_route53_targets as route53_targets
+from constructs import Construct
+
+from web_app.lib.context.context_utils import get_context_str
+from web_app.lib.region.region_utils import (
+    GLOBAL_ACCELERATOR_REGION,
+    GLOBAL_ROUTING_MODES,
+    get_primary_region,
+    get_regions,
+)
+from web_app.web_app_stack import WebAppStack
+
+
+class WebAppGlobalStack(Stack):
+    """リージョンごとのWebAppStackのALBに、利用者に最も近いリージョンから振り分けるスタック
+
+    latency: Route 53のレイテンシーベースのレコードをリージョンごとに作成する
+    accelerator: Global Acceleratorのリスナーにリージョンごとのエンドポイントグループを作成する
+
+    どちらもALBにターゲットがない場合はほかのリージョンに振り分ける。
+    リージョンごとのスタックのALBはクロスリージョン参照で取得する。
+    """
+
+    _accelerator: Optional[globalaccelerator.Accelerator] = None
+
+    def __init__(
+        self,
+        scope: Construct,
+        construct_id: str,
+        regional_stacks: Sequence[WebAppStack],
+        **kwargs,
+    ) -> None:
+        """コンストラクタ
+
+        Args:
+            scope (Construct): 親のConstruct
+            construct_id (str): スタックのID
+            regional_stacks (Sequence[WebAppStack]): リージョンごとのスタック
+            **kwargs: Stackの引数
+        """
+        kwargs.setdefault("cross_region_references", True)
+        super().__init__(scope, construct_id, **kwargs)
+
+        if not regional_stacks:
+            raise ValueError("regional_stacks is required")
+
+        app_name = get_context_str(self.node, "app_name", "web-app")
+        stage: str = self.node.try_get_context("stage")
+        if stage is None:
+            raise ValueError("stage is required")
+        stage = stage.lower()
+
+        Tags.of(self).add("app_name", app_name)
+        Tags.of(self).add("stage", stage)
+
+        routing = get_context_str(self.node, "global_routing", "latency")
+        if routing not in GLOBAL_ROUTING_MODES:
+            raise ValueError(
+                f"global_routing must be one of {', '.join(GLOBAL_ROUTING_MODES)}: "
+                f"{routing}"
+            )
+
+        # 利用者がアクセスするドメイン。ALBの証明書はこのドメインを含めること
+        hosted_zone: Optional[route53.IHostedZone] = None
+        hosted_zone_id = get_context_str(self.node, "global_hosted_zone_id")
+        hosted_zone_name = get_context_str(self.node, "global_hosted_zone_name")
+        if hosted_zone_id is not None and hosted_zone_name is not None:
+            hosted_zone = route53.HostedZone.from_hosted_zone_attributes(
+                self,
+                id=f"{app_name}_{stage}_hosted_zone",
+                hosted_zone_id=hosted_zone_id,
+                zone_name=hosted_zone_name,
+            )
+        elif routing == "latency":
+            raise ValueError(
+                "global_hosted_zone_id and global_hosted_zone_name are required"
+            )
+        domain_name = get_context_str(self.node, "global_domain_name", hosted_zone_name)
+
+        if routing == "latency":
+            for regional_stack in regional_stacks:
+                record = route53.ARecord(
+                    self,
+                    id=f"{app_name}_{stage}_{regional_stack.region}_record",
+                    zone=hosted_zone,
+                    record_name=domain_name,
+                    target=route53.RecordTarget.from_alias(
+                        route53_targets.LoadBalancerTarget(regional_stack.get_alb())
+                    ),
+                    region=regional_stack.region,
+                    set_identifier=f"{app_name}-{stage}-{regional_stack.region}",
+                )
+                # ALBに正常なターゲットがない場合は次に近いリージョンに振り分ける
+                record.node.default_child.add_property_override(
+                    "AliasTarget.EvaluateTargetHealth", True
+                )
+        else:
+            # Global Acceleratorはエニーキャストの固定IPで受け、AWSのネットワーク経由でALBに届ける
+            # 同じ利用者は同じリージョンに振り分け、ALBの認証のセッションを維持する
+            self._accelerator = globalaccelerator.Accelerator(
+                self,
+                id=f"{app_name}_{stage}_accelerator",
+                accelerator_name=f"{app_name}-{stage}-accelerator",
+            )
+            listener = self._accelerator.add_listener(
+                f"{app_name}_{stage}_accelerator_listener",
+                port_ranges=[
+                    globalaccelerator.PortRange(from_port=80),
+                    globalaccelerator.PortRange(from_port=443),
+                ],
+                protocol=globalaccelerator.ConnectionProtocol.TCP,
+                client_affinity=globalaccelerator.ClientAffinity.SOURCE_IP,
+            )
+            for regional_stack in regional_stacks:
+                listener.add_endpoint_group(
+                    f"{app_name}_{stage}_{regional_stack.region}_endpoint_group",
+                    region=regional_stack.region,
+                    endpoints=[
+                        globalaccelerator_endpoints.ApplicationLoadBalancerEndpoint(
+                            regional_stack.get_alb(), preserve_client_ip=True
+                        )
+                    ],
+                )
+
+            if hosted_zone is not None:
+                route53.ARecord(
+                    self,
+                    id=f"{app_name}_{stage}_accelerator_record",
+                    zone=hosted_zone,
+                    record_name=domain_name,
+                    target=route53.RecordTarget.from_alias(
+                        route53_targets.GlobalAcceleratorTarget(self._accelerator)
+                    ),
+                )
+
+    def get_accelerator(self) -> Optional[globalaccelerator.Accelerator]:
+        """Global Acceleratorを取得する。Route 53で振り分ける場合はNone"""
+        return self._accelerator
+
+
+def create_web_app_stacks(app: Construct, account: Optional[str] = None) -> list[Stack]:
+    """コンテキスト `regions` に従ってスタックを作成する
+
+    regionsが未指定の場合は、環境に依存しないWebAppStackを1つ作成する。
+    1つの場合はそのリージョンのWebAppStackを作成する。
+    複数の場合はリージョンごとのWebAppStackと、振り分けを行うWebAppGlobalStackを作成する。
+    Aurora Global Databaseのセカンダリが参加できるよう、ほかのリージョンのスタックは
+    プライマリ（先頭）のリージョンのスタックの後にデプロイする。
+
+    Args:
+        app (Construct): CDKのアプリケーション
+        account (Optional[str]): デプロイ先のアカウント
+    Returns:
+        list[Stack]: 作成したスタックのリスト
+    """
+    regions = get_regions(app.node)
+    primary_region = get_primary_region(app.node)
+    if not regions:
+        return [WebAppStack(app, "WebAppStack")]
+    if primary_region is None:
+        return [
+            WebAppStack(
+                app, "WebAppStack", env=Environment(account=account, region=regions[0])
+            )
+        ]
+
+    regional_stacks = [
+        WebAppStack(
+            app,
+            f"WebAppStack-{region}",
+            env=Environment(account=account, region=region),
+        )
+        for region in regions
+    ]
+    for regional_stack in regional_stacks[1:]:
+        regional_stack.add_dependency(regional_stacks[0])
+
+    global_region = (
+        GLOBAL_ACCELERATOR_REGION
+        if get_context_str(app.node, "global_routing") == "accelerator"
+        else primary_region
+    )
+    global_stack = WebAppGlobalStack(
+        app,
+        "WebAppGlobalStack",
+        regional_stacks=regional_stacks,
+        env=Environment(account=account, region=global_region),
+    )
+    return [*regional_stacks, global_stack]
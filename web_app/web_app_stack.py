@@ -1,13 +1,73 @@
-from aws_cdk import Stack, Tags
+import json
+from typing import Optional, Union
+
+from aws_cdk import Aspects, Fn, Stack, Tags, Token
 from aws_cdk import aws_apigateway as apigw
+from aws_cdk import aws_apigatewayv2 as apigwv2
+from aws_cdk import aws_ec2 as ec2
+from aws_cdk import aws_elasticloadbalancingv2 as elb
+from aws_cdk import aws_elasticloadbalancingv2_targets as tg
 from aws_cdk import aws_iam as iam
-from aws_cdk import aws_lambda as _lambda
+from aws_cdk import aws_rds as rds
+from aws_cdk import aws_secretsmanager as secretsmanager
+from aws_cdk import aws_ssm as ssm
 from constructs import Construct
 
+from web_app.lib.apigw.apigw_utils import API_TYPES, create_http_api, create_rest_api
+from web_app.lib.aspects.performance_checker import PerformanceChecker
+from web_app.lib.awslambda.lambda_utils import (
+    create_api_function,
+    create_pre_token_generation_function,
+)
+from web_app.lib.cloudfront.web_app_distribution import WebAppDistribution
+from web_app.lib.codedeploy.web_app_deployment import WebAppDeployment
 from web_app.lib.cognito.simple_user_pool import SimpleUserPool
-from web_app.lib.ec2.ec2_utils import create_web_ec2_instance
-from web_app.lib.elb.elb_utils import create_alb_instance
-from web_app.lib.rds.rds_utils import create_rds_instance
+from web_app.lib.context.context_utils import (
+    get_context_bool,
+    get_context_dict,
+    get_context_float,
+    get_context_int,
+    get_context_list,
+    get_context_str,
+)
+from web_app.lib.context.stage_profile import load_stage_profile
+from web_app.lib.ec2.ec2_utils import (
+    create_web_ec2_instance,
+    create_web_user_data,
+    get_web_block_devices,
+    get_web_instance_type,
+)
+from web_app.lib.ec2.instance_types import get_instance_spec
+from web_app.lib.ec2.web_auto_scaling_group import WebAutoScalingGroup
+from web_app.lib.elasticache.elasticache_utils import (
+    create_cache_replication_group,
+)
+from web_app.lib.elb.elb_utils import (
+    create_alb_instance,
+    create_alb_log_bucket,
+    create_web_target_group,
+)
+from web_app.lib.imagebuilder.golden_ami_pipeline import GoldenAmiPipeline
+from web_app.lib.monitoring.web_app_monitoring import WebAppMonitoring
+from web_app.lib.rds.rds_utils import (
+    DB_MODES,
+    create_aurora_global_cluster,
+    create_aurora_serverless_cluster,
+    create_db_parameter_group,
+    create_rds_instance,
+    create_rds_proxy,
+    create_rds_proxy_reader_endpoint,
+    create_rds_read_replicas,
+    get_aurora_global_cluster_identifier,
+    get_aurora_secret_name,
+    get_db_instance_type,
+)
+from web_app.lib.region.region_utils import (
+    get_primary_region,
+    get_regional_name,
+    get_regions,
+)
+from web_app.lib.sqs.async_job_queue import AsyncJobQueue
 from web_app.lib.vpc.simple_web_app_vpc import SimpleWebAppVPC
 
 
@@ -15,6 +75,7 @@ class WebAppStack(Stack):
 
     app_name: str
     stage: str
+    _alb: elb.ApplicationLoadBalancer
 
     def __init__(self, scope: Construct, construct_id: str, **kwargs) -> None:
         super().__init__(scope, construct_id, **kwargs)
@@ -33,7 +94,16 @@ class WebAppStack(Stack):
         if key_pair_param is None:
             raise ValueError("key_pair is required")
 
-        certificate_arn_param: str = self.node.try_get_context("certificate_arn")
+        # 複数のリージョンに作成する場合は、スタックのリージョンがregionsに含まれている必要がある
+        regions = get_regions(self.node)
+        primary_region = get_primary_region(self.node)
+        if primary_region is not None and self.region not in regions:
+            raise ValueError(f"stack region must be one of regions: {self.region}")
+
+        # ACMの証明書はALBと同じリージョンのものが必要なため、リージョンごとに指定できる
+        certificate_arn_param: str = get_context_dict(
+            self.node, "certificate_arns"
+        ).get(self.region) or self.node.try_get_context("certificate_arn")
         if certificate_arn_param is None:
             raise ValueError("certificate_arn is required")
 
@@ -41,14 +111,32 @@ class WebAppStack(Stack):
         Tags.of(self).add("app_name", app_name)
         Tags.of(self).add("stage", stage)
 
-        simple_vpc = SimpleWebAppVPC(self, app_name, stage)
+        # インスタンスタイプや台数などのサイズはステージのプロファイルから決める
+        # 個別のコンテキストを指定した場合はプロファイルより優先する
+        profile = load_stage_profile(self.node, stage)
+
+        db_proxy_enabled = get_context_bool(self.node, "db_proxy_enabled")
+        cache_enabled = get_context_bool(self.node, "cache_enabled")
+
+        simple_vpc = SimpleWebAppVPC(
+            self,
+            app_name,
+            stage,
+            enable_db_proxy=db_proxy_enabled,
+            enable_vpc_endpoints=get_context_bool(self.node, "vpc_endpoints_enabled"),
+            nat_gateway_per_az=get_context_bool(
+                self.node, "nat_gateway_per_az", profile.vpc.nat_gateway_per_az
+            ),
+            enable_cache=cache_enabled,
+            max_azs=profile.vpc.max_azs,
+        )
 
         # EC2用のインスタンスプロファイル
         # セッションマネージャーを使うためのマネージドポリシーをアタッチ
         instance_profile = iam.Role(
             scope=self,
             id=f"{app_name}_{stage}_web_ec2_role",
-            role_name=f"{app_name}-{stage}-web-ec2-role",
+            role_name=get_regional_name(self, f"{app_name}-{stage}-web-ec2-role"),
             assumed_by=iam.ServicePrincipal("ec2.amazonaws.com"),
             description="for instance profile",
             managed_policies=[
@@ -61,78 +149,615 @@ class WebAppStack(Stack):
             ],
         )
 
-        # EC2はALB配下に2つ設置するのでEC2を2台起動
-        ec2_instance_1 = create_web_ec2_instance(
-            scope=self,
-            app_name=app_name,
-            stage=stage,
-            suffix="1",
-            vpc=simple_vpc.get_vpc(),
-            security_group=simple_vpc.get_web_sg(),
-            instance_profile=instance_profile,
-            key_pair_name=key_pair_param,
+        # データベース
+        # single: RDSインスタンス1台
+        # replicas: RDSインスタンスとリードレプリカ
+        # aurora: Aurora PostgreSQL Serverless v2
+        # Webサーバーには書き込み用と読み取り用の接続先を分けて渡す
+        db_mode = get_context_str(self.node, "db_mode", "single")
+        db_instance_type = get_db_instance_type(profile.db.instance_type)
+        # インスタンスクラスに合わせたパラメータグループ、gp3、Performance Insights、拡張モニタリング
+        db_performance_enabled = get_context_bool(
+            self.node, "db_performance_enabled", profile.db.performance_tuning
         )
-        ec2_instance_2 = create_web_ec2_instance(
-            scope=self,
-            app_name=app_name,
-            stage=stage,
-            suffix="2",
-            vpc=simple_vpc.get_vpc(),
-            security_group=simple_vpc.get_web_sg(),
-            instance_profile=instance_profile,
-            key_pair_name=key_pair_param,
+        db_performance_options = {
+            "performance_tuning": db_performance_enabled,
+            "storage_iops": profile.db.storage_iops,
+            "storage_throughput_mibps": profile.db.storage_throughput_mibps,
+            "monitoring_interval_seconds": profile.db.monitoring_interval_seconds,
+        }
+        # Aurora Global Database
+        # プライマリのリージョンのクラスターからグローバルクラスターを作成し、
+        # ほかのリージョンのクラスターはセカンダリとして参加させる
+        db_global_database = get_context_bool(self.node, "db_global_database")
+        if db_global_database and (db_mode != "aurora" or primary_region is None):
+            raise ValueError(
+                "db_global_database requires db_mode aurora and multiple regions"
+            )
+        db_cluster: Optional[rds.DatabaseCluster] = None
+        db_instance: Optional[rds.DatabaseInstance] = None
+        if db_mode in ("single", "replicas"):
+            # リードレプリカもレプリケーション元と同じパラメータグループを使う
+            db_parameter_group = (
+                create_db_parameter_group(self, app_name, stage, db_instance_type)
+                if db_performance_enabled
+                else None
+            )
+            db_instance = create_rds_instance(
+                scope=self,
+                app_name=app_name,
+                stage=stage,
+                vpc=simple_vpc.get_vpc(),
+                security_group=simple_vpc.get_db_sg(),
+                instance_type=db_instance_type,
+                allocated_storage_gib=profile.db.allocated_storage_gib,
+                max_allocated_storage_gib=profile.db.max_allocated_storage_gib,
+                multi_az=get_context_bool(
+                    self.node, "db_multi_az", profile.db.multi_az
+                ),
+                parameter_group=db_parameter_group,
+                **db_performance_options,
+            )
+            db_secret = db_instance.secret
+            db_port = db_instance.db_instance_endpoint_port
+            db_proxy_target = rds.ProxyTarget.from_instance(db_instance)
+            db_writer_host = db_instance.db_instance_endpoint_address
+            db_reader_hosts = [db_writer_host]
+            if db_mode == "replicas":
+                db_replicas = create_rds_read_replicas(
+                    scope=self,
+                    app_name=app_name,
+                    stage=stage,
+                    vpc=simple_vpc.get_vpc(),
+                    security_group=simple_vpc.get_db_sg(),
+                    source_instance=db_instance,
+                    count=get_context_int(
+                        self.node,
+                        "db_read_replica_count",
+                        profile.db.read_replica_count,
+                    ),
+                    instance_type=db_instance_type,
+                    parameter_group=db_parameter_group,
+                    **db_performance_options,
+                )
+                db_reader_hosts = [
+                    db_replica.db_instance_endpoint_address
+                    for db_replica in db_replicas
+                ]
+        elif db_mode == "aurora":
+            db_global_secondary = db_global_database and self.region != primary_region
+            db_cluster = create_aurora_serverless_cluster(
+                scope=self,
+                app_name=app_name,
+                stage=stage,
+                vpc=simple_vpc.get_vpc(),
+                security_group=simple_vpc.get_db_sg(),
+                min_capacity=get_context_float(
+                    self.node, "db_aurora_min_acu", profile.db.aurora_min_acu
+                ),
+                max_capacity=get_context_float(
+                    self.node, "db_aurora_max_acu", profile.db.aurora_max_acu
+                ),
+                reader_count=get_context_int(
+                    self.node, "db_aurora_reader_count", profile.db.aurora_reader_count
+                ),
+                performance_tuning=db_performance_enabled,
+                monitoring_interval_seconds=profile.db.monitoring_interval_seconds,
+                secret_replica_regions=(
+                    regions[1:]
+                    if db_global_database and not db_global_secondary
+                    else ()
+                ),
+                global_cluster_identifier=(
+                    get_aurora_global_cluster_identifier(app_name, stage)
+                    if db_global_secondary
+                    else None
+                ),
+            )
+            db_secret = db_cluster.secret
+            if db_global_secondary:
+                # 認証情報はプライマリのリージョンから複製したシークレットを使う
+                db_secret = secretsmanager.Secret.from_secret_name_v2(
+                    self,
+                    id=f"{app_name}_{stage}_aurora_global_secret",
+                    secret_name=get_aurora_secret_name(app_name, stage),
+                )
+            elif db_global_database:
+                create_aurora_global_cluster(self, app_name, stage, db_cluster)
+            db_port = Token.as_string(db_cluster.cluster_endpoint.port)
+            db_proxy_target = rds.ProxyTarget.from_cluster(db_cluster)
+            db_writer_host = db_cluster.cluster_endpoint.hostname
+            db_reader_hosts = [db_cluster.cluster_read_endpoint.hostname]
+        else:
+            raise ValueError(f"db_mode must be one of {', '.join(DB_MODES)}: {db_mode}")
+
+        # RDS Proxyを使う場合はRDS Proxyのエンドポイントに接続する
+        if db_proxy_enabled:
+            db_proxy = create_rds_proxy(
+                scope=self,
+                app_name=app_name,
+                stage=stage,
+                vpc=simple_vpc.get_vpc(),
+                security_group=simple_vpc.get_db_proxy_sg(),
+                proxy_target=db_proxy_target,
+                secret=db_secret,
+                borrow_timeout_seconds=get_context_int(
+                    self.node, "db_proxy_borrow_timeout_seconds", 30
+                ),
+                max_connections_percent=get_context_int(
+                    self.node, "db_proxy_max_connections_percent", 90
+                ),
+                max_idle_connections_percent=get_context_int(
+                    self.node, "db_proxy_max_idle_connections_percent", 50
+                ),
+            )
+            # RDS Proxyはリードレプリカをターゲットにできないため、
+            # replicasの場合の読み取りはリードレプリカに直接接続する
+            if db_mode == "single":
+                db_reader_hosts = [db_proxy.endpoint]
+            elif db_mode == "aurora":
+                # Auroraのリーダーへの接続もRDS Proxyの読み取り専用エンドポイントでプールする
+                db_proxy_reader_endpoint = create_rds_proxy_reader_endpoint(
+                    scope=self,
+                    app_name=app_name,
+                    stage=stage,
+                    vpc=simple_vpc.get_vpc(),
+                    security_group=simple_vpc.get_db_proxy_sg(),
+                    db_proxy=db_proxy,
+                )
+                db_reader_hosts = [db_proxy_reader_endpoint.attr_endpoint]
+            db_writer_host = db_proxy.endpoint
+
+        # WebサーバーはSecrets Managerからデータベースの認証情報を取得する
+        db_secret.grant_read(instance_profile)
+        web_environment = {
+            "DB_HOST": db_writer_host,
+            # 読み取り専用の接続先。複数ある場合はカンマ区切り
+            "DB_READ_HOSTS": Fn.join(",", db_reader_hosts),
+            "DB_PORT": db_port,
+            "DB_NAME": f"{app_name}_{stage}_rds",
+            "DB_SECRET_ARN": db_secret.secret_arn,
+        }
+
+        # PHPのセッションとアプリケーションのキャッシュを共有するElastiCache（Valkey）
+        # アプリケーションにはDBのクエリ結果をキャッシュできるよう接続先を渡す
+        session_save_path: Optional[str] = None
+        if cache_enabled:
+            cache = create_cache_replication_group(
+                scope=self,
+                app_name=app_name,
+                stage=stage,
+                vpc=simple_vpc.get_vpc(),
+                security_group=simple_vpc.get_cache_sg(),
+                node_type=get_context_str(
+                    self.node, "cache_node_type", profile.cache.node_type
+                ),
+                replica_count=get_context_int(
+                    self.node, "cache_replica_count", profile.cache.replica_count
+                ),
+            )
+            web_environment.update(
+                {
+                    "CACHE_HOST": cache.attr_primary_end_point_address,
+                    "CACHE_READ_HOST": cache.attr_reader_end_point_address,
+                    "CACHE_PORT": cache.attr_primary_end_point_port,
+                }
+            )
+            session_save_path = (
+                f"tls://{cache.attr_primary_end_point_address}"
+                f":{cache.attr_primary_end_point_port}"
+            )
+
+        # 重い処理をリクエストから切り離して実行するジョブのキューとワーカー
+        # WebサーバーとAPI Gatewayのバックエンドにはキューにジョブを送る権限を付与する
+        job_queue: Optional[AsyncJobQueue] = None
+        if get_context_bool(self.node, "jobs_enabled"):
+            job_queue = AsyncJobQueue(
+                self,
+                app_name=app_name,
+                stage=stage,
+                batch_size=get_context_int(self.node, "jobs_batch_size", 10),
+                max_batching_window_seconds=get_context_int(
+                    self.node, "jobs_max_batching_window_seconds", 0
+                ),
+                max_concurrency=get_context_int(self.node, "jobs_max_concurrency"),
+                max_receive_count=get_context_int(
+                    self.node, "jobs_max_receive_count", 3
+                ),
+                worker_timeout_seconds=get_context_int(
+                    self.node, "jobs_worker_timeout_seconds", 60
+                ),
+                worker_memory_size=get_context_int(
+                    self.node, "jobs_worker_memory_size", 512
+                ),
+                architecture=get_context_str(
+                    self.node, "lambda_architecture", profile.function.architecture
+                ),
+            )
+            job_queue.grant_send_messages(instance_profile)
+            web_environment["JOB_QUEUE_URL"] = job_queue.get_queue().queue_url
+
+        # Webサーバーのイメージ
+        # boot: 起動時にUserDataでパッケージをインストールする
+        # bake: EC2 Image Builderでパッケージを焼き込んだAMIから起動する
+        web_image_mode = get_context_str(self.node, "web_image_mode", "boot")
+        web_instance_type = get_web_instance_type(profile.web.instance_type)
+        web_spot_instance_types = [
+            ec2.InstanceType(instance_type)
+            for instance_type in get_context_list(
+                self.node,
+                "web_spot_instance_types",
+                list(profile.web.spot_instance_types),
+            )
+        ]
+        web_block_devices = get_web_block_devices(
+            volume_size_gib=profile.web.volume_size_gib,
+            iops=profile.web.volume_iops,
+            throughput_mibps=profile.web.volume_throughput_mibps,
+        )
+        # 複数のインスタンスタイプから起動する場合は、メモリが最も小さいものに設定を合わせる
+        web_tuning_instance_type = min(
+            [web_instance_type, *web_spot_instance_types],
+            key=lambda instance_type: get_instance_spec(instance_type).memory_mib,
+        )
+        web_user_data = create_web_user_data(
+            image_mode=web_image_mode,
+            environment=web_environment,
+            session_save_path=session_save_path,
+            instance_type=web_tuning_instance_type,
+            php_worker_rss_mib=get_context_int(self.node, "web_php_worker_rss_mib", 64),
+        )
+        web_machine_image: Optional[ec2.IMachineImage] = None
+        if web_image_mode == "bake":
+            golden_ami_pipeline = GoldenAmiPipeline(
+                self,
+                app_name,
+                stage,
+                vpc=simple_vpc.get_vpc(),
+                php_redis=cache_enabled,
+                instance_type=web_instance_type,
+                volume_size_gib=profile.web.volume_size_gib,
+            )
+            web_machine_image = golden_ami_pipeline.get_machine_image()
+
+        # Webサーバーのフリート
+        # autoscaling: 起動テンプレートとAuto Scalingグループで台数を増減させる
+        # instance: EC2を2台固定で起動する
+        web_fleet_mode = get_context_str(self.node, "web_fleet_mode", "autoscaling")
+        web_asg: Optional[WebAutoScalingGroup] = None
+        web_instances: list[ec2.Instance] = []
+        web_targets: list[elb.IApplicationLoadBalancerTarget]
+        if web_fleet_mode == "autoscaling":
+            web_asg = WebAutoScalingGroup(
+                self,
+                app_name=app_name,
+                stage=stage,
+                vpc=simple_vpc.get_vpc(),
+                security_group=simple_vpc.get_web_sg(),
+                instance_profile=instance_profile,
+                key_pair_name=key_pair_param,
+                user_data=web_user_data,
+                machine_image=web_machine_image,
+                instance_type=web_instance_type,
+                block_devices=web_block_devices,
+                min_capacity=get_context_int(
+                    self.node, "web_min_capacity", profile.web.min_capacity
+                ),
+                max_capacity=get_context_int(
+                    self.node, "web_max_capacity", profile.web.max_capacity
+                ),
+                desired_capacity=get_context_int(self.node, "web_desired_capacity"),
+                on_demand_base_capacity=get_context_int(
+                    self.node, "web_on_demand_base_capacity", 0
+                ),
+                on_demand_percentage_above_base_capacity=get_context_int(
+                    self.node, "web_on_demand_percentage", 100
+                ),
+                instance_types=web_spot_instance_types or None,
+            )
+            web_targets = [web_asg.get_auto_scaling_group()]
+        elif web_fleet_mode == "instance":
+            # EC2はALB配下に2つ設置するのでEC2を2台起動
+            ec2_instance_1 = create_web_ec2_instance(
+                scope=self,
+                app_name=app_name,
+                stage=stage,
+                suffix="1",
+                vpc=simple_vpc.get_vpc(),
+                security_group=simple_vpc.get_web_sg(),
+                instance_profile=instance_profile,
+                key_pair_name=key_pair_param,
+                user_data=web_user_data,
+                machine_image=web_machine_image,
+                instance_type=web_instance_type,
+                block_devices=web_block_devices,
+            )
+            ec2_instance_2 = create_web_ec2_instance(
+                scope=self,
+                app_name=app_name,
+                stage=stage,
+                suffix="2",
+                vpc=simple_vpc.get_vpc(),
+                security_group=simple_vpc.get_web_sg(),
+                instance_profile=instance_profile,
+                key_pair_name=key_pair_param,
+                user_data=web_user_data,
+                machine_image=web_machine_image,
+                instance_type=web_instance_type,
+                block_devices=web_block_devices,
+            )
+            web_instances = [ec2_instance_1, ec2_instance_2]
+            web_targets = [
+                tg.InstanceIdTarget(instance_id=ec2_instance.instance_id)
+                for ec2_instance in web_instances
+            ]
+        else:
+            raise ValueError(
+                f"web_fleet_mode must be autoscaling or instance: {web_fleet_mode}"
+            )
+
+        # ロール、テナント、機能フラグをトークンのクレームに追加し、
+        # リクエストごとにデータベースを参照しなくてよいようにする
+        pre_token_generation = None
+        if get_context_bool(self.node, "cognito_app_claims_enabled"):
+            feature_flags_parameter = ssm.StringParameter(
+                self,
+                id=f"{app_name}_{stage}_feature_flags",
+                parameter_name=f"/{app_name}/{stage}/feature-flags",
+                string_value=json.dumps(
+                    get_context_dict(self.node, "cognito_feature_flags")
+                ),
+            )
+            pre_token_generation = create_pre_token_generation_function(
+                scope=self,
+                app_name=app_name,
+                stage=stage,
+                feature_flags_parameter=feature_flags_parameter,
+                cache_ttl_seconds=get_context_int(
+                    self.node, "cognito_claims_cache_ttl_seconds", 300
+                ),
+                architecture=get_context_str(
+                    self.node, "lambda_architecture", profile.function.architecture
+                ),
+            )
+
+        # Cognitoユーザープールを作成
+        simple_user_pool = SimpleUserPool(
+            self, app_name, stage, pre_token_generation=pre_token_generation
         )
 
-        _ = create_rds_instance(
+        target_group = create_web_target_group(
             scope=self,
             app_name=app_name,
             stage=stage,
             vpc=simple_vpc.get_vpc(),
-            security_group=simple_vpc.get_db_sg(),
+            targets=web_targets,
+            load_balancing_algorithm=get_context_str(
+                self.node, "web_lb_algorithm", "least_outstanding_requests"
+            ),
+            slow_start_seconds=get_context_int(self.node, "web_slow_start_seconds", 60),
+            deregistration_delay_seconds=get_context_int(
+                self.node, "web_deregistration_delay_seconds", 30
+            ),
+            health_check_interval_seconds=get_context_int(
+                self.node, "web_health_check_interval_seconds", 10
+            ),
+            health_check_timeout_seconds=get_context_int(
+                self.node, "web_health_check_timeout_seconds", 5
+            ),
+            healthy_threshold_count=get_context_int(
+                self.node, "web_healthy_threshold_count", 2
+            ),
+            unhealthy_threshold_count=get_context_int(
+                self.node, "web_unhealthy_threshold_count", 2
+            ),
         )
-        
-        # Cognitoユーザープールを作成
-        simple_user_pool = SimpleUserPool(self, app_name, stage)
 
-        _ = create_alb_instance(
+        # ALBのアクセスログ
+        alb_log_bucket = None
+        if get_context_bool(self.node, "alb_access_logs_enabled", True):
+            alb_log_bucket = create_alb_log_bucket(
+                scope=self,
+                app_name=app_name,
+                stage=stage,
+                retention_days=get_context_int(
+                    self.node, "alb_access_log_retention_days", 90
+                ),
+                infrequent_access_days=get_context_int(
+                    self.node, "alb_access_log_infrequent_access_days", 30
+                ),
+            )
+
+        alb = create_alb_instance(
             scope=self,
             app_name=app_name,
             stage=stage,
             vpc=simple_vpc.get_vpc(),
             security_group=simple_vpc.get_elb_sg(),
-            ec2_instances=[ec2_instance_1, ec2_instance_2],
+            target_group=target_group,
             user_pool=simple_user_pool.get_user_pool(),
             user_pool_client=simple_user_pool.get_user_pool_client(),
             user_pool_domain=simple_user_pool.get_user_pool_domain(),
             certificate_arn=certificate_arn_param,
+            access_log_bucket=alb_log_bucket,
         )
+        self._alb = alb
 
-        fn = _lambda.Function(
-            self,
-            id=f"{app_name}_{stage}_lambda_handler",
-            function_name=f"{app_name}-{stage}-lambda-handler",
-            runtime=_lambda.Runtime.PYTHON_3_12,
-            handler="hello_world.handler",
-            code=_lambda.Code.from_asset("src"),
+        # ALBのターゲットグループに登録した後でないとALBRequestCountPerTargetを参照できない
+        if web_asg is not None:
+            web_asg.add_target_tracking_policies(
+                scaling_mode=get_context_str(
+                    self.node, "web_scaling_mode", "request_count"
+                ),
+                requests_per_target=get_context_int(
+                    self.node, "web_requests_per_target", 1000
+                ),
+                cpu_utilization_percent=get_context_int(
+                    self.node, "web_cpu_utilization_percent", 50
+                ),
+            )
+
+        # CloudFrontでキャッシュできるページと静的ファイルをエッジから配信する
+        if get_context_bool(self.node, "cloudfront_enabled"):
+            _ = WebAppDistribution(
+                self,
+                app_name=app_name,
+                stage=stage,
+                origin_domain_name=get_context_str(
+                    self.node, "cloudfront_origin_domain_name"
+                ),
+                domain_names=get_context_list(self.node, "cloudfront_domain_names"),
+                certificate_arn=get_context_str(
+                    self.node, "cloudfront_certificate_arn"
+                ),
+                default_ttl_seconds=get_context_int(
+                    self.node, "cloudfront_default_ttl_seconds", 60
+                ),
+                authenticated_paths=get_context_list(
+                    self.node, "cloudfront_authenticated_paths"
+                ),
+                forwarded_cookies=get_context_list(
+                    self.node, "cloudfront_forwarded_cookies"
+                ),
+            )
+
+        # API Gatewayからは発行したバージョンのエイリアスを呼び出す
+        fn = create_api_function(
+            scope=self,
+            app_name=app_name,
+            stage=stage,
+            memory_size=get_context_int(
+                self.node, "lambda_memory_size", profile.function.memory_size
+            ),
+            architecture=get_context_str(
+                self.node, "lambda_architecture", profile.function.architecture
+            ),
+            provisioned_concurrency=get_context_int(
+                self.node,
+                "lambda_provisioned_concurrency",
+                profile.function.provisioned_concurrency,
+            ),
+            environment=(
+                {"JOB_QUEUE_URL": job_queue.get_queue().queue_url}
+                if job_queue is not None
+                else None
+            ),
         )
+        if job_queue is not None:
+            job_queue.grant_send_messages(fn)
 
         # API Gatewayを作成
-        # ALBに設定したものと同じCognito認証を設定する
-        cognito_authorizer = apigw.CognitoUserPoolsAuthorizer(
-            self,
-            id=f"{app_name}_{stage}_cognito_authorizer",
-            cognito_user_pools=[simple_user_pool.get_user_pool()],
-            authorizer_name=f"{app_name}-{stage}-cognito-authorizer",
+        # rest: REST API、http: HTTP API
+        api_type = get_context_str(self.node, "api_type", "rest")
+        api_throttling_rate_limit = get_context_float(
+            self.node, "api_throttling_rate_limit", 1000
         )
-
-        rest_api = apigw.RestApi(
-            self,
-            id=f"{app_name}_{stage}_api",
-            rest_api_name=f"{app_name}-{stage}-api",
+        api_throttling_burst_limit = get_context_int(
+            self.node, "api_throttling_burst_limit", 2000
         )
+        api_method_throttling = get_context_dict(self.node, "api_method_throttling")
+        api: Union[apigw.RestApi, apigwv2.HttpApi]
+        if api_type == "rest":
+            api = create_rest_api(
+                scope=self,
+                app_name=app_name,
+                stage=stage,
+                handler=fn,
+                user_pool=simple_user_pool.get_user_pool(),
+                authorizer_cache_ttl_seconds=get_context_int(
+                    self.node, "api_authorizer_cache_ttl_seconds", 300
+                ),
+                cache_enabled=get_context_bool(self.node, "api_cache_enabled"),
+                cache_ttl_seconds=get_context_int(
+                    self.node, "api_cache_ttl_seconds", 60
+                ),
+                cache_cluster_size=get_context_str(
+                    self.node, "api_cache_cluster_size", "0.5"
+                ),
+                minimum_compression_size_bytes=get_context_int(
+                    self.node, "api_minimum_compression_size_bytes", 1024
+                ),
+                throttling_rate_limit=api_throttling_rate_limit,
+                throttling_burst_limit=api_throttling_burst_limit,
+                method_throttling=api_method_throttling,
+            )
+        elif api_type == "http":
+            api = create_http_api(
+                scope=self,
+                app_name=app_name,
+                stage=stage,
+                handler=fn,
+                user_pool=simple_user_pool.get_user_pool(),
+                user_pool_client=simple_user_pool.get_user_pool_client(),
+                throttling_rate_limit=api_throttling_rate_limit,
+                throttling_burst_limit=api_throttling_burst_limit,
+                method_throttling=api_method_throttling,
+            )
+        else:
+            raise ValueError(
+                f"api_type must be one of {', '.join(API_TYPES)}: {api_type}"
+            )
 
-        rest_api.root.add_method(
-            "GET",
-            apigw.LambdaIntegration(fn),
-            authorizer=cognito_authorizer,
-        )
+        # ALB、EC2、RDS、Lambda、API Gatewayのダッシュボードとアラーム
+        monitoring: Optional[WebAppMonitoring] = None
+        if get_context_bool(self.node, "monitoring_enabled", True):
+            monitoring = WebAppMonitoring(
+                self,
+                app_name=app_name,
+                stage=stage,
+                alb=alb,
+                target_group=target_group,
+                database=db_cluster if db_cluster is not None else db_instance,
+                handler=fn,
+                api=api,
+                auto_scaling_group=(
+                    web_asg.get_auto_scaling_group() if web_asg is not None else None
+                ),
+                ec2_instances=web_instances,
+                job_queue=job_queue,
+                alarm_thresholds=get_context_dict(self.node, "alarm_thresholds"),
+                alarm_email=get_context_str(self.node, "alarm_email"),
+            )
+
+        # CodeDeployでWebサーバーにアプリケーションをデプロイする
+        # デプロイ中もWebサーバーの台数を保ち、ALBとWebサーバーのアラームでロールバックする
+        if get_context_bool(self.node, "deploy_enabled", True):
+            _ = WebAppDeployment(
+                self,
+                app_name=app_name,
+                stage=stage,
+                target_group=target_group,
+                auto_scaling_group=(
+                    web_asg.get_auto_scaling_group() if web_asg is not None else None
+                ),
+                ec2_instances=web_instances,
+                minimum_healthy_hosts_percent=get_context_int(
+                    self.node, "deploy_minimum_healthy_hosts_percent", 50
+                ),
+                alarms=(
+                    monitoring.get_web_alarms()
+                    if monitoring is not None
+                    and get_context_bool(
+                        self.node, "deploy_alarm_rollback_enabled", True
+                    )
+                    else []
+                ),
+            )
+
+        # パフォーマンスとスケーリングの問題をsynth時に検出する
+        # 本番のプロファイルではエラーにして、問題のある構成をデプロイできないようにする
+        if get_context_bool(self.node, "performance_checks_enabled", True):
+            Aspects.of(self).add(
+                PerformanceChecker(
+                    production=get_context_bool(
+                        self.node,
+                        "performance_checks_production",
+                        profile.name == "prod",
+                    ),
+                    ignore=get_context_list(self.node, "performance_checks_ignore"),
+                )
+            )
+
+    def get_alb(self) -> elb.ApplicationLoadBalancer:
+        """ALBを取得する"""
+        return self._alb